@@ -2,8 +2,71 @@ import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk, filedialog
 import pickle
 import os
+import heapq
+import struct
+import threading
+import time
+import atexit
+import mmap
+import sqlite3
+import bisect
+import csv
+import json
+import itertools
+import math
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from enum import IntEnum
+from cohort_stats import CohortStatistics
+import service_metrics
+from service_metrics import Metrics, timed
 
 class PersistenceManager:
+    # Save and load timings and sizes, shared by every service in the process.
+    metrics = Metrics()
+
+    @staticmethod
+    def save_snapshot(filename, data):
+        """Atomically write a dataset snapshot; .col files use the columnar format, .db files SQLite."""
+        with PersistenceManager.metrics.timer('save_snapshot'):
+            if filename.endswith(ColumnarSnapshot.EXTENSION):
+                ColumnarSnapshot.write(filename, data['students'], data.get('journal_seq', 0), data.get('aggregates'))
+            elif SQLiteStudentService.handles(filename):
+                SQLiteStudentService.write_file(filename, data['students'])
+            else:
+                temp_file = filename + '.tmp'
+                with open(temp_file, 'wb') as file:
+                    pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_file, filename)
+        size = os.path.getsize(filename)
+        PersistenceManager.metrics.count('saves')
+        PersistenceManager.metrics.count('bytes_written', size)
+        PersistenceManager.metrics.set_gauge('last_save_bytes', size)
+
+    @staticmethod
+    def load_snapshot(filename):
+        """
+        Read a pickle snapshot (or the students of an SQLite database), or
+        None if the file does not exist; errors propagate to the caller.
+        """
+        if not os.path.exists(filename):
+            return None
+        start = time.perf_counter()
+        if SQLiteStudentService.handles(filename):
+            data = {'students': SQLiteStudentService.read_file(filename)}
+        else:
+            with open(filename, 'rb') as file:
+                data = pickle.load(file)
+        elapsed = time.perf_counter() - start
+        PersistenceManager.metrics.record('load_snapshot', elapsed)
+        PersistenceManager.metrics.set_gauge('last_load_seconds', elapsed)
+        PersistenceManager.metrics.set_gauge('last_load_bytes', os.path.getsize(filename))
+        return data
+
     @staticmethod
     def save_data(filename, data):
         try:
@@ -23,262 +86,3466 @@ class PersistenceManager:
             messagebox.showerror("Error", f"Failed to load data: {str(e)}")
             return None
 
-class FeeSlabCalculator:
-    @staticmethod
-    def calculate(cgpa: float) -> str:
-        if cgpa >= 8.5:
-            return "First Slab"
-        elif cgpa >= 8.0:
-            return "Second Slab"
-        elif cgpa >= 7.5:
-            return "Third Slab"
-        else:
-            return "No slab assigned"
+class BackgroundWriter:
+    """
+    One worker thread that runs persistence jobs off the UI thread.
+
+    Jobs are queued under a key (normally the target file). A job still
+    waiting when another arrives for the same key is replaced rather than
+    queued twice, so a burst of edits produces a single write. Each finished
+    job leaves a (key, description, error) event - error is None on
+    success - for the UI to collect with poll(), typically from a
+    root.after loop.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._running = None
+        self._events = deque()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="background-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, key, job, description: str):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Background writer is closed.")
+            self._pending.pop(key, None)
+            self._pending[key] = (job, description)
+            self._cond.notify_all()
+
+    def cancel(self, key) -> bool:
+        """Drop the job queued under key if it has not started; True if one was dropped."""
+        with self._cond:
+            cancelled = self._pending.pop(key, None) is not None
+            self._cond.notify_all()
+            return cancelled
+
+    def in_worker(self) -> bool:
+        """True on the worker thread itself, where waiting for the queue would deadlock."""
+        return threading.current_thread() is self._thread
+
+    def busy(self) -> bool:
+        with self._cond:
+            return bool(self._pending) or self._running is not None
+
+    def current(self) -> str:
+        """Description of the job running now, or None."""
+        running = self._running
+        return running[1] if running is not None else None
+
+    def poll(self) -> list:
+        """Drain and return the (key, description, error) events of finished jobs."""
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until every queued job has run; False if timeout expired first."""
+        if self.in_worker():
+            return False
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and self._running is None, timeout)
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                key = next(iter(self._pending))
+                job, description = self._pending.pop(key)
+                self._running = (key, description)
+            try:
+                job()
+                self._events.append((key, description, None))
+            except Exception as e:
+                self._events.append((key, description, e))
+            finally:
+                with self._cond:
+                    self._running = None
+                    self._cond.notify_all()
+
+class ReadWriteLock:
+    """
+    Many readers or one writer. Writers are preferred: once one is waiting,
+    new readers queue behind it, so a stream of lookups cannot starve an
+    edit. The writing thread may re-enter write() and read(), and a thread
+    already reading may read again, but a reader can never upgrade to write.
+
+        with lock.read(): ...
+        with lock.write(): ...
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+        self._read_guard = _LockGuard(self.acquire_read, self.release_read)
+        self._write_guard = _LockGuard(self.acquire_write, self.release_write)
+
+    def read(self) -> "_LockGuard":
+        return self._read_guard
+
+    def write(self) -> "_LockGuard":
+        return self._write_guard
+
+    def acquire_read(self):
+        local = self._local
+        depth = getattr(local, 'depth', 0)
+        with self._cond:
+            if not depth and (self._writer is not None or self._writers_waiting) \
+                    and self._writer != threading.get_ident():
+                self._cond.wait_for(lambda: self._writer is None and not self._writers_waiting)
+            self._readers += 1
+        local.depth = depth + 1
+
+    def release_read(self):
+        self._local.depth -= 1
+        with self._cond:
+            self._readers -= 1
+            if not self._readers and self._writers_waiting:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if getattr(self._local, 'depth', 0):
+                raise RuntimeError("A read lock cannot be upgraded to a write lock.")
+            self._writers_waiting += 1
+            try:
+                self._cond.wait_for(lambda: self._writer is None and not self._readers)
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+class _LockGuard:
+    """Reusable context manager for one side of a ReadWriteLock."""
+    __slots__ = ('_acquire', '_release')
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+
+    def __exit__(self, *exc_info):
+        self._release()
+
+class JournalManager:
+    """
+    Append-only write-ahead journal kept beside a pickle snapshot.
+
+    Every mutation is appended as one length-prefixed pickle record
+    (seq, op, payload) and flushed straight away; fsync is grouped, running
+    once every sync_every records or sync_interval seconds. A crash can
+    therefore lose at most the last group on power failure, never on a
+    plain process exit. Once the journal grows past compact_threshold bytes
+    append says so, and the owner checkpoints: rotate moves the journal to
+    <journal>.old and returns the last sequence number, the current state
+    is written as a snapshot stamped with it, and retire_rotated drops the
+    old journal. Replay skips everything the snapshot already contains, so
+    the snapshot may be written on another thread while appends continue.
+    """
+    _HEADER = struct.Struct('<I')
+
+    def __init__(self, snapshot_file: str, sync_every: int = 32, sync_interval: float = 1.0,
+                 compact_threshold: int = 1 << 20):
+        self.snapshot_file = snapshot_file
+        self.journal_file = snapshot_file + '.journal'
+        self.rotated_file = self.journal_file + '.old'
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+        self._lock = threading.Lock()
+        self._file = None
+        self._seq = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        atexit.register(self.close)
+
+    def replay(self, snapshot_seq: int) -> list:
+        """Return the (op, payload) records newer than snapshot_seq, oldest first."""
+        records = []
+        self._seq = snapshot_seq
+        for path in (self.rotated_file, self.journal_file):
+            for seq, op, payload in self._read_records(path):
+                if seq > snapshot_seq:
+                    records.append((op, payload))
+                    self._seq = max(self._seq, seq)
+        return records
+
+    def open(self):
+        if self._file is None:
+            self._file = open(self.journal_file, 'ab')
+
+    def append(self, op: str, payload) -> bool:
+        """Record one mutation; returns True once the journal is due for a checkpoint."""
+        with self._lock:
+            self.open()
+            self._seq += 1
+            record = pickle.dumps((self._seq, op, payload), protocol=pickle.HIGHEST_PROTOCOL)
+            self._file.write(self._HEADER.pack(len(record)) + record)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+            return self._file.tell() >= self.compact_threshold and not os.path.exists(self.rotated_file)
+
+    def rotate(self) -> int:
+        """
+        Start a checkpoint: move the journal aside and return the sequence
+        number the snapshot must be stamped with. Records appended from now
+        on go to a fresh journal. If a rotated journal is still waiting to be
+        retired the current one is kept; replay skips what the snapshot holds.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+            if not os.path.exists(self.rotated_file) and os.path.exists(self.journal_file):
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                os.replace(self.journal_file, self.rotated_file)
+                self.open()
+            return self._seq
+
+    def retire_rotated(self):
+        """Finish a checkpoint once its snapshot is safely on disk."""
+        if os.path.exists(self.rotated_file):
+            os.remove(self.rotated_file)
+
+    def checkpoint(self, data: dict):
+        """Synchronously write data as the snapshot and retire the journal it covers."""
+        data['journal_seq'] = self.rotate()
+        PersistenceManager.save_snapshot(self.snapshot_file, data)
+        self.retire_rotated()
+
+    def needs_checkpoint(self) -> bool:
+        """True when a rotated journal survived a crash and must be folded in before rotating again."""
+        return os.path.exists(self.rotated_file)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _read_records(self, path: str):
+        if not os.path.exists(path):
+            return
+        with open(path, 'r+b') as file:
+            good_offset = 0
+            while True:
+                header = file.read(self._HEADER.size)
+                if not header:
+                    break
+                if len(header) < self._HEADER.size:
+                    file.truncate(good_offset)
+                    break
+                (length,) = self._HEADER.unpack(header)
+                body = file.read(length)
+                try:
+                    if len(body) < length:
+                        raise EOFError
+                    record = pickle.loads(body)
+                except Exception:
+                    # A torn final write from a crash; drop it and everything after.
+                    file.truncate(good_offset)
+                    break
+                good_offset = file.tell()
+                yield record
+
+class FeeSlabCalculator:
+    SLABS = ("First Slab", "Second Slab", "Third Slab", "No slab assigned")
+    # The fee schedule, one (minimum CGPA, fee per student) row per slab in
+    # SLABS order; the last slab has no minimum. Cut-offs and fees are the
+    # institution's policy, so both are configurable: configure() or
+    # load_schedule() replaces the table before any student is graded.
+    # No fees are assumed, so fee exposure is None until they are set.
+    SETTINGS_FILE = 'fee_schedule.json'
+    SCHEDULE = ((8.5, None), (8.0, None), (7.5, None), (None, None))
+    # Derived from SCHEDULE (configure() keeps them in step): SLABS[i] is
+    # awarded from THRESHOLDS[i] upwards, and FEES[i] is charged for it.
+    THRESHOLDS = tuple(minimum for minimum, _ in SCHEDULE[:-1])
+    FEES = tuple(fee for _, fee in SCHEDULE)
+
+    @classmethod
+    def configure(cls, schedule):
+        """Replace the fee schedule; raises ValueError unless it has one row per slab with falling cut-offs."""
+        try:
+            schedule = tuple((None if minimum is None else float(minimum), None if fee is None else float(fee))
+                             for minimum, fee in schedule)
+        except (TypeError, ValueError):
+            raise ValueError("Each fee slab needs a minimum CGPA and a fee.")
+        if len(schedule) != len(cls.SLABS):
+            raise ValueError(f"The fee schedule needs exactly {len(cls.SLABS)} slabs.")
+        thresholds = tuple(minimum for minimum, _ in schedule[:-1])
+        if schedule[-1][0] is not None or None in thresholds:
+            raise ValueError("Every slab but the last needs a minimum CGPA.")
+        if not all(DataValidator.validate_cgpa(minimum) for minimum in thresholds) or \
+                any(higher <= lower for higher, lower in zip(thresholds, thresholds[1:])):
+            raise ValueError("Minimum CGPAs must fall from slab to slab within 0 - 10.")
+        if any(fee is not None and not fee >= 0 for _, fee in schedule):
+            raise ValueError("Fees cannot be negative.")
+        cls.SCHEDULE = schedule
+        cls.THRESHOLDS = thresholds
+        cls.FEES = tuple(fee for _, fee in schedule)
+
+    @classmethod
+    def load_schedule(cls, filename: str = None) -> bool:
+        """
+        configure() from a JSON settings file holding
+        {"schedule": [[8.5, 25000], [8.0, 50000], [7.5, 75000], [null, 100000]]}.
+        Returns False if the file does not exist; raises ValueError if it is malformed.
+        """
+        filename = filename or cls.SETTINGS_FILE
+        if not os.path.exists(filename):
+            return False
+        with open(filename, encoding='utf-8') as file:
+            try:
+                settings = json.load(file)
+                schedule = settings['schedule']
+            except (ValueError, KeyError, TypeError):
+                raise ValueError(f"{filename} must hold a JSON object with a 'schedule' list.")
+        cls.configure(schedule)
+        return True
+
+    @staticmethod
+    def calculate_code(cgpa: float) -> int:
+        """Index into SLABS (a FeeSlab value) for cgpa."""
+        for code, threshold in enumerate(FeeSlabCalculator.THRESHOLDS):
+            if cgpa >= threshold:
+                return code
+        return len(FeeSlabCalculator.THRESHOLDS)
+
+    @staticmethod
+    def calculate(cgpa: float) -> str:
+        return FeeSlabCalculator.SLABS[FeeSlabCalculator.calculate_code(cgpa)]
+
+    @staticmethod
+    def bounds(fee_slab, thresholds: tuple = None) -> tuple:
+        """Half-open CGPA range [low, high) a slab (code or name) covers under thresholds, by default the schedule's."""
+        if isinstance(fee_slab, str):
+            fee_slab = FeeSlabCalculator.SLABS.index(fee_slab)
+        if thresholds is None:
+            thresholds = FeeSlabCalculator.THRESHOLDS
+        low = thresholds[fee_slab] if fee_slab < len(thresholds) else float('-inf')
+        high = thresholds[fee_slab - 1] if fee_slab > 0 else float('inf')
+        return low, high
+
+class DataValidator:
+    @staticmethod
+    def validate_cgpa(cgpa: float) -> bool:
+        return 0 <= cgpa <= 10
+
+    @staticmethod
+    def validate_attendance(attendance: float) -> bool:
+        return isinstance(attendance, (int, float)) and math.isfinite(attendance) and 0 <= attendance <= 100
+
+    @staticmethod
+    def validate_marks(marks: list) -> bool:
+        if not marks:
+            return False
+        for mark in marks:
+            if not isinstance(mark, (int, float)) or not math.isfinite(mark) or mark < 0 or mark > 100:
+                return False
+        return True
+
+    @staticmethod
+    def validate_name(name: str) -> bool:
+        return isinstance(name, str) and name.replace(" ", "").isalpha()
+
+    @staticmethod
+    def validate_id(student_id) -> bool:
+        return isinstance(student_id, int) and student_id > 0
+
+class FeeSlab(IntEnum):
+    """Compact fee-slab code; the display label is only built when asked for."""
+    FIRST = 0
+    SECOND = 1
+    THIRD = 2
+    NONE = 3
+
+    @property
+    def label(self) -> str:
+        return FeeSlabCalculator.SLABS[self]
+
+class CohortAggregates:
+    """
+    Running counts finance asks for: students per fee slab and eligible /
+    ineligible students, from which the total fee exposure follows. add and
+    discard keep them current in O(1) per student, so no query walks the
+    cohort. verify recounts from scratch and raises on any drift. The slab
+    counts remember the fee schedule cut-offs they were counted under, so
+    counts saved or kept under another schedule are known to be stale.
+    """
+    def __init__(self, slab_counts=None, eligible: int = 0, ineligible: int = 0, thresholds=None):
+        self.slab_counts = list(slab_counts) if slab_counts is not None else [0] * len(FeeSlabCalculator.SLABS)
+        self.eligible = eligible
+        self.ineligible = ineligible
+        self.thresholds = tuple(thresholds) if thresholds is not None else FeeSlabCalculator.THRESHOLDS
+
+    @classmethod
+    def from_students(cls, students) -> "CohortAggregates":
+        aggregates = cls()
+        for student in students:
+            aggregates.add(student)
+        return aggregates
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CohortAggregates":
+        return cls(data['slab_counts'], data['eligible'], data['ineligible'], data['thresholds'])
+
+    def is_current(self) -> bool:
+        """False once FeeSlabCalculator.configure has changed the cut-offs the slabs were counted under."""
+        return self.thresholds == FeeSlabCalculator.THRESHOLDS
+
+    def __len__(self):
+        return self.eligible + self.ineligible
+
+    def __eq__(self, other):
+        if not isinstance(other, CohortAggregates):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def add(self, student):
+        self.slab_counts[student.slab_code] += 1
+        if student.is_eligible():
+            self.eligible += 1
+        else:
+            self.ineligible += 1
+
+    def discard(self, student):
+        self.slab_counts[student.slab_code] -= 1
+        if student.is_eligible():
+            self.eligible -= 1
+        else:
+            self.ineligible -= 1
+
+    @property
+    def fee_exposure(self) -> float:
+        """Total fees payable under FeeSlabCalculator.SCHEDULE, or None while its fees are unset."""
+        if None in FeeSlabCalculator.FEES:
+            return None
+        return sum(count * fee for count, fee in zip(self.slab_counts, FeeSlabCalculator.FEES))
+
+    def slab_histogram(self) -> dict:
+        return dict(zip(FeeSlabCalculator.SLABS, self.slab_counts))
+
+    def as_dict(self) -> dict:
+        return {'slab_counts': list(self.slab_counts), 'eligible': self.eligible, 'ineligible': self.ineligible,
+                'thresholds': list(self.thresholds)}
+
+    def verify(self, students):
+        """Recount from students and raise AssertionError if the running counts disagree."""
+        expected = CohortAggregates.from_students(students)
+        if expected != self:
+            raise AssertionError(f"Cohort aggregates drifted: kept {self.as_dict()}, recounted {expected.as_dict()}")
+
+class Student:
+    """
+    A student's result record.
+
+    Instances are slotted and keep marks as array('d'). The fee slab is not
+    stored: it follows from the CGPA under the current fee schedule, so a
+    schedule loaded after grading never leaves a stale slab. Marks stay
+    double precision so CGPAs sitting on a slab boundary grade exactly as
+    they did with plain floats. Measured with tracemalloc on CPython 3.11
+    for a five-subject student with freshly parsed marks, one record costs
+    about 256 bytes excluding the name, against roughly 430 bytes for the
+    old __dict__-based object with a list of marks. Indexing it adds about
+    80 bytes for the BSTNode, 105 for the heap tuple and 285 for the
+    RankIndex entry. Pickles use the same attribute dictionary as the old
+    class, so student_data.pkl files load in either direction.
+    """
+    __slots__ = ('id', 'name', 'marks', 'cgpa', 'attendance')
+
+    def __init__(self, student_id: int, name: str, marks: list, attendance: float):
+        if not DataValidator.validate_id(student_id):
+            raise ValueError("Invalid student ID")
+        if not DataValidator.validate_name(name):
+            raise ValueError("Invalid student name")
+        if not DataValidator.validate_marks(marks):
+            raise ValueError("Invalid marks - must be between 0 and 100")
+        if not DataValidator.validate_attendance(attendance):
+            raise ValueError("Invalid attendance - must be between 0 and 100")
+            
+        self.id = student_id
+        self.name = name
+        self.attendance = attendance
+        self._set_marks(marks)
+
+    @property
+    def fee_slab(self) -> str:
+        return FeeSlabCalculator.calculate(self.cgpa)
+
+    @property
+    def slab_code(self) -> FeeSlab:
+        return FeeSlab(FeeSlabCalculator.calculate_code(self.cgpa))
+
+    def set_marks(self, marks: list):
+        if not DataValidator.validate_marks(marks):
+            raise ValueError("Invalid marks - must be between 0 and 100")
+        self._set_marks(marks)
+
+    def _set_marks(self, marks: list):
+        self.marks = array('d', marks)
+        self.cgpa = self._compute_cgpa(self.marks)
+
+    @staticmethod
+    def _compute_cgpa(marks: list) -> float:
+        total = sum(marks)
+        average = total / len(marks)
+        return round(average / 10.0, 2)
+
+    def is_eligible(self) -> bool:
+        return self.attendance >= 75.0
+
+    def display_info(self):
+        info = f"ID: {self.id}\nName: {self.name}\nCGPA: {self.cgpa}\nAttendance: {self.attendance}%\nFee Slab: {self.fee_slab}\nEligible: {'Yes' if self.is_eligible() else 'No'}"
+        return info
+
+    def to_record(self) -> tuple:
+        """Compact, already-graded form for shipping between processes."""
+        return (self.id, self.name, self.marks.tobytes(), self.attendance, self.cgpa)
+
+    @classmethod
+    def from_record(cls, record: tuple) -> "Student":
+        """Rebuild a Student from to_record() output without re-validating or re-grading it."""
+        student = cls.__new__(cls)
+        student.id, student.name, marks, student.attendance, student.cgpa = record
+        student.marks = array('d')
+        student.marks.frombytes(marks)
+        return student
+
+    def __getstate__(self):
+        return {'id': self.id, 'name': self.name, 'marks': self.marks.tolist(), 'cgpa': self.cgpa,
+                'attendance': self.attendance, 'fee_slab': self.fee_slab}
+
+    def __setstate__(self, state):
+        # Older pickles carry the plain __dict__ of the pre-slots class.
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        self.id = state['id']
+        self.name = state['name']
+        self.attendance = state['attendance']
+        self._set_marks(state['marks'])
+
+class StudentStore:
+    """
+    Column store for a cohort. Marks, CGPA, attendance, fee-slab codes and
+    eligibility live in parallel arrays indexed by row number, and the
+    indexes hold lightweight StudentRecord views of those rows. When grading
+    rules change, each of recompute_cgpa, recompute_fee_slabs and
+    recompute_eligibility rewrites a whole column in one call. Unless given
+    cut-offs of its own, the slab column follows the fee schedule: the next
+    write after FeeSlabCalculator.configure re-slabs every row, and reads
+    before it grade from the CGPA instead. freeze() hands out the columns
+    as they stand in O(1); the next row write copies them first.
+    """
+    def __init__(self):
+        self.ids = array('q')
+        self.names = []
+        self.marks = []
+        self.cgpa = array('d')
+        self.attendance = array('d')
+        self.slab = array('b')
+        self.eligible = array('b')
+        self.cgpa_rule = Student._compute_cgpa
+        # Cut-offs set through recompute_fee_slabs; None follows the fee schedule.
+        self.slab_thresholds = None
+        self._slab_basis = FeeSlabCalculator.THRESHOLDS
+        self._ascending = sorted(self._slab_basis)
+        self.min_attendance = 75.0
+        self._free = []
+        # True while a frozen copy shares the columns; see freeze().
+        self._shared = False
+
+    def __len__(self):
+        return len(self.ids) - len(self._free)
+
+    def add(self, student) -> "StudentRecord":
+        self.follow_schedule()
+        self._unshare()
+        marks = array('d', student.marks)
+        cgpa = self.cgpa_rule(marks)
+        values = (student.id, student.name, marks, cgpa, student.attendance,
+                  self._slab_code(cgpa), student.attendance >= self.min_attendance)
+        if self._free:
+            row = self._free.pop()
+            for column, value in zip(self._columns(), values):
+                column[row] = value
+        else:
+            row = len(self.ids)
+            for column, value in zip(self._columns(), values):
+                column.append(value)
+        return StudentRecord(self, row)
+
+    def freeze(self) -> "StudentStore":
+        """
+        Read-only copy of the store as it is now, in O(1): it shares the
+        columns, and this store copies them before its next row write. The
+        recompute_* methods already build new columns rather than edit them.
+        """
+        clone = StudentStore.__new__(StudentStore)
+        clone.__dict__.update(self.__dict__)
+        self._shared = True
+        return clone
+
+    def _unshare(self):
+        """Give the store columns of its own before a row write; per-row marks arrays are replaced, never mutated."""
+        if not self._shared:
+            return
+        for name in ('ids', 'cgpa', 'attendance', 'slab', 'eligible'):
+            setattr(self, name, array(getattr(self, name).typecode, getattr(self, name)))
+        self.names = list(self.names)
+        self.marks = list(self.marks)
+        self._free = list(self._free)
+        self._shared = False
+
+    def release(self, row: int):
+        self._unshare()
+        self.ids[row] = 0
+        self.names[row] = None
+        self.marks[row] = None
+        self._free.append(row)
+
+    def set_marks(self, row: int, marks: list):
+        self.follow_schedule()
+        self._unshare()
+        marks = array('d', marks)
+        cgpa = self.cgpa_rule(marks)
+        self.marks[row] = marks
+        self.cgpa[row] = cgpa
+        self.slab[row] = self._slab_code(cgpa)
+
+    def recompute_cgpa(self, rule=None):
+        """Recompute every CGPA with rule(marks) -> cgpa; the default is Student._compute_cgpa."""
+        if rule is not None:
+            self.cgpa_rule = rule
+        rule = self.cgpa_rule
+        self.cgpa = array('d', [rule(marks) if marks is not None else 0.0 for marks in self.marks])
+
+    def recompute_fee_slabs(self, thresholds: tuple = None):
+        """Reassign every slab code; thresholds are descending CGPA cut-offs, one per slab."""
+        if thresholds is not None:
+            self.slab_thresholds = tuple(thresholds)
+        self._slab_basis = self.thresholds()
+        self._ascending = sorted(self._slab_basis)
+        ascending = self._ascending
+        top = len(ascending)
+        self.slab = array('b', [top - bisect.bisect_right(ascending, cgpa) for cgpa in self.cgpa])
+
+    def recompute_eligibility(self, min_attendance: float = None):
+        if min_attendance is not None:
+            self.min_attendance = min_attendance
+        limit = self.min_attendance
+        self.eligible = array('b', [attendance >= limit for attendance in self.attendance])
+
+    def thresholds(self) -> tuple:
+        """Descending CGPA cut-offs the slabs are graded by: the store's own, else the fee schedule's."""
+        return self.slab_thresholds if self.slab_thresholds is not None else FeeSlabCalculator.THRESHOLDS
+
+    def follow_schedule(self):
+        """Re-slab every row if the fee schedule changed since the slab column was computed."""
+        if self._schedule_changed():
+            self.recompute_fee_slabs()
+
+    def slab_code(self, row: int) -> int:
+        """The row's slab code, graded afresh while the slab column lags a new fee schedule."""
+        if self._schedule_changed():
+            return FeeSlabCalculator.calculate_code(self.cgpa[row])
+        return self.slab[row]
+
+    def _schedule_changed(self) -> bool:
+        return self.slab_thresholds is None and self._slab_basis != FeeSlabCalculator.THRESHOLDS
+
+    def _slab_code(self, cgpa: float) -> int:
+        return len(self._ascending) - bisect.bisect_right(self._ascending, cgpa)
+
+    def _columns(self):
+        return (self.ids, self.names, self.marks, self.cgpa, self.attendance, self.slab, self.eligible)
+
+class StudentRecord:
+    """
+    A Student-compatible view of one StudentStore row. It pickles as a plain
+    Student, so snapshots and journals stay readable without the store.
+    """
+    __slots__ = ('_store', 'row')
+
+    def __init__(self, store: StudentStore, row: int):
+        self._store = store
+        self.row = row
+
+    @property
+    def id(self) -> int:
+        return self._store.ids[self.row]
+
+    @property
+    def name(self) -> str:
+        return self._store.names[self.row]
+
+    @property
+    def marks(self) -> list:
+        return self._store.marks[self.row].tolist()
+
+    @property
+    def cgpa(self) -> float:
+        return self._store.cgpa[self.row]
+
+    @property
+    def attendance(self) -> float:
+        return self._store.attendance[self.row]
+
+    @property
+    def fee_slab(self) -> str:
+        return FeeSlabCalculator.SLABS[self._store.slab_code(self.row)]
+
+    @property
+    def slab_code(self) -> FeeSlab:
+        return FeeSlab(self._store.slab_code(self.row))
+
+    def is_eligible(self) -> bool:
+        return bool(self._store.eligible[self.row])
+
+    def set_marks(self, marks: list):
+        if not DataValidator.validate_marks(marks):
+            raise ValueError("Invalid marks - must be between 0 and 100")
+        self._store.set_marks(self.row, marks)
+
+    def display_info(self):
+        return Student.display_info(self)
+
+    def to_record(self) -> tuple:
+        """Same form as Student.to_record, detached from the store."""
+        store, row = self._store, self.row
+        return (store.ids[row], store.names[row], array('d', store.marks[row]).tobytes(), store.attendance[row],
+                store.cgpa[row])
+
+    def __reduce__(self):
+        return (Student, (self.id, self.name, self.marks, self.attendance))
+
+class ColumnarSnapshot:
+    """
+    Binary columnar snapshot opened with mmap.
+
+    Layout (little-endian, every section 8-byte aligned):
+    header (magic, count, total marks, name bytes, journal_seq), then the
+    columns ids (q, ascending), cgpa (d), attendance (d), marks_offsets
+    (Q, count + 1), marks (d), name_offsets (Q, count + 1), names (UTF-8),
+    rank_order (q, row numbers best first), rank_of (q, rank position of
+    each row), aggregates (q: per-slab counts, eligible, ineligible) and
+    the fee schedule cut-offs the slabs were counted under (d).
+    Lookups run straight off memoryviews of the mapping; a Student is only
+    built for the rows a caller actually asks for.
+    """
+    MAGIC = b'ERMSCOL3'
+    EXTENSION = '.col'
+    _HEADER = struct.Struct('<8sQQQQ')
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, total_marks, name_bytes, self.journal_seq = self._HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a columnar student snapshot.")
+        view = self._view = memoryview(self._map)
+        offset = self._HEADER.size
+        n = self.count
+
+        def take(fmt, length, itemsize=8):
+            nonlocal offset
+            section = view[offset:offset + length * itemsize]
+            offset += self._aligned(length * itemsize)
+            return section.cast(fmt) if fmt else section
+
+        self.ids = take('q', n)
+        self.cgpa = take('d', n)
+        self.attendance = take('d', n)
+        self.marks_offsets = take('Q', n + 1)
+        self.marks = take('d', total_marks)
+        self.name_offsets = take('Q', n + 1)
+        self.names = take(None, name_bytes, 1)
+        self.rank_order = take('q', n)
+        self.rank_of = take('q', n)
+        column = take('q', len(FeeSlabCalculator.SLABS) + 2)
+        counts = column.tolist()
+        column.release()
+        column = take('d', len(FeeSlabCalculator.SLABS) - 1)
+        thresholds = column.tolist()
+        column.release()
+        self.aggregates = CohortAggregates(counts[:-2], counts[-2], counts[-1], thresholds)
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def _aligned(size: int) -> int:
+        return (size + 7) & ~7
+
+    @classmethod
+    def is_columnar(cls, filename: str) -> bool:
+        try:
+            with open(filename, 'rb') as file:
+                return file.read(len(cls.MAGIC)) == cls.MAGIC
+        except OSError:
+            return False
+
+    @classmethod
+    def write(cls, filename: str, students: list, journal_seq: int = 0, aggregates: dict = None):
+        """Write students (sorted by ID) atomically via a temp file and rename."""
+        n = len(students)
+        if aggregates is None:
+            aggregates = CohortAggregates.from_students(students).as_dict()
+        ranked = sorted(range(n), key=lambda row: (-students[row].cgpa, students[row].id))
+        rank_of = array('q', bytes(8 * n))
+        for position, row in enumerate(ranked):
+            rank_of[row] = position
+        marks_offsets = array('Q', [0])
+        marks = array('d')
+        name_offsets = array('Q', [0])
+        names = bytearray()
+        for student in students:
+            marks.extend(float(mark) for mark in student.marks)
+            marks_offsets.append(len(marks))
+            names += student.name.encode('utf-8')
+            name_offsets.append(len(names))
+        columns = [
+            array('q', [student.id for student in students]),
+            array('d', [student.cgpa for student in students]),
+            array('d', [student.attendance for student in students]),
+            marks_offsets, marks, name_offsets, names,
+            array('q', ranked), rank_of,
+            array('q', aggregates['slab_counts'] + [aggregates['eligible'], aggregates['ineligible']]),
+            array('d', aggregates['thresholds']),
+        ]
+        temp_file = filename + '.tmp'
+        with open(temp_file, 'wb') as file:
+            file.write(cls._HEADER.pack(cls.MAGIC, n, len(marks), len(names), journal_seq))
+            for column in columns:
+                raw = column.tobytes() if isinstance(column, array) else bytes(column)
+                file.write(raw)
+                file.write(bytes(cls._aligned(len(raw)) - len(raw)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file, filename)
+
+    def close(self):
+        for name in ('ids', 'cgpa', 'attendance', 'marks_offsets', 'marks', 'name_offsets', 'names', 'rank_order', 'rank_of'):
+            column = getattr(self, name, None)
+            if column is not None:
+                column.release()
+                setattr(self, name, None)
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def find(self, student_id: int) -> int:
+        """Row number for student_id, or -1."""
+        row = bisect.bisect_left(self.ids, student_id)
+        if row < self.count and self.ids[row] == student_id:
+            return row
+        return -1
+
+    def student(self, row: int) -> Student:
+        name = bytes(self.names[self.name_offsets[row]:self.name_offsets[row + 1]]).decode('utf-8')
+        marks = self.marks[self.marks_offsets[row]:self.marks_offsets[row + 1]].tolist()
+        return Student(self.ids[row], name, marks, self.attendance[row])
+
+    def search(self, student_id: int) -> Student:
+        row = self.find(student_id)
+        return self.student(row) if row >= 0 else None
+
+    def rank(self, student_id: int) -> int:
+        row = self.find(student_id)
+        return self.rank_of[row] + 1 if row >= 0 else None
+
+    def ranking_page(self, offset: int, limit: int) -> list:
+        """(cgpa, -id, student) tuples for ranks offset+1 .. offset+limit."""
+        rows = self.rank_order[max(offset, 0):max(offset, 0) + max(limit, 0)]
+        return [(self.cgpa[row], -self.ids[row], self.student(row)) for row in rows]
+
+    def students(self):
+        """Materialize every student in ID order."""
+        return [self.student(row) for row in range(self.count)]
+
+class BSTNode:
+    __slots__ = ('student', 'key', 'left', 'right', 'height', 'size')
+
+    def __init__(self, student: Student, key):
+        self.student = student
+        self.key = key
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.size = 1
+
+class StudentBST:
+    """
+    AVL-balanced binary search tree keyed on student ID.
+    Insert, search and delete are iterative, so sequential IDs keep the tree
+    at O(log n) height and never hit Python's recursion limit. Every node
+    also records its subtree size, which gives O(log n) positional lookups.
+    Subclasses index on a different key by overriding _key.
+    """
+    def __init__(self):
+        self.root = None
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    @staticmethod
+    def _key(student: Student):
+        return student.id
+
+    @classmethod
+    def from_sorted(cls, students: list) -> "StudentBST":
+        """Build a balanced tree in O(n) from students sorted by ascending key."""
+        keys = [cls._key(student) for student in students]
+        for i in range(1, len(keys)):
+            if keys[i - 1] >= keys[i]:
+                raise ValueError(f"Students must be sorted by unique key (found {keys[i]} after {keys[i - 1]}).")
+        tree = cls()
+        if not students:
+            return tree
+        # Each stack entry is (lo, hi, parent, is_left); the midpoint of the
+        # range becomes the subtree root, so a range of m nodes has height
+        # m.bit_length() and sibling heights never differ by more than one.
+        stack = [(0, len(students) - 1, None, False)]
+        while stack:
+            lo, hi, parent, is_left = stack.pop()
+            mid = (lo + hi) // 2
+            node = BSTNode(students[mid], keys[mid])
+            node.height = (hi - lo + 1).bit_length()
+            node.size = hi - lo + 1
+            if parent is None:
+                tree.root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+            if lo < mid:
+                stack.append((lo, mid - 1, node, True))
+            if mid < hi:
+                stack.append((mid + 1, hi, node, False))
+        return tree
+
+    def insert(self, student: Student) -> bool:
+        """Insert student; returns False, leaving the tree unchanged, if its key is already present."""
+        key = self._key(student)
+        if self.root is None:
+            self.root = BSTNode(student, key)
+            return True
+        path = []
+        node = self.root
+        while node is not None:
+            if key == node.key:
+                return False
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = BSTNode(student, key)
+        else:
+            parent.right = BSTNode(student, key)
+        self._rebalance_path(path)
+        return True
+
+    def search(self, key) -> Student:
+        node = self.root
+        while node is not None:
+            if key == node.key:
+                return node.student
+            node = node.left if key < node.key else node.right
+        return None
+
+    def replace(self, student: Student) -> bool:
+        """Store student in place of the record under its key; returns False if the key is absent."""
+        key = self._key(student)
+        node = self.root
+        while node is not None:
+            if key == node.key:
+                node.student = student
+                return True
+            node = node.left if key < node.key else node.right
+        return False
+
+    def delete(self, key):
+        path = []
+        node = self.root
+        while node is not None and node.key != key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        if node is None:
+            return
+        if node.left is not None and node.right is not None:
+            # Copy the in-order successor up, then unlink the successor instead.
+            path.append(node)
+            successor = node.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            node.student = successor.student
+            node.key = successor.key
+            node = successor
+        child = node.left if node.left is not None else node.right
+        self._replace_child(path[-1] if path else None, node, child)
+        self._rebalance_path(path)
+
+    def count_less(self, key) -> int:
+        """Number of students whose key is strictly less than key."""
+        count = 0
+        node = self.root
+        while node is not None:
+            if node.key < key:
+                count += 1 + (node.left.size if node.left else 0)
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def select(self, index: int) -> Student:
+        """Return the student at 0-based in-order position index."""
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        node = self.root
+        while True:
+            left_size = node.left.size if node.left else 0
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node.student
+            else:
+                index -= left_size + 1
+                node = node.right
+
+    def iter_from(self, index: int = 0, reverse: bool = False):
+        """
+        Lazily yield students in key order from 0-based position index
+        (counting from the largest key when reverse). Positioning costs
+        O(log n) via subtree sizes; each further student is amortized O(1).
+        """
+        stack = []
+        node = self.root
+        while node is not None:
+            near, far = (node.right, node.left) if reverse else (node.left, node.right)
+            near_size = near.size if near else 0
+            if index < near_size:
+                stack.append(node)
+                node = near
+            elif index == near_size:
+                stack.append(node)
+                break
+            else:
+                index -= near_size + 1
+                node = far
+        while stack:
+            node = stack.pop()
+            yield node.student
+            node = node.left if reverse else node.right
+            while node is not None:
+                stack.append(node)
+                node = node.right if reverse else node.left
+
+    def iter_inorder(self, reverse: bool = False):
+        """Lazily yield every student in key order (descending when reverse) with O(height) memory."""
+        return self.iter_from(0, reverse)
+
+    def inorder(self, students: list):
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            students.append(node.student)
+            node = node.right
+
+    def height(self) -> int:
+        return self.root.height if self.root else 0
+
+    def _replace_child(self, parent: BSTNode, old: BSTNode, new: BSTNode):
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def _rebalance_path(self, path: list):
+        """Walk back up an insert/delete path fixing heights, sizes and rotating."""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            subtree = self._rebalance(node)
+            if subtree is not node:
+                self._replace_child(path[i - 1] if i > 0 else None, node, subtree)
+
+    @staticmethod
+    def _height(node: BSTNode) -> int:
+        return node.height if node else 0
+
+    @staticmethod
+    def _update(node: BSTNode):
+        left, right = node.left, node.right
+        if left is None:
+            node.height = right.height + 1 if right else 1
+            node.size = right.size + 1 if right else 1
+        elif right is None:
+            node.height = left.height + 1
+            node.size = left.size + 1
+        else:
+            node.height = (left.height if left.height > right.height else right.height) + 1
+            node.size = left.size + right.size + 1
+
+    def _rebalance(self, node: BSTNode) -> BSTNode:
+        self._update(node)
+        balance = self._height(node.left) - self._height(node.right)
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _rotate_left(self, node: BSTNode) -> BSTNode:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_right(self, node: BSTNode) -> BSTNode:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+class SecondaryIndex(StudentBST):
+    """
+    Ordered index on a student attribute other than the ID. Subclasses pick
+    the key in _key, ending it with the ID so equal values stay distinct.
+    The key each student was filed under is remembered, so an entry can be
+    dropped even after the attribute has changed in place. Range scans cost
+    O(log n + k) and range counts O(log n) thanks to the subtree sizes.
+    """
+    def __init__(self):
+        super().__init__()
+        self._keys = {}
+
+    @classmethod
+    def from_students(cls, students: list) -> "SecondaryIndex":
+        ordered = sorted(students, key=cls._key)
+        index = cls.from_sorted(ordered)
+        index._keys = {student.id: cls._key(student) for student in ordered}
+        return index
+
+    def add(self, student: Student):
+        if student.id in self._keys:
+            raise ValueError(f"Student with ID {student.id} is already indexed.")
+        key = self._key(student)
+        self._keys[student.id] = key
+        self.insert(student)
+
+    def discard(self, student_id: int):
+        key = self._keys.pop(student_id, None)
+        if key is not None:
+            self.delete(key)
+
+    def count_between(self, low_key, high_key) -> int:
+        """Number of students with low_key <= key < high_key."""
+        return max(self.count_less(high_key) - self.count_less(low_key), 0)
+
+    def iter_between(self, low_key, high_key):
+        """Yield students with low_key <= key < high_key in key order."""
+        stack = []
+        node = self.root
+        while node is not None:
+            if node.key < low_key:
+                node = node.right
+            else:
+                stack.append(node)
+                node = node.left
+        while stack:
+            node = stack.pop()
+            if not node.key < high_key:
+                return
+            yield node.student
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+class CGPAIndex(SecondaryIndex):
+    @staticmethod
+    def _key(student: Student):
+        return (student.cgpa, student.id)
+
+class AttendanceIndex(SecondaryIndex):
+    @staticmethod
+    def _key(student: Student):
+        return (student.attendance, student.id)
+
+class NameIndex(SecondaryIndex):
+    """
+    Name lookup for the faculty search box. Case-folded names are kept in
+    order (keyed with the ID) for prefix search, and a trigram index maps
+    each three-letter fragment to the distinct names containing it. That
+    index drives typo-tolerant matching ranked by Dice similarity.
+    """
+    def __init__(self):
+        super().__init__()
+        self._grams = {}
+        self._names = {}
+
+    @staticmethod
+    def _key(student: Student):
+        return (NameIndex.normalize(student.name), student.id)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return " ".join(name.casefold().split())
+
+    @staticmethod
+    def trigrams(text: str) -> set:
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @classmethod
+    def from_students(cls, students: list) -> "NameIndex":
+        index = super().from_students(students)
+        for student_id, (name, _) in index._keys.items():
+            index._add_name(name, student_id)
+        return index
+
+    def add(self, student: Student):
+        super().add(student)
+        self._add_name(self._keys[student.id][0], student.id)
+
+    def discard(self, student_id: int):
+        key = self._keys.get(student_id)
+        if key is None:
+            return
+        super().discard(student_id)
+        name = key[0]
+        ids = self._names[name]
+        ids.discard(student_id)
+        if not ids:
+            del self._names[name]
+            for gram in self.trigrams(name):
+                names = self._grams[gram]
+                names.discard(name)
+                if not names:
+                    del self._grams[gram]
+
+    def prefix(self, text: str, limit: int = 20) -> list:
+        """Students whose name starts with text (case-insensitive), in name order."""
+        text = self.normalize(text)
+        matches = []
+        for student in self.iter_between((text, float('-inf')), (text + '\U0010ffff', float('-inf'))):
+            matches.append(student)
+            if len(matches) >= limit:
+                break
+        return matches
+
+    def fuzzy(self, text: str, limit: int = 20, min_score: float = 0.3) -> list:
+        """Closest names by trigram similarity, best first, as (score, student) pairs."""
+        query = self.trigrams(self.normalize(text))
+        # Every name sharing a trigram with the query is counted, so the
+        # result is the same as scoring each name in the index.
+        shared = Counter()
+        for gram in query:
+            names = self._grams.get(gram)
+            if names:
+                shared.update(names)
+        scored = []
+        for name, common in shared.items():
+            # A name has at least `common` trigrams, which bounds its score.
+            if 2.0 * common / (len(query) + common) < min_score:
+                continue
+            score = 2.0 * common / (len(query) + len(self.trigrams(name)))
+            if score >= min_score:
+                scored.extend((score, -student_id) for student_id in self._names[name])
+        best = heapq.nlargest(limit, scored)
+        return [(round(score, 3), self.search(self._keys[-neg_id])) for score, neg_id in best]
+
+    def _add_name(self, name: str, student_id: int):
+        ids = self._names.get(name)
+        if ids is None:
+            ids = self._names[name] = set()
+            for gram in self.trigrams(name):
+                self._grams.setdefault(gram, set()).add(name)
+        ids.add(student_id)
+
+class RankIndex(SecondaryIndex):
+    """
+    Order-statistic tree over the ranking key (cgpa, -id). Subtree sizes
+    answer "what is student X's rank" and "who is at rank r" in O(log n).
+    Rank 1 is the highest CGPA, ties going to the lower ID.
+    """
+    @staticmethod
+    def _key(student: Student):
+        return (student.cgpa, -student.id)
+
+    def rank(self, student_id: int) -> int:
+        key = self._keys.get(student_id)
+        if key is None:
+            return None
+        return len(self) - self.count_less(key)
+
+    def percentile(self, student_id: int) -> float:
+        rank = self.rank(student_id)
+        if rank is None:
+            return None
+        return self.percentile_of(rank, len(self))
+
+    @staticmethod
+    def percentile_of(rank: int, total: int) -> float:
+        """Percentile rank: share of the cohort scoring below, counting the student as half."""
+        return round((total - rank + 0.5) * 100.0 / total, 2)
+
+    def at_rank(self, rank: int) -> Student:
+        return self.select(len(self) - rank)
+
+class MaxHeap:
+    """
+    Array-backed max heap of (cgpa, -student_id, student) tuples with a
+    position map from student ID to heap slot, so remove and update are
+    O(log n) instead of a linear scan.
+    """
+    def __init__(self):
+        self._data = []
+        self._pos = {}
+        self._sorted = None
+
+    def __len__(self):
+        return len(self._data)
+
+    def build(self, elements: list):
+        """Replace the heap contents with elements, heapifying bottom-up in O(n)."""
+        self._data = list(elements)
+        self._pos = {}
+        self._sorted = None
+        for i, element in enumerate(self._data):
+            if element[2].id in self._pos:
+                raise ValueError(f"Student with ID {element[2].id} is already ranked.")
+            self._pos[element[2].id] = i
+        for i in range(len(self._data) // 2 - 1, -1, -1):
+            self._heapify_down(i)
+
+    def insert(self, element: tuple):
+        student_id = element[2].id
+        if student_id in self._pos:
+            raise ValueError(f"Student with ID {student_id} is already ranked.")
+        self._data.append(element)
+        self._pos[student_id] = len(self._data) - 1
+        self._sorted = None
+        self._heapify_up(len(self._data) - 1)
+
+    def remove(self, student_id: int):
+        index = self._pos.pop(student_id, None)
+        if index is None:
+            return
+        self._sorted = None
+        last = self._data.pop()
+        if index < len(self._data):
+            self._data[index] = last
+            self._pos[last[2].id] = index
+            self._heapify_down(index)
+            self._heapify_up(index)
+
+    def update(self, student_id: int, new_cgpa: float, student: Student = None):
+        """Re-rank a student whose CGPA changed, optionally swapping in a new record for them."""
+        index = self._pos.get(student_id)
+        if index is None:
+            raise KeyError(student_id)
+        _, neg_id, old = self._data[index]
+        self._data[index] = (new_cgpa, neg_id, old if student is None else student)
+        self._sorted = None
+        self._heapify_up(index)
+        self._heapify_down(self._pos[student_id])
+
+    def sorted_elements(self) -> list:
+        return list(self._sorted_view())
+
+    def top_k(self, k: int) -> list:
+        """
+        Return the k highest-ranked elements in descending order.
+        Without a cached sorted view this walks the heap best-first from the
+        root, touching O(k) slots for O(k log k) work instead of a full sort.
+        """
+        if k <= 0:
+            return []
+        if self._sorted is not None:
+            return self._sorted[:k]
+        return list(itertools.islice(self.iter_ranked(), k))
+
+    def iter_ranked(self):
+        """
+        Lazily yield elements in descending order without modifying the heap.
+        Walks the heap best-first from the root, so the frontier only holds
+        children of elements already yielded.
+        """
+        data = self._data
+        frontier = [(-data[0][0], -data[0][1], 0)] if data else []
+        while frontier:
+            index = heapq.heappop(frontier)[2]
+            yield data[index]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(data):
+                    heapq.heappush(frontier, (-data[child][0], -data[child][1], child))
+
+    def ranking_page(self, offset: int, limit: int) -> list:
+        """
+        Return elements ranked offset+1 .. offset+limit (a page of the ranking).
+        Pages near the top are served by top_k; deeper pages sort once and
+        reuse that sorted view until the heap changes.
+        """
+        if offset < 0 or limit <= 0:
+            return []
+        end = offset + limit
+        if self._sorted is None and end * end <= len(self._data):
+            return self.top_k(end)[offset:]
+        return self._sorted_view()[offset:end]
+
+    def _sorted_view(self) -> list:
+        if self._sorted is None:
+            self._sorted = sorted(self._data, key=lambda e: (e[0], e[1]), reverse=True)
+        return self._sorted
+
+    @staticmethod
+    def _higher(a: tuple, b: tuple) -> bool:
+        return a[0] > b[0] or (a[0] == b[0] and a[1] > b[1])
+
+    def _heapify_up(self, index: int):
+        data, pos = self._data, self._pos
+        element = data[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if not self._higher(element, data[parent]):
+                break
+            data[index] = data[parent]
+            pos[data[index][2].id] = index
+            index = parent
+        data[index] = element
+        pos[element[2].id] = index
+
+    def _heapify_down(self, index: int):
+        data, pos = self._data, self._pos
+        size = len(data)
+        element = data[index]
+        while True:
+            largest = 2 * index + 1
+            if largest >= size:
+                break
+            right = largest + 1
+            if right < size and self._higher(data[right], data[largest]):
+                largest = right
+            if not self._higher(data[largest], element):
+                break
+            data[index] = data[largest]
+            pos[data[index][2].id] = index
+            index = largest
+        data[index] = element
+        pos[element[2].id] = index
+
+class PersistentNode:
+    """Immutable AVL node; once built it is shared by every tree version that contains it."""
+    __slots__ = ('key', 'value', 'left', 'right', 'height', 'size')
+
+    def __init__(self, key, value, left=None, right=None):
+        self.key = key
+        self.value = value
+        self.left = left
+        self.right = right
+        self.height = 1 + max(left.height if left else 0, right.height if right else 0)
+        self.size = 1 + (left.size if left else 0) + (right.size if right else 0)
+
+class PersistentTree:
+    """
+    Persistent (copy-on-write) order-statistic AVL tree. insert and delete
+    never modify a node: they return a new tree that copies the O(log n)
+    nodes on the path to the change and shares every other subtree with the
+    old version, so keeping many versions costs memory in proportion to
+    what changed between them. Subtree sizes give count_less and select in
+    O(log n), as in StudentBST.
+    """
+    __slots__ = ('root',)
+
+    def __init__(self, root: PersistentNode = None):
+        self.root = root
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    @classmethod
+    def from_sorted(cls, items: list) -> "PersistentTree":
+        """Balanced tree over (key, value) pairs already sorted by key, in O(n)."""
+        def build(low, high):
+            if low >= high:
+                return None
+            mid = (low + high) // 2
+            key, value = items[mid]
+            return PersistentNode(key, value, build(low, mid), build(mid + 1, high))
+        return cls(build(0, len(items)))
+
+    def get(self, key, default=None):
+        node = self.root
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                return node.value
+        return default
+
+    def count_less(self, key) -> int:
+        """Number of keys strictly below key."""
+        count = 0
+        node = self.root
+        while node is not None:
+            if node.key < key:
+                count += (node.left.size if node.left else 0) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def select(self, index: int):
+        """Value at 0-based position index in key order."""
+        node = self.root
+        while node is not None:
+            left = node.left.size if node.left else 0
+            if index < left:
+                node = node.left
+            elif index == left:
+                return node.value
+            else:
+                index -= left + 1
+                node = node.right
+        raise IndexError(index)
+
+    def values(self, start: int = 0):
+        """Values in key order from position start: O(log n) to the first, then O(1) each."""
+        stack = []
+        node = self.root
+        while node is not None:
+            left = node.left.size if node.left else 0
+            if start <= left:
+                stack.append(node)
+                node = node.left
+            else:
+                start -= left + 1
+                node = node.right
+        while stack:
+            node = stack.pop()
+            yield node.value
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def insert(self, key, value) -> "PersistentTree":
+        """New version with key mapped to value (replacing any existing value)."""
+        return PersistentTree(self._insert(self.root, key, value))
+
+    def delete(self, key) -> "PersistentTree":
+        """New version without key; raises KeyError if it is absent."""
+        return PersistentTree(self._delete(self.root, key))
+
+    @classmethod
+    def _insert(cls, node, key, value):
+        if node is None:
+            return PersistentNode(key, value)
+        if key < node.key:
+            return cls._balance(node.key, node.value, cls._insert(node.left, key, value), node.right)
+        if node.key < key:
+            return cls._balance(node.key, node.value, node.left, cls._insert(node.right, key, value))
+        return PersistentNode(key, value, node.left, node.right)
+
+    @classmethod
+    def _delete(cls, node, key):
+        if node is None:
+            raise KeyError(key)
+        if key < node.key:
+            return cls._balance(node.key, node.value, cls._delete(node.left, key), node.right)
+        if node.key < key:
+            return cls._balance(node.key, node.value, node.left, cls._delete(node.right, key))
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+        successor = node.right
+        while successor.left is not None:
+            successor = successor.left
+        return cls._balance(successor.key, successor.value, node.left, cls._delete(node.right, successor.key))
+
+    @staticmethod
+    def _height(node) -> int:
+        return node.height if node else 0
+
+    @classmethod
+    def _balance(cls, key, value, left, right) -> PersistentNode:
+        """New node over left and right, rotated (into fresh nodes) when their heights differ by two."""
+        height = cls._height
+        if height(left) > height(right) + 1:
+            if height(left.left) >= height(left.right):
+                return PersistentNode(left.key, left.value, left.left,
+                                      PersistentNode(key, value, left.right, right))
+            pivot = left.right
+            return PersistentNode(pivot.key, pivot.value,
+                                  PersistentNode(left.key, left.value, left.left, pivot.left),
+                                  PersistentNode(key, value, pivot.right, right))
+        if height(right) > height(left) + 1:
+            if height(right.right) >= height(right.left):
+                return PersistentNode(right.key, right.value,
+                                      PersistentNode(key, value, left, right.left), right.right)
+            pivot = right.left
+            return PersistentNode(pivot.key, pivot.value,
+                                  PersistentNode(key, value, left, pivot.left),
+                                  PersistentNode(right.key, right.value, pivot.right, right.right))
+        return PersistentNode(key, value, left, right)
+
+class StudentCSVImporter:
+    """
+    Streams a results CSV in fixed-size chunks and validates every row with
+    DataValidator. Bad rows are reported with their line number and skipped;
+    they never abort the run. The header must name id, name and attendance
+    columns; every other column is read as one subject's marks (blank cells
+    are skipped, so students can have different subject counts).
+
+    With workers > 1 the chunks are parsed, validated and graded in a
+    ProcessPoolExecutor; workers send back compact Student.to_record()
+    tuples and the parent only checks for duplicate IDs. At most two chunks
+    per worker are in flight, so memory stays bounded on huge files.
+    workers=None picks one worker per CPU for files of PARALLEL_MIN_BYTES
+    or more and a single in-process worker below that. Imports usually run
+    on the service's background writer thread, and forking a process that
+    has other threads can hand the workers locks that are held forever, so
+    the workers are started with forkserver (or spawn where there is none).
+    """
+    REQUIRED_COLUMNS = ('id', 'name', 'attendance')
+    START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    # About 30,000 five-subject rows, roughly 0.7 s to grade in-process;
+    # below that, starting the worker processes costs more than it saves.
+    PARALLEL_MIN_BYTES = 1 << 20
+
+    def __init__(self, chunk_size: int = 5000, workers: int = 1):
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    @classmethod
+    def workers_for(cls, filename: str) -> int:
+        """Worker count workers=None resolves to for filename."""
+        if os.path.getsize(filename) < cls.PARALLEL_MIN_BYTES:
+            return 1
+        return os.cpu_count() or 1
+
+    def read(self, filename: str, existing_ids=None):
+        """Return (students sorted by ID, [(line number, error message), ...])."""
+        if self.workers is None:
+            return StudentCSVImporter(self.chunk_size, self.workers_for(filename)).read(filename, existing_ids)
+        students = []
+        errors = []
+        seen = set()
+        with open(filename, newline='', encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return students, [(1, "File is empty.")]
+            columns = [column.strip().lower() for column in header]
+            missing = [name for name in self.REQUIRED_COLUMNS if name not in columns]
+            if missing:
+                return students, [(1, f"Missing column(s): {', '.join(missing)}")]
+            for graded in self._graded_chunks(reader, columns):
+                for line_no, result in graded:
+                    if isinstance(result, str):
+                        errors.append((line_no, result))
+                        continue
+                    student = result if isinstance(result, Student) else Student.from_record(result)
+                    if student.id in seen or (existing_ids is not None and existing_ids(student.id)):
+                        errors.append((line_no, f"Student with ID {student.id} already exists."))
+                        continue
+                    seen.add(student.id)
+                    students.append(student)
+        students.sort(key=lambda s: s.id)
+        return students, errors
+
+    def parse_row(self, row: list, columns: list) -> Student:
+        if len(row) > len(columns):
+            raise ValueError("Row has more cells than the header.")
+        values = dict(zip(columns, (cell.strip() for cell in row)))
+        try:
+            student_id = int(values.get('id', ''))
+        except ValueError:
+            raise ValueError(f"Invalid student ID: {values.get('id', '')!r}")
+        try:
+            attendance = float(values.get('attendance', ''))
+            marks = [float(values[column]) for column in columns
+                     if column not in self.REQUIRED_COLUMNS and values.get(column)]
+        except ValueError:
+            raise ValueError("Marks and attendance must be numbers.")
+        if not marks:
+            raise ValueError("At least one subject mark is required.")
+        # Student runs the remaining DataValidator checks and raises ValueError.
+        return Student(student_id, values.get('name', ''), marks, attendance)
+
+    def _graded_chunks(self, reader, columns: list):
+        """Yield each chunk's [(line number, student or error message)], in file order."""
+        if self.workers <= 1:
+            for chunk in self._chunks(reader):
+                yield _grade_chunk(columns, chunk, compact=False)
+            return
+        context = multiprocessing.get_context(self.START_METHOD)
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            in_flight = deque()
+            for chunk in self._chunks(reader):
+                in_flight.append(pool.submit(_grade_chunk, columns, chunk))
+                if len(in_flight) >= 2 * self.workers:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def _chunks(self, reader):
+        chunk = []
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            chunk.append((reader.line_num, row))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def _grade_chunk(columns: list, chunk: list, compact: bool = True) -> list:
+    """
+    Parse, validate and grade one chunk of CSV rows; the worker entry point
+    for parallel imports. Returns [(line number, result)] where result is an
+    error message, or the Student (as a to_record() tuple when compact).
+    """
+    importer = StudentCSVImporter()
+    graded = []
+    for line_no, row in chunk:
+        try:
+            student = importer.parse_row(row, columns)
+            graded.append((line_no, student.to_record() if compact else student))
+        except ValueError as ve:
+            graded.append((line_no, str(ve)))
+    return graded
+
+class StudentExporter:
+    """
+    Streams students to CSV or JSON Lines one record at a time, so memory
+    stays flat however large the cohort. The format follows the file
+    extension (.csv or .jsonl); rows go to a temp file that is renamed into
+    place once complete, so a reader never sees a partial export.
+    """
+    FIELDS = ('rank', 'id', 'name', 'cgpa', 'attendance', 'fee_slab', 'eligible', 'marks')
+    FORMATS = ('.csv', '.jsonl')
+
+    @classmethod
+    def format_of(cls, filename: str) -> str:
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in cls.FORMATS:
+            raise ValueError(f"Unsupported export format {extension!r}; use .csv or .jsonl")
+        return extension
+
+    def write(self, filename: str, rows) -> int:
+        """Write (rank, student) pairs from the iterable rows; returns the number written."""
+        file_format = self.format_of(filename)
+        count = 0
+        temp_file = filename + '.tmp'
+        with open(temp_file, 'w', newline='', encoding='utf-8') as file:
+            if file_format == '.csv':
+                writer = csv.writer(file)
+                writer.writerow(self.FIELDS)
+                for rank, student in rows:
+                    record = self.record(rank, student)
+                    record['marks'] = ";".join(str(mark) for mark in record['marks'])
+                    writer.writerow(record.values())
+                    count += 1
+            else:
+                for rank, student in rows:
+                    file.write(json.dumps(self.record(rank, student)) + "\n")
+                    count += 1
+        os.replace(temp_file, filename)
+        return count
+
+    @staticmethod
+    def record(rank, student) -> dict:
+        return {
+            'rank': rank,
+            'id': student.id,
+            'name': student.name,
+            'cgpa': round(student.cgpa, 2),
+            'attendance': float(student.attendance),
+            'fee_slab': student.fee_slab,
+            'eligible': student.is_eligible(),
+            'marks': [round(float(mark), 2) for mark in student.marks],
+        }
+
+class PersistentCohort:
+    """
+    The cohort by ID and by rank key (-cgpa, id) in two PersistentTrees,
+    maintained alongside the service's other indexes. An edit copies only
+    the O(log n) nodes on its path, so view() captures the current version
+    in O(1) and no later edit can reach it.
+    """
+    __slots__ = ('by_id', 'by_rank')
+
+    def __init__(self, by_id: PersistentTree, by_rank: PersistentTree):
+        self.by_id = by_id
+        self.by_rank = by_rank
+
+    @classmethod
+    def from_students(cls, students: list) -> "PersistentCohort":
+        """Build both trees from ID-sorted students in O(n log n)."""
+        ranked = sorted(((-student.cgpa, student.id), student) for student in students)
+        return cls(PersistentTree.from_sorted([(student.id, student) for student in students]),
+                   PersistentTree.from_sorted(ranked))
+
+    def add(self, student):
+        self.by_id = self.by_id.insert(student.id, student)
+        self.by_rank = self.by_rank.insert((-student.cgpa, student.id), student)
+
+    def discard(self, student):
+        """Remove a student; call it before the student's fields change."""
+        self.by_id = self.by_id.delete(student.id)
+        self.by_rank = self.by_rank.delete((-student.cgpa, student.id))
+
+    def view(self, store: StudentStore = None) -> "StudentSnapshot":
+        """The current version as a StudentSnapshot; a column store is frozen with it."""
+        return StudentSnapshot(self.by_id, self.by_rank, store.freeze() if store is not None else None)
+
+class StudentSnapshot:
+    """
+    Read-only view of a cohort at one instant, from StudentService.snapshot().
+    It holds one version of a PersistentCohort (and, for a columnar service,
+    a frozen copy of the column store its records read from), so it is
+    never changed by later edits and long reads such as rankings and exports
+    stream from it without holding the service lock.
+    """
+    def __init__(self, by_id: PersistentTree, by_rank: PersistentTree, store: StudentStore = None):
+        self._by_id = by_id
+        self._by_rank = by_rank
+        self._store = store
+
+    def __len__(self):
+        return len(self._by_id)
+
+    @property
+    def students(self) -> list:
+        """Every student in ID order."""
+        return list(self._iter(self._by_id))
+
+    @property
+    def ranked(self) -> list:
+        """Every student in rank order, best first."""
+        return list(self._iter(self._by_rank))
+
+    def search(self, student_id: int):
+        student = self._by_id.get(student_id)
+        return self._pin(student) if student is not None else None
+
+    def rank(self, student_id: int) -> int:
+        """1-based rank of a student, or None, in O(log n)."""
+        student = self.search(student_id)
+        return self._rank_of(student) if student is not None else None
+
+    def ranking(self, limit: int = None) -> list:
+        """(cgpa, -id, student) entries, best first, like StudentService.ranking."""
+        return [(student.cgpa, -student.id, student)
+                for student in itertools.islice(self._iter(self._by_rank), limit)]
+
+    def rows(self, order: str = 'id'):
+        """(rank, student) pairs in 'id' or 'rank' order, produced one at a time for StudentExporter."""
+        if order == 'rank':
+            return enumerate(self._iter(self._by_rank), start=1)
+        return ((self._rank_of(student), student) for student in self._iter(self._by_id))
+
+    def _rank_of(self, student) -> int:
+        return self._by_rank.count_less((-student.cgpa, student.id)) + 1
+
+    def _iter(self, tree: PersistentTree):
+        if self._store is None:
+            return tree.values()
+        return (self._pin(student) for student in tree.values())
+
+    def _pin(self, student):
+        """A record of the live store, re-pointed at the frozen columns; Students are never edited in place."""
+        return StudentRecord(self._store, student.row) if self._store is not None else student
+
+class SemesterResults:
+    """
+    One recorded semester of a ResultHistory: the cohort by ID and by rank
+    (key (-cgpa, id), so position 0 is rank 1) in persistent trees that
+    share every unchanged student and subtree with the neighbouring terms.
+    """
+    __slots__ = ('semester', 'by_id', 'by_rank', 'changed')
+
+    def __init__(self, semester: str, by_id: PersistentTree, by_rank: PersistentTree, changed: int):
+        self.semester = semester
+        self.by_id = by_id
+        self.by_rank = by_rank
+        # Students added, removed or re-graded since the previous semester.
+        self.changed = changed
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def search(self, student_id: int) -> Student:
+        return self.by_id.get(student_id)
+
+    def rank(self, student_id: int) -> int:
+        """1-based rank of a student in this semester, or None, in O(log n)."""
+        student = self.by_id.get(student_id)
+        if student is None:
+            return None
+        return self.by_rank.count_less((-student.cgpa, student_id)) + 1
+
+    def at_rank(self, rank: int) -> Student:
+        return self.by_rank.select(rank - 1) if 1 <= rank <= len(self) else None
+
+    def ranking(self, limit: int = None) -> list:
+        """Students best first: the top limit, or everyone."""
+        return list(itertools.islice(self.by_rank.values(), limit))
+
+    def students(self):
+        return self.by_id.values()
+
+class ResultHistory:
+    """
+    Per-semester results for a cohort, oldest first, kept in filename (by
+    default next to the data file). Each semester is a pair of persistent
+    trees derived from the previous one by path copying, so a term where k
+    students changed costs O(k log n) new nodes rather than another full
+    copy, and the pickle - which stores shared nodes once - grows the same
+    way. "Rank in semester N" is O(log n) and a CGPA trend O(terms log n),
+    with no old files to reload. The file is read on first use; all methods
+    are thread-safe.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._semesters = None
+        self._index = {}
+
+    def _loaded(self) -> list:
+        if self._semesters is None:
+            data = PersistenceManager.load_snapshot(self.filename) or {}
+            self._semesters = list(data.get('semesters', []))
+            self._index = {results.semester: i for i, results in enumerate(self._semesters)}
+        return self._semesters
+
+    def __len__(self):
+        with self._lock:
+            return len(self._loaded())
+
+    def semesters(self) -> list:
+        """Recorded semester names, oldest first."""
+        with self._lock:
+            return [results.semester for results in self._loaded()]
+
+    def semester(self, semester: str) -> SemesterResults:
+        """The results of one semester; raises ValueError if it was never recorded."""
+        with self._lock:
+            semesters = self._loaded()
+            if semester not in self._index:
+                raise ValueError(f"No results recorded for semester {semester!r}.")
+            return semesters[self._index[semester]]
+
+    def record(self, semester: str, students) -> SemesterResults:
+        """
+        Append semester holding students (in ID order) and return it.
+        Students equal to their previous-semester entry are shared with it;
+        the rest are frozen into plain Students and path-copied into new
+        tree versions. Raises ValueError for a blank or repeated name.
+        """
+        semester = semester.strip()
+        if not semester:
+            raise ValueError("Semester name cannot be empty.")
+        with self._lock:
+            semesters = self._loaded()
+            if semester in self._index:
+                raise ValueError(f"Semester {semester!r} is already recorded.")
+            if semesters:
+                results = self._derive(semester, semesters[-1], students)
+            else:
+                frozen = [self._frozen(student) for student in students]
+                results = SemesterResults(
+                    semester,
+                    PersistentTree.from_sorted([(student.id, student) for student in frozen]),
+                    PersistentTree.from_sorted(sorted((((-student.cgpa, student.id), student) for student in frozen),
+                                                      key=lambda item: item[0])),
+                    len(frozen))
+            self._index[semester] = len(semesters)
+            semesters.append(results)
+            return results
+
+    def rank(self, semester: str, student_id: int):
+        """(rank, percentile, cohort size) of a student in a semester, or None if absent that term."""
+        results = self.semester(semester)
+        rank = results.rank(student_id)
+        if rank is None:
+            return None
+        return rank, RankIndex.percentile_of(rank, len(results)), len(results)
+
+    def cgpa_trend(self, student_id: int) -> list:
+        """(semester, cgpa, rank) for every recorded semester the student was in, oldest first."""
+        with self._lock:
+            semesters = list(self._loaded())
+        trend = []
+        for results in semesters:
+            student = results.search(student_id)
+            if student is not None:
+                trend.append((results.semester, student.cgpa, results.rank(student_id)))
+        return trend
+
+    def save(self):
+        """Atomically write every semester to filename."""
+        with self._lock:
+            semesters = list(self._loaded())
+        PersistenceManager.save_snapshot(self.filename, {'semesters': semesters})
+
+    @classmethod
+    def _derive(cls, semester: str, previous: SemesterResults, students) -> SemesterResults:
+        """Path-copy previous into semester by merging its ID order with students'."""
+        by_id, by_rank = previous.by_id, previous.by_rank
+        changed = 0
+        old_students = previous.by_id.values()
+        old = next(old_students, None)
+        for student in itertools.chain(students, [None]):
+            while old is not None and (student is None or old.id < student.id):
+                by_id = by_id.delete(old.id)
+                by_rank = by_rank.delete((-old.cgpa, old.id))
+                changed += 1
+                old = next(old_students, None)
+            if student is None:
+                break
+            if old is not None and old.id == student.id:
+                unchanged = cls._same_result(old, student)
+                if not unchanged:
+                    by_rank = by_rank.delete((-old.cgpa, old.id))
+                old = next(old_students, None)
+                if unchanged:
+                    continue
+            student = cls._frozen(student)
+            by_id = by_id.insert(student.id, student)
+            by_rank = by_rank.insert((-student.cgpa, student.id), student)
+            changed += 1
+        return SemesterResults(semester, by_id, by_rank, changed)
+
+    @staticmethod
+    def _same_result(old: Student, new) -> bool:
+        return old is new or (old.cgpa == new.cgpa and old.attendance == new.attendance
+                              and old.name == new.name and array('d', old.marks) == array('d', new.marks))
+
+    @staticmethod
+    def _frozen(student) -> Student:
+        """The student itself, or for a store row view a detached Student copy (rows change in place)."""
+        return student if isinstance(student, Student) else Student.from_record(student.to_record())
+
+class StudentServiceBase:
+    """
+    What StudentService and SQLiteStudentService share: background imports
+    and exports, diagnostics dumps and profiling. A subclass provides
+    import_csv, export and diagnostics, a BackgroundWriter in self.writer
+    and an empty dict in self._imports.
+    """
+    def import_in_background(self, filename: str, workers: int = None):
+        """
+        Queue import_csv(filename) on the background writer. Finishes as an
+        ('import', filename) event; collect the outcome with import_result().
+        """
+        def job():
+            self._imports[filename] = self.import_csv(filename, workers)
+        self.writer.submit(('import', filename), job, f"Importing {filename}")
+
+    def import_result(self, filename: str):
+        """(number added, errors) of a finished import_in_background(filename), once; else None."""
+        return self._imports.pop(filename, None)
+
+    def export_in_background(self, filename: str, order: str = 'id'):
+        self._check_export(filename, order)
+        self.writer.submit(('export', filename), lambda: self.export(filename, order), f"Exporting {filename}")
+
+    def dump_diagnostics(self, filename: str):
+        """Write diagnostics() to filename as JSON."""
+        service_metrics.dump(self.diagnostics(), filename)
+
+    def profile(self, operation: str, *args, **kwargs):
+        """
+        Run one service operation, e.g. profile('ranking'), under cProfile.
+        Returns (result, printable stats sorted by cumulative time).
+        """
+        method = getattr(self, operation, None)
+        if operation.startswith('_') or not callable(method):
+            raise ValueError(f"Unknown operation {operation!r}")
+        return service_metrics.profile_call(method, *args, **kwargs)
+
+    @staticmethod
+    def _check_export(filename: str, order: str):
+        if order not in ('id', 'rank'):
+            raise ValueError(f"Unknown export order {order!r}; use 'id' or 'rank'")
+        StudentExporter.format_of(filename)
+
+class StudentService(StudentServiceBase):
+    def __init__(self, data_file: str = 'student_data.pkl', journaled: bool = True, columnar: bool = False,
+                 debug: bool = False, autoload: bool = True):
+        """
+        columnar=True backs the service with a StudentStore: the indexes then
+        hold StudentRecord row views and recompute_grades can re-grade the
+        whole cohort column by column. debug=True recounts the cohort
+        aggregates after every load and mutation and raises if they drifted.
+
+        Snapshot writes run on a BackgroundWriter (self.writer). The service
+        never talks to the user: failures raise, and outcomes of background
+        writes are collected with self.writer.poll().
+
+        The service is thread-safe: lookups run in parallel under a shared
+        read lock and each mutation holds the write lock until every index
+        agrees. Students are never edited in place (update_marks swaps in a
+        re-graded copy), so snapshot() can hand out a frozen view.
+
+        autoload=False starts the service empty without touching the data
+        file; open_in_background() then loads it on the writer thread, and
+        every lookup or edit made meanwhile waits for that load to finish.
+        The range, name and statistics indexes are built the first time a
+        query needs them, not on load.
+        """
+        self.data_file = data_file
+        # Per-operation call counts and latencies; see diagnostics().
+        self.metrics = Metrics()
+        self.student_bst = StudentBST()
+        self.ranking_queue = MaxHeap()
+        self.rank_index = RankIndex()
+        self.aggregates = CohortAggregates()
+        self.cgpa_index = self.attendance_index = self.name_index = self.statistics = self.versions = None
+        self.debug = debug
+        self.store = StudentStore() if columnar else None
+        self.journal = JournalManager(data_file) if journaled else None
+        # Past semesters, read from data_file + '.history' on first use.
+        self.history = ResultHistory(data_file + '.history')
+        # Created after the journal so that, at exit, queued writes finish before it closes.
+        self.writer = BackgroundWriter()
+        # Outcomes of background CSV imports, by file, until import_result() collects them.
+        self._imports = {}
+        # Mutations take it for writing; lookups and snapshot capture for reading.
+        self._lock = ReadWriteLock()
+        self._mapped = None
+        # Cleared while a queued open/load has yet to finish; see _wait_open().
+        self._opened = threading.Event()
+        self._opened.set()
+        self._open_lock = threading.Lock()
+        self._open_generation = 0
+        if autoload:
+            self.load_data()
+
+    @timed
+    def add_student(self, student: Student):
+        """Add one student; raises ValueError if the ID is already taken."""
+        self._wait_open()
+        with self._lock.write():
+            self._ensure_loaded()
+            if not self._apply_add(student):
+                raise ValueError(f"Student with ID {student.id} already exists.")
+            self._persist('add', student)
+
+    @timed
+    def add_students(self, students) -> int:
+        """
+        Add a batch of students all-or-nothing. Every record is checked for
+        duplicate IDs (within the batch and against the cohort) before
+        anything changes; the batch is then applied in one pass and
+        persisted once. Raises ValueError listing every problem; returns
+        the number of students added.
+        """
+        self._wait_open()
+        students = sorted(students, key=lambda s: s.id)
+        with self._lock.write():
+            self._ensure_loaded()
+            problems = []
+            seen = set()
+            for student in students:
+                if student.id in seen or self.student_bst.search(student.id) is not None:
+                    problems.append(f"Student with ID {student.id} already exists.")
+                seen.add(student.id)
+            if problems:
+                raise ValueError("\n".join(problems))
+            if students:
+                self._apply_add_many(students)
+                self._persist('add_many', students)
+        return len(students)
+
+    @timed
+    def remove_students(self, student_ids) -> int:
+        """
+        Remove a batch of students all-or-nothing: if any ID is unknown a
+        ValueError names them and nothing is removed. Persisted once;
+        returns the number of students removed.
+        """
+        self._wait_open()
+        student_ids = sorted(set(student_ids))
+        with self._lock.write():
+            self._ensure_loaded()
+            missing = [str(sid) for sid in student_ids if self.student_bst.search(sid) is None]
+            if missing:
+                raise ValueError(f"Student(s) not found: {', '.join(missing)}")
+            if student_ids:
+                self._apply_remove_many(student_ids)
+                self._persist('remove_many', student_ids)
+        return len(student_ids)
+
+    @timed
+    def import_csv(self, filename: str, workers: int = 1):
+        """
+        Stream students from a CSV file and add every valid row in one
+        batched pass; workers > 1 grades the rows in that many processes
+        and None sizes the pool to the file. Returns (number added,
+        [(line number, error), ...]).
+        """
+        self._wait_open()
+        self._ensure_loaded()
+        importer = StudentCSVImporter(workers=workers)
+        students, errors = importer.read(filename, lambda sid: self.student_bst.search(sid) is not None)
+        return self.add_students(students), errors
+
+    @timed
+    def search_student(self, student_id: int) -> Student:
+        self._wait_open()
+        with self._lock.read():
+            if self._mapped is not None:
+                return self._mapped.search(student_id)
+            return self.student_bst.search(student_id)
+
+    @timed
+    def remove_student(self, student_id: int):
+        """Remove one student; raises ValueError if there is no such ID."""
+        self._wait_open()
+        with self._lock.write():
+            self._ensure_loaded()
+            if self.student_bst.search(student_id) is None:
+                raise ValueError(f"Student with ID {student_id} not found.")
+            self._apply_remove(student_id)
+            self._persist('remove', student_id)
+
+    @timed
+    def update_marks(self, student_id: int, marks: list) -> Student:
+        """Replace a student's marks and return the re-graded student; raises ValueError on bad input."""
+        self._wait_open()
+        with self._lock.write():
+            self._ensure_loaded()
+            student = self.student_bst.search(student_id)
+            if student is None:
+                raise ValueError(f"Student with ID {student_id} not found.")
+            self._apply_update(student_id, marks)
+            self._persist('update', (student_id, marks))
+            return self.student_bst.search(student_id)
+
+    @timed
+    def recompute_grades(self, cgpa_rule=None, slab_thresholds: tuple = None, min_attendance: float = None):
+        """
+        Re-grade the whole cohort after a rule change: one column-wide pass
+        each for CGPA, fee slabs and eligibility, then an O(n) rebuild of the
+        ranking structures. Requires a service created with columnar=True.
+        Snapshots and the journal only hold marks and attendance, and every
+        reload grades them by the standard rules, so custom rules are only
+        accepted by a service created with journaled=False; a journaled one
+        raises ValueError rather than keep grades it could not reload.
+        """
+        self._wait_open()
+        if self.store is None:
+            raise ValueError("Re-grading the cohort requires a columnar StudentService.")
+        if self.journal is not None and (cgpa_rule, slab_thresholds, min_attendance) != (None, None, None):
+            raise ValueError("Custom grading rules are not saved; re-grade on a StudentService with journaled=False.")
+        with self._lock.write():
+            self._ensure_loaded()
+            self.store.recompute_cgpa(cgpa_rule)
+            self.store.recompute_fee_slabs(slab_thresholds)
+            self.store.recompute_eligibility(min_attendance)
+            students = []
+            self.student_bst.inorder(students)
+            self._build_indexes(students)
+
+    @timed
+    def find_students(self, cgpa: tuple = None, attendance: tuple = None, fee_slab=None, eligible: bool = None) -> list:
+        """
+        Students matching every given predicate: cgpa and attendance are
+        inclusive (low, high) ranges, fee_slab is a FeeSlab code or label and
+        eligible selects by the attendance cut-off. The predicate whose index
+        range holds the fewest students drives the scan (O(log n + k)) and the
+        others are checked per candidate, so results come back in that
+        index's order. With no predicates every student is returned by ID.
+        """
+        self._wait_open()
+        needed = []
+        if cgpa is not None or fee_slab is not None:
+            needed.append('cgpa_index')
+        if attendance is not None or eligible is not None:
+            needed.append('attendance_index')
+        self._ensure_indexes(*needed)
+        with self._lock.read():
+            return self._find_students(cgpa, attendance, fee_slab, eligible)
+
+    def _find_students(self, cgpa, attendance, fee_slab, eligible) -> list:
+        inf = float('inf')
+        predicates = []
+        if cgpa is not None:
+            low, high = cgpa
+            predicates.append((self.cgpa_index, (low, -inf), (high, inf), lambda s: low <= s.cgpa <= high))
+        if fee_slab is not None:
+            low, high = self._slab_bounds(fee_slab)
+            predicates.append((self.cgpa_index, (low, -inf), (high, -inf), lambda s: low <= s.cgpa < high))
+        if attendance is not None:
+            a_low, a_high = attendance
+            predicates.append((self.attendance_index, (a_low, -inf), (a_high, inf), lambda s: a_low <= s.attendance <= a_high))
+        if eligible is not None:
+            cutoff = self.store.min_attendance if self.store is not None else 75.0
+            if eligible:
+                predicates.append((self.attendance_index, (cutoff, -inf), (inf, inf), lambda s: s.attendance >= cutoff))
+            else:
+                predicates.append((self.attendance_index, (-inf, -inf), (cutoff, -inf), lambda s: s.attendance < cutoff))
+        if not predicates:
+            students = []
+            self.student_bst.inorder(students)
+            return students
+        index, low_key, high_key, _ = min(predicates, key=lambda p: p[0].count_between(p[1], p[2]))
+        tests = [p[3] for p in predicates]
+        return [s for s in index.iter_between(low_key, high_key) if all(test(s) for test in tests)]
+
+    @timed
+    def search_by_name(self, text: str, limit: int = 20) -> list:
+        """Students whose name starts with text, topped up with close typo-tolerant matches."""
+        self._wait_open()
+        if not text.strip():
+            return []
+        self._ensure_indexes('name_index')
+        with self._lock.read():
+            results = self.name_index.prefix(text, limit)
+            if len(results) < limit:
+                seen = {student.id for student in results}
+                for _, student in self.name_index.fuzzy(text, limit):
+                    if student.id not in seen:
+                        results.append(student)
+                        seen.add(student.id)
+                    if len(results) >= limit:
+                        break
+            return results
+
+    @timed
+    def fee_summary(self) -> dict:
+        """
+        Students per fee slab, eligibility counts and total fee exposure, in
+        O(1). The first call after the fee schedule changed recounts the
+        cohort under the new cut-offs.
+        """
+        self._wait_open()
+        self._follow_schedule()
+        with self._lock.read():
+            aggregates = self.aggregates
+            return {
+                'slabs': aggregates.slab_histogram(),
+                'eligible': aggregates.eligible,
+                'ineligible': aggregates.ineligible,
+                'fee_exposure': aggregates.fee_exposure,
+            }
+
+    @timed
+    def cohort_statistics(self) -> dict:
+        """CGPA, attendance and per-subject statistics, kept current as students change."""
+        self._wait_open()
+        self._ensure_indexes('statistics')
+        with self._lock.read():
+            return self.statistics.summary()
+
+    def check_aggregates(self):
+        """Recount the cohort and raise AssertionError if the running aggregates drifted."""
+        self._follow_schedule()
+        self._ensure_loaded()
+        with self._lock.read():
+            students = []
+            self.student_bst.inorder(students)
+            self.aggregates.verify(students)
+
+    def _slab_bounds(self, fee_slab) -> tuple:
+        """Half-open CGPA range [low, high) covered by a fee slab."""
+        return FeeSlabCalculator.bounds(fee_slab, self.store.thresholds() if self.store is not None else None)
+
+    @timed
+    def get_rank(self, student_id: int):
+        """Return (rank, percentile, cohort size) for a student, or None if not ranked."""
+        self._wait_open()
+        with self._lock.read():
+            if self._mapped is not None:
+                rank, total = self._mapped.rank(student_id), len(self._mapped)
+            else:
+                rank, total = self.rank_index.rank(student_id), len(self.rank_index)
+        if rank is None:
+            return None
+        return rank, RankIndex.percentile_of(rank, total), total
+
+    @timed
+    def student_at_rank(self, rank: int) -> Student:
+        self._wait_open()
+        with self._lock.read():
+            if self._mapped is not None:
+                page = self._mapped.ranking_page(rank - 1, 1) if rank >= 1 else []
+                return page[0][2] if page else None
+            if not 1 <= rank <= len(self.rank_index):
+                return None
+            return self.rank_index.at_rank(rank)
+
+    def student_count(self) -> int:
+        self._wait_open()
+        with self._lock.read():
+            if self._mapped is not None:
+                return len(self._mapped)
+            return len(self.student_bst)
+
+    @timed
+    def student_page(self, offset: int, limit: int, sort_by: str = 'id', descending: bool = False) -> list:
+        """
+        One page of students ordered by sort_by ('id', 'name', 'cgpa' or
+        'attendance'), read straight off the index for that order in
+        O(log n + limit), so a page costs the same for any cohort size.
+        CGPA ties follow rank order (lower ID first when descending).
+        """
+        self._wait_open()
+        with self._lock.read():
+            mapped = self._mapped
+            if mapped is not None and sort_by in ('id', 'cgpa'):
+                n = len(mapped)
+                positions = range(offset, min(offset + limit, n))
+                if descending == (sort_by == 'id'):
+                    positions = [n - 1 - position for position in positions]
+                rows = positions if sort_by == 'id' else [mapped.rank_order[position] for position in positions]
+                return [mapped.student(row) for row in rows]
+        self._ensure_indexes(*{'name': ('name_index',), 'attendance': ('attendance_index',)}.get(sort_by, ()))
+        with self._lock.read():
+            index = {'id': self.student_bst, 'name': self.name_index, 'cgpa': self.rank_index,
+                     'attendance': self.attendance_index}[sort_by]
+            # The rank index runs worst to best, so descending CGPA is its reverse order.
+            return list(itertools.islice(index.iter_from(offset, reverse=descending), limit))
+
+    @timed
+    def ranking(self, limit: int = None) -> list:
+        """(cgpa, -id, student) entries, best first: the top limit, or everyone."""
+        self._wait_open()
+        with self._lock.read():
+            if self._mapped is not None:
+                return self._mapped.ranking_page(0, len(self._mapped) if limit is None else limit)
+            if limit is None:
+                return self.ranking_queue.sorted_elements()
+            return self.ranking_queue.top_k(limit)
+
+    @timed
+    def all_students(self) -> list:
+        """Every student in ID order."""
+        self._wait_open()
+        self._ensure_loaded()
+        with self._lock.read():
+            students = []
+            self.student_bst.inorder(students)
+            return students
+
+    @timed
+    def snapshot(self) -> "StudentSnapshot":
+        """
+        A consistent read-only view of the cohort as of now. It is captured
+        in O(1) under the read lock from the persistent version index (built
+        in O(n log n) on first use) and is never touched by later edits.
+        """
+        self._wait_open()
+        self._ensure_indexes('versions')
+        with self._lock.read():
+            return self.versions.view(self.store)
+
+    @timed
+    def export(self, filename: str, order: str = 'id') -> int:
+        """
+        Stream every student to filename (.csv or .jsonl) in 'id' or 'rank'
+        order. Rows come one at a time from a snapshot (or the immutable
+        memory-mapped file), so edits carry on while the file is written.
+        Returns the number of students exported.
+        """
+        self._wait_open()
+        self._check_export(filename, order)
+        with self._lock.read():
+            if self._mapped is not None:
+                return StudentExporter().write(filename, self._export_rows(order))
+        return StudentExporter().write(filename, self.snapshot().rows(order))
+
+    @timed
+    def record_semester(self, semester: str) -> SemesterResults:
+        """
+        Close a semester: add the cohort as it stands now to the result
+        history and save the history in the background. Only students that
+        changed since the previous semester take new memory. Raises
+        ValueError for a blank or already recorded semester name.
+        """
+        self._wait_open()
+        results = self.history.record(semester, self.snapshot().students)
+        self.writer.submit(('history', self.history.filename), self.history.save, "Saving semester history")
+        return results
+
+    def semesters(self) -> list:
+        """Recorded semester names, oldest first."""
+        return self.history.semesters()
+
+    @timed
+    def semester_rank(self, semester: str, student_id: int):
+        """(rank, percentile, cohort size) of a student in a recorded semester, or None."""
+        return self.history.rank(semester, student_id)
+
+    @timed
+    def cgpa_trend(self, student_id: int) -> list:
+        """(semester, cgpa, rank) for every recorded semester the student took part in, oldest first."""
+        return self.history.cgpa_trend(student_id)
+
+    def _export_rows(self, order: str):
+        """(rank, student) pairs from the memory-mapped snapshot, produced one at a time."""
+        mapped = self._mapped
+        if order == 'rank':
+            for position, row in enumerate(mapped.rank_order, start=1):
+                yield position, mapped.student(row)
+        else:
+            for row in range(len(mapped)):
+                yield mapped.rank_of[row] + 1, mapped.student(row)
+
+    def save_data(self, wait: bool = False):
+        """
+        Queue a snapshot of the current state to the data file on the
+        background writer. Requests arriving while one is still queued fold
+        into it; wait=True blocks until the write has finished.
+        """
+        self.writer.submit(self.data_file, self._write_snapshot, f"Saving {self.data_file}")
+        if wait:
+            self.writer.flush()
+
+    def save_as(self, filename: str, wait: bool = False):
+        """Queue a standalone snapshot to filename; a .col extension selects the columnar format."""
+        def write():
+            self._ensure_versions()
+            PersistenceManager.save_snapshot(filename, self._capture_snapshot()())
+        self.writer.submit(filename, write, f"Saving {filename}")
+        if wait:
+            self.writer.flush()
+
+    def open_in_background(self):
+        """
+        Queue load_data() of the service's own data file (and its journal)
+        on the background writer. Finishes as an ('open', data_file) event;
+        a missing data file simply leaves the cohort empty.
+        """
+        self._queue_load(('open', self.data_file), self.load_data, f"Opening {self.data_file}")
+
+    def load_in_background(self, filename: str):
+        """Queue load_data(filename) on the background writer, behind any pending writes."""
+        def load():
+            if not self.load_data(filename):
+                raise ValueError("No valid student data found in the selected file.")
+        # The new file replaces the cohort, so an open that has not started yet would be wasted.
+        self.writer.cancel(('open', self.data_file))
+        self._queue_load(('load', filename), load, f"Loading {filename}")
+
+    def _queue_load(self, key, load, description: str):
+        with self._open_lock:
+            self._open_generation += 1
+            generation = self._open_generation
+            self._opened.clear()
+        def job():
+            try:
+                load()
+            finally:
+                # Only the newest queued load reopens the service; older ones may have been replaced.
+                with self._open_lock:
+                    if generation == self._open_generation:
+                        self._opened.set()
+        self.writer.submit(key, job, description)
+
+    def is_open(self) -> bool:
+        """False while a queued open/load has yet to finish; calls made until then wait for it."""
+        return self._opened.is_set()
+
+    def _wait_open(self):
+        """Block until a queued open/load has finished, so nothing reads or edits the half-loaded cohort."""
+        if not self._opened.is_set() and not self.writer.in_worker():
+            self._opened.wait()
+
+    @timed
+    def load_data(self, filename: str = None) -> bool:
+        """
+        Load a snapshot; False (cohort untouched) if another file holds none.
+        For the service's own data file the journal is replayed on top of
+        it. A journaled service adopts another pickle or columnar snapshot
+        as its data file (journal and semester history included) rather
+        than rewriting every row into the old one, so opening it costs the
+        same as opening it at startup. A database is not a snapshot the
+        journal can build on, so its students are checkpointed straight
+        into the data file instead. A columnar snapshot stays memory-mapped
+        and serves reads directly until the first mutation builds the
+        in-memory indexes. Empty snapshots load as an empty cohort.
+        """
+        filename = filename or self.data_file
+        with self._lock.write():
+            own = filename == self.data_file
+            mapped = None
+            if ColumnarSnapshot.is_columnar(filename):
+                mapped = ColumnarSnapshot(filename)
+                data = {'journal_seq': mapped.journal_seq}
+                students = []
+            else:
+                data = PersistenceManager.load_snapshot(filename) or {}
+                students = sorted(data.get('students', []), key=lambda s: s.id)
+            if not own and not data:
+                return False
+            if not own and self.journal is not None and not SQLiteStudentService.handles(filename):
+                self._switch_data_file(filename)
+                own = True
+            self._close_mapped()
+            self._mapped = mapped
+            self._reset_store()
+            saved = CohortAggregates.from_dict(data['aggregates']) if 'aggregates' in data else None
+            self._build_indexes([self._adopt(student) for student in students], saved)
+            if mapped is not None:
+                # Counted when the file was written; fee_summary recounts them if the schedule changed since.
+                self.aggregates = mapped.aggregates
+            elif self.debug and saved is not None:
+                self.aggregates.verify(students)
+            if self.journal is None:
+                return bool(data)
+            if not own:
+                # Rebase the journal on the new data before any edit is appended to it.
+                self._write_snapshot()
+                return True
+            records = self.journal.replay(data.get('journal_seq', 0))
+            if records:
+                self._ensure_loaded()
+            for op, payload in records:
+                self._apply(op, payload)
+            if self.debug and records:
+                self.check_aggregates()
+            self.journal.open()
+            if self.journal.needs_checkpoint():
+                self.save_data()
+            return bool(data) or bool(records)
+
+    def diagnostics(self) -> dict:
+        """
+        Operation latencies for the service and for persistence, plus the
+        current shape of the data structures, as a JSON-serialisable dict.
+        """
+        with self._lock.read():
+            mapped = self._mapped is not None
+            state = {
+                'students': len(self._mapped) if mapped else len(self.student_bst),
+                'memory_mapped': mapped,
+                'tree_height': None if mapped else self.student_bst.height(),
+                'heap_size': None if mapped else len(self.ranking_queue),
+                'lazy_indexes_built': [name for name in self.LAZY_INDEXES if getattr(self, name) is not None],
+                'columnar': self.store is not None,
+                'journal_bytes': os.path.getsize(self.journal.journal_file)
+                if self.journal is not None and os.path.exists(self.journal.journal_file) else 0,
+                'background_job': self.writer.current(),
+            }
+        return {
+            'state': state,
+            'service': self.metrics.as_dict(),
+            'persistence': PersistenceManager.metrics.as_dict(),
+        }
+
+    def close(self):
+        self.writer.close()
+        self._close_mapped()
+        if self.journal is not None:
+            self.journal.close()
+
+    def _ensure_loaded(self):
+        """Build the in-memory indexes from a mapped columnar snapshot, once. Never call it holding the read lock."""
+        if self._mapped is None:
+            return
+        with self._lock.write():
+            if self._mapped is None:
+                return
+            self._reset_store()
+            self._build_indexes([self._adopt(student) for student in self._mapped.students()], self.aggregates)
+            self._close_mapped()
+
+    def _follow_schedule(self):
+        """Recount the aggregates, and re-slab the column store, if FeeSlabCalculator.configure ran since they were counted."""
+        if self.aggregates.is_current():
+            return
+        self._ensure_loaded()
+        with self._lock.write():
+            if self.aggregates.is_current():
+                return
+            if self.store is not None:
+                self.store.follow_schedule()
+            self.aggregates = CohortAggregates.from_students(self.student_bst.iter_inorder())
+
+    def _switch_data_file(self, filename: str):
+        """Make filename the data file; the old file keeps its own journal, so nothing is lost."""
+        self.journal.close()
+        self.journal = JournalManager(filename)
+        self.history = ResultHistory(filename + '.history')
+        self.data_file = filename
+
+    def _close_mapped(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def _persist(self, op: str, payload):
+        if self.debug:
+            self.check_aggregates()
+        if self.journal is None or self.journal.append(op, payload):
+            self.save_data()
+
+    @timed
+    def _write_snapshot(self):
+        """Write the data file snapshot; runs on the background writer."""
+        self._ensure_versions()
+        with self._lock.read():
+            capture = self._capture_snapshot()
+            journal_seq = self.journal.rotate() if self.journal is not None else None
+        # The capture is consistent, so edits may carry on while it is listed
+        # and written; the journal from journal_seq on holds every one of them.
+        data = capture()
+        if self.journal is not None:
+            data['journal_seq'] = journal_seq
+        PersistenceManager.save_snapshot(self.data_file, data)
+        if self.journal is not None:
+            self.journal.retire_rotated()
 
-class DataValidator:
-    @staticmethod
-    def validate_cgpa(cgpa: float) -> bool:
-        return 0 <= cgpa <= 10
+    def _ensure_versions(self):
+        """Build the version index snapshots are captured from, unless a mapped file serves the cohort."""
+        if self._mapped is None:
+            self._ensure_indexes('versions')
 
-    @staticmethod
-    def validate_attendance(attendance: float) -> bool:
-        return 0 <= attendance <= 100
+    def _capture_snapshot(self):
+        """
+        Capture the data file contents and return a function that lists
+        them; edits cannot change them afterwards. Only a cohort version is
+        taken under the read lock, in O(1), and the lists are built once it
+        is released. A memory-mapped file is read while the lock is held,
+        since a load may close it.
+        """
+        with self._lock.read():
+            aggregates = self.aggregates.as_dict()
+            if self._mapped is not None:
+                students = self._mapped.students()
+                data = {
+                    'students': students,
+                    'ranking': [(student.cgpa, -student.id, student) for student in students],
+                    'aggregates': aggregates
+                }
+                return lambda: data
+            versions = self.versions
+            if versions is None:
+                versions = PersistentCohort.from_students(list(self.student_bst.iter_inorder()))
+            view = versions.view(self.store)
+        return lambda: {'students': view.students, 'ranking': view.ranking(), 'aggregates': aggregates}
 
-    @staticmethod
-    def validate_marks(marks: list) -> bool:
-        for mark in marks:
-            if not isinstance(mark, (int, float)) or mark < 0 or mark > 100:
-                return False
+    def _apply(self, op: str, payload):
+        if op == 'add':
+            self._apply_add(payload)
+        elif op == 'add_many':
+            self._apply_add_many(payload)
+        elif op == 'remove':
+            self._apply_remove(payload)
+        elif op == 'remove_many':
+            self._apply_remove_many(payload)
+        elif op == 'update':
+            self._apply_update(*payload)
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+    def _apply_add(self, student: Student) -> bool:
+        record = self._adopt(student)
+        if not self.student_bst.insert(record):
+            if record is not student:
+                self.store.release(record.row)
+            return False
+        student = record
+        self.ranking_queue.insert((student.cgpa, -student.id, student))
+        self._index(student)
         return True
 
-    @staticmethod
-    def validate_name(name: str) -> bool:
-        return isinstance(name, str) and name.replace(" ", "").isalpha()
+    def _apply_add_many(self, students: list):
+        """
+        Add ID-sorted students not already present. Small batches are
+        inserted one by one; large ones merge with the existing in-order
+        list and rebuild every index in a single O(n) pass, the heap
+        included (bottom-up heapify).
+        """
+        if self._prefer_incremental(len(students), len(self.student_bst) + len(students)):
+            for student in students:
+                self._apply_add(student)
+            return
+        existing = []
+        self.student_bst.inorder(existing)
+        merged = []
+        for student in heapq.merge(existing, students, key=lambda s: s.id):
+            if merged and merged[-1].id == student.id:
+                continue
+            merged.append(self._adopt(student))
+        self._build_indexes(merged)
+
+    def _apply_remove_many(self, student_ids: list):
+        """Remove students by ID, one by one for small batches, else by an O(n) rebuild."""
+        if self._prefer_incremental(len(student_ids), len(self.student_bst)):
+            for student_id in student_ids:
+                self._apply_remove(student_id)
+            return
+        doomed = set(student_ids)
+        existing = []
+        self.student_bst.inorder(existing)
+        kept = []
+        for student in existing:
+            if student.id not in doomed:
+                kept.append(student)
+            elif isinstance(student, StudentRecord):
+                self.store.release(student.row)
+        self._build_indexes(kept)
 
     @staticmethod
-    def validate_id(student_id) -> bool:
-        return isinstance(student_id, int) and student_id > 0
+    def _prefer_incremental(batch: int, total: int) -> bool:
+        """True when batch O(log n) updates beat an O(n) rebuild of every index."""
+        return batch * max(total.bit_length(), 1) < total
 
-class Student:
-    def __init__(self, student_id: int, name: str, marks: list, attendance: float):
-        if not DataValidator.validate_id(student_id):
-            raise ValueError("Invalid student ID")
-        if not DataValidator.validate_name(name):
-            raise ValueError("Invalid student name")
-        if not DataValidator.validate_marks(marks):
-            raise ValueError("Invalid marks - must be between 0 and 100")
-        if not DataValidator.validate_attendance(attendance):
-            raise ValueError("Invalid attendance - must be between 0 and 100")
-            
-        self.id = student_id
-        self.name = name
-        self.marks = marks
-        self.cgpa = self._compute_cgpa(marks)
-        self.attendance = attendance
-        self.fee_slab = FeeSlabCalculator.calculate(self.cgpa)
+    # Indexes only some queries use: None until _ensure_indexes builds one
+    # from the BST on first use, then maintained like the rest.
+    LAZY_INDEXES = {
+        'cgpa_index': CGPAIndex.from_students,
+        'attendance_index': AttendanceIndex.from_students,
+        'name_index': NameIndex.from_students,
+        'statistics': CohortStatistics.from_students,
+        'versions': PersistentCohort.from_students,
+    }
 
-    def _compute_cgpa(self, marks: list) -> float:
-        total = sum(marks)
-        average = total / len(marks)
-        return round(average / 10.0, 2)
+    @timed
+    def _build_indexes(self, students: list, aggregates: CohortAggregates = None):
+        """
+        Rebuild the BST, heap, rank index, aggregates and any lazy index
+        already in use from ID-sorted students. Saved aggregates are taken
+        as they are unless the fee schedule changed since they were counted.
+        """
+        self.student_bst = StudentBST.from_sorted(students)
+        self.ranking_queue = MaxHeap()
+        self.ranking_queue.build([(s.cgpa, -s.id, s) for s in students])
+        self.rank_index = RankIndex.from_students(students)
+        if aggregates is None or not aggregates.is_current():
+            aggregates = CohortAggregates.from_students(students)
+        self.aggregates = aggregates
+        for name, build in self.LAZY_INDEXES.items():
+            if getattr(self, name) is not None:
+                setattr(self, name, build(students))
 
-    def is_eligible(self) -> bool:
-        return self.attendance >= 75.0
+    @timed
+    def _ensure_indexes(self, *names):
+        """Build the named lazy indexes that do not exist yet. Never call it holding the read lock."""
+        self._ensure_loaded()
+        if all(getattr(self, name) is not None for name in names):
+            return
+        with self._lock.write():
+            missing = [name for name in names if getattr(self, name) is None]
+            if missing:
+                students = list(self.student_bst.iter_inorder())
+                for name in missing:
+                    setattr(self, name, self.LAZY_INDEXES[name](students))
 
-    def display_info(self):
-        info = f"ID: {self.id}\nName: {self.name}\nCGPA: {self.cgpa}\nAttendance: {self.attendance}%\nFee Slab: {self.fee_slab}\nEligible: {'Yes' if self.is_eligible() else 'No'}"
-        return info
+    def _index(self, student):
+        """Add a student to every index maintained alongside the BST and heap."""
+        self.rank_index.add(student)
+        self.aggregates.add(student)
+        for index in (self.cgpa_index, self.attendance_index, self.name_index, self.statistics, self.versions):
+            if index is not None:
+                index.add(student)
 
-class BSTNode:
-    def __init__(self, student: Student):
-        self.student = student
-        self.left = None
-        self.right = None
+    def _unindex(self, student):
+        """Undo _index; call it before the student's fields change."""
+        self.rank_index.discard(student.id)
+        self.aggregates.discard(student)
+        for index in (self.cgpa_index, self.attendance_index, self.name_index):
+            if index is not None:
+                index.discard(student.id)
+        for index in (self.statistics, self.versions):
+            if index is not None:
+                index.discard(student)
 
-class StudentBST:
-    def __init__(self):
-        self.root = None
+    def _reset_store(self):
+        if self.store is not None:
+            self.store = StudentStore()
 
-    def insert(self, student: Student):
-        try:
-            if self.search(student.id) is not None:
-                raise ValueError(f"Student with ID {student.id} already exists.")
-            self.root = self._insert_rec(self.root, student)
-            return True
-        except ValueError as ve:
-            messagebox.showerror("Error", str(ve))
-            return False
+    def _adopt(self, student):
+        """Move a Student into the column store (when there is one) and return its record."""
+        if self.store is None or isinstance(student, StudentRecord):
+            return student
+        return self.store.add(student)
 
-    def _insert_rec(self, node: BSTNode, student: Student) -> BSTNode:
-        if node is None:
-            return BSTNode(student)
-        if student.id < node.student.id:
-            node.left = self._insert_rec(node.left, student)
-        elif student.id > node.student.id:
-            node.right = self._insert_rec(node.right, student)
-        return node
+    def _apply_remove(self, student_id: int):
+        student = self.student_bst.search(student_id)
+        if student is None:
+            return
+        self.student_bst.delete(student_id)
+        self.ranking_queue.remove(student_id)
+        self._unindex(student)
+        if isinstance(student, StudentRecord):
+            self.store.release(student.row)
 
-    def search(self, student_id: int) -> Student:
-        node = self._search_rec(self.root, student_id)
-        return node.student if node else None
-
-    def _search_rec(self, node: BSTNode, student_id: int) -> BSTNode:
-        if node is None or node.student.id == student_id:
-            return node
-        if student_id < node.student.id:
-            return self._search_rec(node.left, student_id)
-        else:
-            return self._search_rec(node.right, student_id)
+    def _apply_update(self, student_id: int, marks: list):
+        student = self.student_bst.search(student_id)
+        if student is None:
+            return
+        if not DataValidator.validate_marks(marks):
+            raise ValueError("Invalid marks - must be between 0 and 100")
+        if self.store is None:
+            # Copy on write: snapshots may still hold the old Student, so the
+            # graded copy takes its place in the BST node and heap slot.
+            updated = Student.from_record(student.to_record())
+            updated.set_marks(marks)
+            self._unindex(student)
+            self.student_bst.replace(updated)
+            self.ranking_queue.update(student_id, updated.cgpa, updated)
+            self._index(updated)
+            return
+        # Grade first: marks the rule cannot grade must fail before any index changes.
+        self.store.cgpa_rule(array('d', marks))
+        self._unindex(student)
+        student.set_marks(marks)
+        self.ranking_queue.update(student_id, student.cgpa)
+        self._index(student)
 
-    def delete(self, student_id: int):
-        self.root = self._delete_rec(self.root, student_id)
+class SemesterSummary:
+    """What SQLiteStudentService.record_semester reports: the semester name, its size and how many students changed."""
+    __slots__ = ('semester', 'size', 'changed')
 
-    def _delete_rec(self, node: BSTNode, student_id: int) -> BSTNode:
-        if node is None:
-            return node
-        if student_id < node.student.id:
-            node.left = self._delete_rec(node.left, student_id)
-        elif student_id > node.student.id:
-            node.right = self._delete_rec(node.right, student_id)
-        else:
-            if node.left is None:
-                return node.right
-            elif node.right is None:
-                return node.left
-            min_student = self._min_value(node.right)
-            node.student = min_student
-            node.right = self._delete_rec(node.right, min_student.id)
-        return node
+    def __init__(self, semester: str, size: int, changed: int):
+        self.semester = semester
+        self.size = size
+        self.changed = changed
 
-    def _min_value(self, node: BSTNode) -> Student:
-        current = node
-        while current.left is not None:
-            current = current.left
-        return current.student
+    def __len__(self):
+        return self.size
 
-    def inorder(self, students: list):
-        self._inorder_rec(self.root, students)
+class SQLiteStudentService(StudentServiceBase):
+    """
+    StudentService backed by an SQLite database instead of pickles.
 
-    def _inorder_rec(self, node: BSTNode, students: list):
-        if node:
-            self._inorder_rec(node.left, students)
-            students.append(node.student)
-            self._inorder_rec(node.right, students)
+    Same public interface, but nothing is held in memory: each mutation is
+    one indexed statement committed to a WAL-mode database (O(log n) pages
+    written), batches go through executemany on a single prepared INSERT,
+    and rankings, pages and range filters are answered by the database off
+    its indexes on id, (cgpa, id) and (attendance, id). Marks are stored as
+    raw float64 bytes, so opening a shared database never unpickles anything.
+    Recorded semesters live in the same database (semesters and
+    semester_results), ranked off their own (semester, cgpa, id) index.
+    Reads from snapshot() and exports use their own connection inside one
+    read transaction, which WAL keeps consistent while edits carry on.
+    """
+    EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+    COLUMNS = 'id, name, marks, attendance, cgpa, slab'
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS students ("
+        " id INTEGER PRIMARY KEY, name TEXT NOT NULL, marks BLOB NOT NULL,"
+        " attendance REAL NOT NULL, cgpa REAL NOT NULL, slab INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS students_by_cgpa ON students (cgpa DESC, id)",
+        "CREATE INDEX IF NOT EXISTS students_by_attendance ON students (attendance, id)",
+        "CREATE INDEX IF NOT EXISTS students_by_name ON students (name COLLATE NOCASE, id)",
+        "CREATE TABLE IF NOT EXISTS semesters ("
+        " seq INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, changed INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS semester_results ("
+        " semester INTEGER NOT NULL REFERENCES semesters (seq), id INTEGER NOT NULL, name TEXT NOT NULL,"
+        " marks BLOB NOT NULL, attendance REAL NOT NULL, cgpa REAL NOT NULL, slab INTEGER NOT NULL,"
+        " PRIMARY KEY (semester, id)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS semester_results_by_rank ON semester_results (semester, cgpa DESC, id)",
+        "CREATE INDEX IF NOT EXISTS semester_results_by_student ON semester_results (id, semester)",
+    )
+    ORDERS = {'id': 'id', 'name': 'name COLLATE NOCASE, id', 'cgpa': 'cgpa, id DESC',
+              'attendance': 'attendance, id'}
+    RANK_ORDER = 'cgpa DESC, id'
+    MIN_ATTENDANCE = 75.0
 
-class MaxHeap:
-    def __init__(self):
-        self._data = []
+    def __init__(self, data_file: str = 'student_data.db'):
+        self.data_file = data_file
+        self.metrics = Metrics()
+        self.writer = BackgroundWriter()
+        self._imports = {}
+        # One connection shared by every thread; the lock keeps its statements apart.
+        self._lock = threading.RLock()
+        self._db = self._connect()
+        with self._db:
+            for statement in self.SCHEMA:
+                self._db.execute(statement)
 
-    def insert(self, element: tuple):
-        self._data.append(element)
-        self._heapify_up(len(self._data) - 1)
+    @classmethod
+    def handles(cls, filename: str) -> bool:
+        return filename.lower().endswith(cls.EXTENSIONS)
 
-    def remove(self, student_id: int):
-        index = None
-        for i, (_, neg_id, student) in enumerate(self._data):
-            if student.id == student_id:
-                index = i
-                break
-        if index is None:
-            return
-        self._data[index] = self._data[-1]
-        self._data.pop()
-        if index < len(self._data):
-            self._heapify_down(index)
-            self._heapify_up(index)
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.data_file, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
 
-    def sorted_elements(self) -> list:
-        return sorted(self._data, reverse=True)
+    @staticmethod
+    def _row(student) -> tuple:
+        return (student.id, student.name, array('d', student.marks).tobytes(), student.attendance,
+                student.cgpa, int(student.slab_code))
 
-    def _heapify_up(self, index: int):
-        parent = (index - 1) // 2
-        if index > 0 and self._data[index][:2] > self._data[parent][:2]:
-            self._data[index], self._data[parent] = self._data[parent], self._data[index]
-            self._heapify_up(parent)
+    @staticmethod
+    def _student(row) -> Student:
+        return Student.from_record(row[:5])
 
-    def _heapify_down(self, index: int):
-        size = len(self._data)
-        largest = index
-        left = 2 * index + 1
-        right = 2 * index + 2
-        if left < size and self._data[left][:2] > self._data[largest][:2]:
-            largest = left
-        if right < size and self._data[right][:2] > self._data[largest][:2]:
-            largest = right
-        if largest != index:
-            self._data[index], self._data[largest] = self._data[largest], self._data[index]
-            self._heapify_down(largest)
-
-class StudentService:
-    def __init__(self):
-        self.student_bst = StudentBST()
-        self.ranking_queue = MaxHeap()
-        self.load_data()
+    def _query(self, sql: str, parameters=()) -> list:
+        with self._lock:
+            return [self._student(row) for row in self._db.execute(sql, parameters)]
 
+    def _scalar(self, sql: str, parameters=()):
+        with self._lock:
+            return self._db.execute(sql, parameters).fetchone()[0]
+
+    @timed
     def add_student(self, student: Student):
+        """Add one student; raises ValueError if the ID is already taken."""
         try:
-            if self.student_bst.insert(student):
-                self.ranking_queue.insert((student.cgpa, -student.id, student))
-                self.save_data()
-                messagebox.showinfo("Success", "Student added successfully.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+            with self._lock, self._db:
+                self._db.execute(f"INSERT INTO students ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                                 self._row(student))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Student with ID {student.id} already exists.")
+
+    @timed
+    def add_students(self, students) -> int:
+        """Add a batch all-or-nothing in one transaction; raises ValueError listing duplicate IDs."""
+        students = sorted(students, key=lambda s: s.id)
+        with self._lock:
+            problems = []
+            seen = set()
+            for student in students:
+                if student.id in seen or self._exists(student.id):
+                    problems.append(f"Student with ID {student.id} already exists.")
+                seen.add(student.id)
+            if problems:
+                raise ValueError("\n".join(problems))
+            with self._db:
+                self._db.executemany(f"INSERT INTO students ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                                     (self._row(student) for student in students))
+        return len(students)
+
+    @timed
+    def remove_students(self, student_ids) -> int:
+        """Remove a batch all-or-nothing; raises ValueError naming unknown IDs."""
+        student_ids = sorted(set(student_ids))
+        with self._lock:
+            missing = [str(sid) for sid in student_ids if not self._exists(sid)]
+            if missing:
+                raise ValueError(f"Student(s) not found: {', '.join(missing)}")
+            with self._db:
+                self._db.executemany("DELETE FROM students WHERE id = ?", ((sid,) for sid in student_ids))
+        return len(student_ids)
 
+    @timed
+    def import_csv(self, filename: str, workers: int = 1):
+        students, errors = StudentCSVImporter(workers=workers).read(filename, self._exists)
+        return self.add_students(students), errors
+
+    @timed
     def search_student(self, student_id: int) -> Student:
-        return self.student_bst.search(student_id)
+        found = self._query(f"SELECT {self.COLUMNS} FROM students WHERE id = ?", (student_id,))
+        return found[0] if found else None
 
+    @timed
     def remove_student(self, student_id: int):
+        """Remove one student; raises ValueError if there is no such ID."""
+        with self._lock, self._db:
+            if self._db.execute("DELETE FROM students WHERE id = ?", (student_id,)).rowcount == 0:
+                raise ValueError(f"Student with ID {student_id} not found.")
+
+    @timed
+    def update_marks(self, student_id: int, marks: list) -> Student:
+        """Replace a student's marks and return the re-graded student; raises ValueError on bad input."""
+        with self._lock:
+            student = self.search_student(student_id)
+            if student is None:
+                raise ValueError(f"Student with ID {student_id} not found.")
+            student.set_marks(marks)
+            with self._db:
+                self._db.execute("UPDATE students SET marks = ?, cgpa = ?, slab = ? WHERE id = ?",
+                                 (student.marks.tobytes(), student.cgpa, int(student.slab_code), student_id))
+            return student
+
+    def recompute_grades(self, cgpa_rule=None, slab_thresholds: tuple = None, min_attendance: float = None):
+        raise ValueError("Re-grading the cohort requires a columnar StudentService.")
+
+    @timed
+    def find_students(self, cgpa: tuple = None, attendance: tuple = None, fee_slab=None, eligible: bool = None) -> list:
+        """Students matching every given predicate (see StudentService.find_students), filtered in SQL."""
+        clauses, parameters = [], []
+        if cgpa is not None:
+            clauses.append("cgpa BETWEEN ? AND ?")
+            parameters += list(cgpa)
+        if attendance is not None:
+            clauses.append("attendance BETWEEN ? AND ?")
+            parameters += list(attendance)
+        if fee_slab is not None:
+            # Slabs follow the current fee schedule, not the codes stored when a row was written.
+            clauses.append("cgpa >= ? AND cgpa < ?")
+            parameters += list(FeeSlabCalculator.bounds(fee_slab))
+        if eligible is not None:
+            clauses.append("attendance >= ?" if eligible else "attendance < ?")
+            parameters.append(self.MIN_ATTENDANCE)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(f"SELECT {self.COLUMNS} FROM students{where} ORDER BY id", parameters)
+
+    @timed
+    def search_by_name(self, text: str, limit: int = 20) -> list:
+        """Students whose name starts with text, case-insensitively (no typo tolerance here)."""
+        text = text.strip()
+        if not text:
+            return []
+        pattern = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return self._query(f"SELECT {self.COLUMNS} FROM students WHERE name LIKE ? ESCAPE '\\' "
+                           f"ORDER BY name COLLATE NOCASE, id LIMIT ?", (pattern, limit))
+
+    @timed
+    def fee_summary(self) -> dict:
+        """Slab counts graded from each CGPA against the current fee schedule, so a new schedule applies at once."""
+        thresholds = FeeSlabCalculator.THRESHOLDS
+        grade = "CASE " + "".join("WHEN cgpa >= ? THEN ? " for _ in thresholds) + "ELSE ? END"
+        parameters = [value for code, threshold in enumerate(thresholds) for value in (threshold, code)]
+        with self._lock:
+            rows = self._db.execute(f"SELECT {grade}, COUNT(*), TOTAL(attendance >= ?) FROM students GROUP BY 1",
+                                    parameters + [len(thresholds), self.MIN_ATTENDANCE]).fetchall()
+        aggregates = CohortAggregates()
+        for slab, count, eligible in rows:
+            aggregates.slab_counts[slab] = count
+            aggregates.eligible += int(eligible)
+            aggregates.ineligible += count - int(eligible)
+        return {
+            'slabs': aggregates.slab_histogram(),
+            'eligible': aggregates.eligible,
+            'ineligible': aggregates.ineligible,
+            'fee_exposure': aggregates.fee_exposure,
+        }
+
+    @timed
+    def cohort_statistics(self) -> dict:
+        """Streams the cohort through CohortStatistics; memory stays flat but this is O(n)."""
+        statistics = CohortStatistics()
+        for _, student in self.snapshot_rows('id'):
+            statistics.add(student)
+        return statistics.summary()
+
+    def check_aggregates(self):
+        """Nothing to check: every summary is recounted by the database."""
+
+    @timed
+    def get_rank(self, student_id: int):
+        """
+        Return (rank, percentile, cohort size) for a student, or None. SQLite
+        b-trees keep no subtree sizes, so this counts the index entries
+        ranked above the student: O(log n + rank) rather than O(log n).
+        """
+        with self._lock:
+            row = self._db.execute("SELECT cgpa FROM students WHERE id = ?", (student_id,)).fetchone()
+            if row is None:
+                return None
+            # Two range counts on the cgpa index; an OR would defeat the index and scan the table.
+            rank = 1 + self._db.execute("SELECT (SELECT COUNT(*) FROM students WHERE cgpa > ?)"
+                                        " + (SELECT COUNT(*) FROM students WHERE cgpa = ? AND id < ?)",
+                                        (row[0], row[0], student_id)).fetchone()[0]
+            total = self._db.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        return rank, RankIndex.percentile_of(rank, total), total
+
+    @timed
+    def student_at_rank(self, rank: int) -> Student:
+        if rank < 1:
+            return None
+        found = self._query(f"SELECT {self.COLUMNS} FROM students ORDER BY {self.RANK_ORDER} LIMIT 1 OFFSET ?",
+                            (rank - 1,))
+        return found[0] if found else None
+
+    def student_count(self) -> int:
+        return self._scalar("SELECT COUNT(*) FROM students")
+
+    @timed
+    def student_page(self, offset: int, limit: int, sort_by: str = 'id', descending: bool = False) -> list:
+        """One page in sort_by order, read off the matching index; CGPA ties follow rank order."""
+        order = self.ORDERS[sort_by]
+        if descending:
+            order = ", ".join(term[:-5] if term.endswith(' DESC') else term + ' DESC' for term in order.split(', '))
+        return self._query(f"SELECT {self.COLUMNS} FROM students ORDER BY {order} LIMIT ? OFFSET ?",
+                           (limit, offset))
+
+    @timed
+    def ranking(self, limit: int = None) -> list:
+        """(cgpa, -id, student) entries, best first: the top limit, or everyone."""
+        students = self._query(f"SELECT {self.COLUMNS} FROM students ORDER BY {self.RANK_ORDER} LIMIT ?",
+                               (-1 if limit is None else limit,))
+        return [(student.cgpa, -student.id, student) for student in students]
+
+    @timed
+    def all_students(self) -> list:
+        return self._query(f"SELECT {self.COLUMNS} FROM students ORDER BY id")
+
+    @timed
+    def snapshot(self) -> StudentSnapshot:
+        """A consistent read-only StudentSnapshot, read in one transaction on a separate connection."""
+        db = self._connect()
         try:
-            if self.student_bst.search(student_id) is None:
-                messagebox.showinfo("Info", f"Student with ID {student_id} not found.")
+            db.execute("BEGIN")
+            by_id = [self._student(row) for row in db.execute(f"SELECT {self.COLUMNS} FROM students ORDER BY id")]
+        finally:
+            db.close()
+        return PersistentCohort.from_students(by_id).view()
+
+    def snapshot_rows(self, order: str = 'id'):
+        """
+        (rank, student) pairs in 'id' or 'rank' order, streamed from one
+        read transaction on a separate connection so edits are not held up.
+        """
+        db = self._connect()
+        try:
+            sql_order = self.RANK_ORDER if order == 'rank' else 'id'
+            cursor = db.execute(f"SELECT {self.COLUMNS}, ROW_NUMBER() OVER (ORDER BY {self.RANK_ORDER}) "
+                                f"FROM students ORDER BY {sql_order}")
+            for row in cursor:
+                yield row[-1], self._student(row[:-1])
+        finally:
+            db.close()
+
+    @timed
+    def export(self, filename: str, order: str = 'id') -> int:
+        """
+        Stream every student to filename (.csv or .jsonl) in 'id' or 'rank'
+        order, straight from the database. Returns the number exported.
+        """
+        self._check_export(filename, order)
+        return StudentExporter().write(filename, self.snapshot_rows(order))
+
+    @timed
+    def record_semester(self, semester: str) -> SemesterSummary:
+        """
+        Close a semester: copy the cohort as it stands now into
+        semester_results in one transaction. Raises ValueError for a blank
+        or already recorded semester name.
+        """
+        semester = semester.strip()
+        if not semester:
+            raise ValueError("Semester name cannot be empty.")
+        with self._lock, self._db:
+            if self._db.execute("SELECT 1 FROM semesters WHERE name = ?", (semester,)).fetchone():
+                raise ValueError(f"Semester {semester!r} is already recorded.")
+            previous = self._db.execute("SELECT MAX(seq) FROM semesters").fetchone()[0]
+            seq = self._db.execute("INSERT INTO semesters (name, changed) VALUES (?, 0)", (semester,)).lastrowid
+            self._db.execute(f"INSERT INTO semester_results (semester, {self.COLUMNS})"
+                             f" SELECT ?, {self.COLUMNS} FROM students", (seq,))
+            size = self._db.execute("SELECT COUNT(*) FROM semester_results WHERE semester = ?", (seq,)).fetchone()[0]
+            changed = size
+            if previous is not None:
+                # Added or re-graded rows, then rows that are gone.
+                changed = self._db.execute(
+                    "SELECT (SELECT COUNT(*) FROM (SELECT id, name, marks, attendance, cgpa FROM semester_results"
+                    " WHERE semester = :new EXCEPT SELECT id, name, marks, attendance, cgpa FROM semester_results"
+                    " WHERE semester = :old))"
+                    " + (SELECT COUNT(*) FROM semester_results AS old WHERE semester = :old AND NOT EXISTS"
+                    " (SELECT 1 FROM semester_results WHERE semester = :new AND id = old.id))",
+                    {'new': seq, 'old': previous}).fetchone()[0]
+                self._db.execute("UPDATE semesters SET changed = ? WHERE seq = ?", (changed, seq))
+        return SemesterSummary(semester, size, changed)
+
+    def semesters(self) -> list:
+        """Recorded semester names, oldest first."""
+        with self._lock:
+            return [name for (name,) in self._db.execute("SELECT name FROM semesters ORDER BY seq")]
+
+    @timed
+    def semester_rank(self, semester: str, student_id: int):
+        """(rank, percentile, cohort size) of a student in a recorded semester, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT seq FROM semesters WHERE name = ?", (semester,)).fetchone()
+            if row is None:
+                raise ValueError(f"No results recorded for semester {semester!r}.")
+            seq = row[0]
+            row = self._db.execute("SELECT cgpa FROM semester_results WHERE semester = ? AND id = ?",
+                                   (seq, student_id)).fetchone()
+            if row is None:
+                return None
+            rank = 1 + self._db.execute(
+                "SELECT (SELECT COUNT(*) FROM semester_results WHERE semester = :seq AND cgpa > :cgpa)"
+                " + (SELECT COUNT(*) FROM semester_results WHERE semester = :seq AND cgpa = :cgpa AND id < :id)",
+                {'seq': seq, 'cgpa': row[0], 'id': student_id}).fetchone()[0]
+            total = self._db.execute("SELECT COUNT(*) FROM semester_results WHERE semester = ?", (seq,)).fetchone()[0]
+        return rank, RankIndex.percentile_of(rank, total), total
+
+    @timed
+    def cgpa_trend(self, student_id: int) -> list:
+        """(semester, cgpa, rank) for every recorded semester the student took part in, oldest first."""
+        with self._lock:
+            return [tuple(row) for row in self._db.execute(
+                "SELECT semesters.name, result.cgpa,"
+                " 1 + (SELECT COUNT(*) FROM semester_results WHERE semester = result.semester AND cgpa > result.cgpa)"
+                " + (SELECT COUNT(*) FROM semester_results WHERE semester = result.semester AND cgpa = result.cgpa"
+                " AND id < result.id)"
+                " FROM semester_results AS result JOIN semesters ON semesters.seq = result.semester"
+                " WHERE result.id = ? ORDER BY semesters.seq", (student_id,))]
+
+    def save_data(self, wait: bool = False):
+        """Every edit is already committed; this only checkpoints the WAL into the database file."""
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def save_as(self, filename: str, wait: bool = False):
+        """Queue a copy to filename: an online backup for a database name, else a pickle or .col snapshot."""
+        def write():
+            if not self.handles(filename):
+                snapshot = self.snapshot()
+                PersistenceManager.save_snapshot(filename, {'students': snapshot.students,
+                                                            'ranking': snapshot.ranking()})
                 return
-            self.student_bst.delete(student_id)
-            self.ranking_queue.remove(student_id)
-            self.save_data()
-            messagebox.showinfo("Success", f"Student with ID {student_id} deleted successfully.")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+            target = sqlite3.connect(filename)
+            try:
+                with self._lock:
+                    self._db.backup(target)
+            finally:
+                target.close()
+        self.writer.submit(filename, write, f"Saving {filename}")
+        if wait:
+            self.writer.flush()
 
-    def display_ranking(self):
-        sorted_ranking = self.ranking_queue.sorted_elements()
-        if not sorted_ranking:
-            messagebox.showinfo("Info", "No students available for ranking.")
-            return
-        ranking_text = "=== Student Ranking (by CGPA Descending) ===\n"
-        rank = 1
-        for cgpa, neg_id, student in sorted_ranking:
-            ranking_text += f"Rank {rank}:\nID: {student.id}\nName: {student.name}\nCGPA: {student.cgpa}\nAttendance: {student.attendance}%\n---------------------------\n"
-            rank += 1
-        messagebox.showinfo("Student Ranking", ranking_text)
+    def load_in_background(self, filename: str):
+        def load():
+            if not self.load_data(filename):
+                raise ValueError("No valid student data found in the selected file.")
+        self.writer.submit(('load', filename), load, f"Loading {filename}")
 
-    def display_all_students(self):
-        students = []
-        self.student_bst.inorder(students)
-        if not students:
-            messagebox.showinfo("Info", "No student records to display.")
-            return
-        all_students_text = "=== All Student Records (Sorted by ID) ===\n"
-        for student in students:
-            all_students_text += f"ID: {student.id}\nName: {student.name}\nCGPA: {student.cgpa}\nAttendance: {student.attendance}%\n---------------------------\n"
-        messagebox.showinfo("All Students", all_students_text)
+    def open_in_background(self):
+        """Nothing to queue: the database is queried where it is, so the service is open from the start."""
 
-    def save_data(self):
-        students = []
-        self.student_bst.inorder(students)
-        data = {
-            'students': students,
-            'ranking': self.ranking_queue._data
+    def is_open(self) -> bool:
+        """Always True: the database is queried directly and never loaded into memory."""
+        return True
+
+    @timed
+    def load_data(self, filename: str = None) -> bool:
+        """
+        Replace the cohort with the students in filename (another database,
+        a pickle or a .col snapshot) in one transaction. With no filename
+        the database is already current and this only reports whether it
+        holds any students.
+        """
+        if filename is None or os.path.abspath(filename) == os.path.abspath(self.data_file):
+            return self.student_count() > 0
+        if ColumnarSnapshot.is_columnar(filename):
+            mapped = ColumnarSnapshot(filename)
+            try:
+                students = mapped.students()
+            finally:
+                mapped.close()
+        else:
+            students = (PersistenceManager.load_snapshot(filename) or {}).get('students', [])
+        rows = [self._row(student) for student in students]
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM students")
+            self._db.executemany(f"INSERT INTO students ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return bool(rows)
+
+    def diagnostics(self) -> dict:
+        with self._lock:
+            pages = self._db.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        wal_file = self.data_file + '-wal'
+        return {
+            'state': {
+                'students': self.student_count(),
+                'backend': 'sqlite',
+                'database_bytes': pages * page_size,
+                'wal_bytes': os.path.getsize(wal_file) if os.path.exists(wal_file) else 0,
+                'background_job': self.writer.current(),
+            },
+            'service': self.metrics.as_dict(),
+            'persistence': PersistenceManager.metrics.as_dict(),
         }
-        PersistenceManager.save_data('student_data.pkl', data)
 
-    def load_data(self):
-        data = PersistenceManager.load_data('student_data.pkl')
-        if data:
-            for student in data.get('students', []):
-                self.student_bst.insert(student)
-            for item in data.get('ranking', []):
-                self.ranking_queue._data.append(item)
-            self.ranking_queue._data.sort(reverse=True)
+    def close(self):
+        self.writer.close()
+        with self._lock:
+            self._db.close()
+
+    @classmethod
+    def write_file(cls, filename: str, students):
+        """Write students to a new database that atomically replaces filename."""
+        temp_file = filename + '.tmp'
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        db = sqlite3.connect(temp_file)
+        try:
+            with db:
+                for statement in cls.SCHEMA:
+                    db.execute(statement)
+                db.executemany(f"INSERT INTO students ({cls.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                               (cls._row(student) for student in students))
+        finally:
+            db.close()
+        os.replace(temp_file, filename)
+
+    @classmethod
+    def read_file(cls, filename: str) -> list:
+        """Every student in a database file, in ID order."""
+        db = sqlite3.connect(filename)
+        try:
+            return [cls._student(row) for row in db.execute(f"SELECT {cls.COLUMNS} FROM students ORDER BY id")]
+        finally:
+            db.close()
+
+    def _exists(self, student_id: int) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM students WHERE id = ?", (student_id,)).fetchone() is not None
 
 class UserManager:
     def __init__(self):
@@ -313,17 +3580,223 @@ class UserManager:
         if loaded_users:
             self.users = loaded_users
 
+class StudentTable:
+    """
+    Paginated Treeview window over the cohort. Only the visible page is
+    fetched, straight from the index behind the current sort column, so
+    opening or paging through even a very large cohort stays instant.
+    """
+    PAGE_SIZE = 50
+    COLUMNS = (("rank", "Rank", 60), ("id", "ID", 80), ("name", "Name", 180), ("cgpa", "CGPA", 70),
+               ("attendance", "Attendance %", 100), ("fee_slab", "Fee Slab", 120), ("eligible", "Eligible", 70))
+    # Column -> StudentService.student_page order; Rank sorts by CGPA.
+    SORTABLE = {"rank": "cgpa", "id": "id", "name": "name", "cgpa": "cgpa", "attendance": "attendance"}
+
+    def __init__(self, parent, student_service, title: str, sort_by: str = "id", descending: bool = False):
+        self.student_service = student_service
+        self.sort_by = sort_by
+        self.descending = descending
+        self.page = 0
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("720x480")
+
+        table_frame = ttk.Frame(self.window)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        self.tree = ttk.Treeview(table_frame, columns=[key for key, _, _ in self.COLUMNS], show="headings")
+        for key, heading, width in self.COLUMNS:
+            self.tree.heading(key, text=heading, command=lambda column=key: self.sort(column))
+            self.tree.column(key, width=width, anchor=tk.W if key == "name" else tk.CENTER)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.bind("<Double-1>", self.show_details)
+
+        pager = ttk.Frame(self.window)
+        pager.pack(pady=8)
+        ttk.Button(pager, text="<< First", command=lambda: self.show(0)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(pager, text="< Prev", command=lambda: self.show(self.page - 1)).pack(side=tk.LEFT, padx=2)
+        self.page_label = ttk.Label(pager, width=32, anchor=tk.CENTER)
+        self.page_label.pack(side=tk.LEFT, padx=5)
+        ttk.Button(pager, text="Next >", command=lambda: self.show(self.page + 1)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(pager, text="Last >>", command=lambda: self.show(self.page_count() - 1)).pack(side=tk.LEFT, padx=2)
+        self.show(0)
+
+    def page_count(self) -> int:
+        return max(-(-self.student_service.student_count() // self.PAGE_SIZE), 1)
+
+    def sort(self, column: str):
+        sort_by = self.SORTABLE.get(column)
+        if sort_by is None:
+            return
+        if sort_by == self.sort_by:
+            self.descending = not self.descending
+        else:
+            self.sort_by = sort_by
+            self.descending = sort_by == "cgpa"
+        self.show(0)
+
+    def show(self, page: int):
+        if not self.student_service.is_open():
+            # A load is replacing the cohort: page once it is in rather than block the Tk thread
+            self.page_label.config(text="Loading student data...")
+            self.window.after(200, lambda: self.show(page))
+            return
+        with self.student_service.metrics.timer('ui.table_page'):
+            self._show(page)
+
+    def _show(self, page: int):
+        self.page = min(max(page, 0), self.page_count() - 1)
+        students = self.student_service.student_page(self.page * self.PAGE_SIZE, self.PAGE_SIZE,
+                                                     self.sort_by, self.descending)
+        self.tree.delete(*self.tree.get_children())
+        for student in students:
+            ranking = self.student_service.get_rank(student.id)
+            self.tree.insert("", tk.END, iid=str(student.id), values=(
+                ranking[0] if ranking else "", student.id, student.name, f"{student.cgpa:.2f}",
+                student.attendance, student.fee_slab, "Yes" if student.is_eligible() else "No"))
+        arrow = " \u25bc" if self.descending else " \u25b2"
+        for key, heading, _ in self.COLUMNS:
+            self.tree.heading(key, text=heading + (arrow if key == self.sort_by else ""))
+        total = self.student_service.student_count()
+        self.page_label.config(text=f"Page {self.page + 1} of {self.page_count()} ({total} students)")
+
+    def show_details(self, event=None):
+        selection = self.tree.selection()
+        if selection and self.student_service.is_open():
+            student = self.student_service.search_student(int(selection[0]))
+            if student:
+                messagebox.showinfo("Student Details", student.display_info(), parent=self.window)
+
+class DiagnosticsPanel:
+    """
+    Live view of StudentService.diagnostics(): per-operation latencies for
+    the service, persistence and UI, plus tree height and heap size. It can
+    save the numbers as JSON or profile one operation with cProfile.
+    """
+    PROFILE_TARGETS = ("ranking", "all_students", "cohort_statistics", "fee_summary", "snapshot")
+
+    def __init__(self, parent, student_service):
+        self.student_service = student_service
+        self.window = tk.Toplevel(parent)
+        self.window.title("Diagnostics")
+        self.window.geometry("640x480")
+
+        controls = ttk.Frame(self.window)
+        controls.pack(fill=tk.X, padx=10, pady=(10, 0))
+        ttk.Button(controls, text="Refresh", command=self.refresh).pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="Save JSON", command=self.save_json).pack(side=tk.LEFT, padx=2)
+        self.target = tk.StringVar(value=self.PROFILE_TARGETS[0])
+        ttk.Combobox(controls, textvariable=self.target, values=self.PROFILE_TARGETS, state="readonly",
+                     width=18).pack(side=tk.LEFT, padx=(15, 2))
+        ttk.Button(controls, text="Profile", command=self.profile).pack(side=tk.LEFT, padx=2)
+
+        self.text = tk.Text(self.window, wrap=tk.NONE, font=("Courier", 9))
+        self.text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.refresh()
+
+    def refresh(self):
+        if not self.student_service.is_open():
+            self._show("Student data is still loading; refresh once it has finished.")
+            return
+        self._show(service_metrics.format_report(self.student_service.diagnostics()))
+
+    def save_json(self):
+        filename = filedialog.asksaveasfilename(
+            parent=self.window, title="Save Diagnostics", defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if not filename:
+            return
+        if not self.student_service.is_open():
+            messagebox.showinfo("Info", "Student data is still loading; save once it has finished.", parent=self.window)
+            return
+        try:
+            self.student_service.dump_diagnostics(filename)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to save diagnostics: {e}", parent=self.window)
+
+    def profile(self):
+        if not self.student_service.is_open():
+            self._show("Student data is still loading; profile once it has finished.")
+            return
+        _, report = self.student_service.profile(self.target.get())
+        self._show(report)
+
+    def _show(self, text: str):
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, text)
+        self.text.configure(state=tk.DISABLED)
+
 class GUIApp:
+    # The first of these that exists is the working data file (e.g. one saved
+    # with Save Data): a database is queried in place by SQLiteStudentService
+    # and a columnar snapshot is served memory-mapped.
+    DATA_FILES = ('student_data.db', 'student_data.col', 'student_data.pkl')
+
     def __init__(self, root):
         self.root = root
         self.root.title("Academic Exam Result Management System")
-        self.root.geometry("600x400")
+        self.root.geometry("700x600")
         self.center_window()
         self.user_manager = UserManager()
-        self.student_service = StudentService()
+        # Slab cut-offs and fees come from fee_schedule.json when there is one.
+        try:
+            FeeSlabCalculator.load_schedule()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Using the default fee schedule: {e}")
+        # Starts empty: the data file is opened in the background after the first login.
+        data_file = next((name for name in self.DATA_FILES if os.path.exists(name)), self.DATA_FILES[-1])
+        if SQLiteStudentService.handles(data_file):
+            self.student_service = SQLiteStudentService(data_file)
+        else:
+            self.student_service = StudentService(data_file, columnar=ColumnarSnapshot.is_columnar(data_file),
+                                                  autoload=False)
+        self.data_opened = False
+        # Dashboard widgets that read or edit the cohort; disabled while it opens or loads.
+        self.data_widgets = []
         self.current_user = None
         self.data_file_path = None  # To store the current data file path
+        self.status_var = tk.StringVar()
         self.create_welcome_screen()
+        self.poll_background()
+
+    def poll_background(self):
+        # Saves and loads run on the service's writer thread; collect their outcomes here
+        writer = self.student_service.writer
+        for key, description, error in writer.poll():
+            if error is not None:
+                messagebox.showerror("Error", f"{description} failed: {error}")
+            elif isinstance(key, tuple) and key[0] in ('open', 'history'):
+                continue
+            elif isinstance(key, tuple) and key[0] == 'load':
+                self.data_file_path = key[1]
+                message = f"Student data loaded successfully from:\n{key[1]}"
+                if key[1] == self.student_service.data_file:
+                    message += "\n\nChanges are now saved to this file."
+                messagebox.showinfo("Success", message)
+            elif isinstance(key, tuple) and key[0] == 'import':
+                self.import_finished(key[1])
+            elif isinstance(key, tuple) and key[0] == 'export':
+                messagebox.showinfo("Success", f"Results exported successfully to:\n{key[1]}")
+            elif key != self.student_service.data_file:
+                messagebox.showinfo("Success", f"Student data saved successfully to:\n{key}")
+        self.update_data_widgets()
+        current = writer.current()
+        self.status_var.set(f"{current}..." if current else ("" if writer.busy() else "All changes saved."))
+        self.root.after(200, self.poll_background)
+
+    def update_data_widgets(self):
+        # Handlers would block the Tk thread until the open finished, so their widgets wait instead
+        state = ['!disabled'] if self.student_service.is_open() else ['disabled']
+        for widget in self.data_widgets:
+            widget.state(state)
+
+    def data_widget(self, widget):
+        self.data_widgets.append(widget)
+        widget.state(['!disabled'] if self.student_service.is_open() else ['disabled'])
+        return widget
 
     def center_window(self):
         self.root.update_idletasks()
@@ -385,6 +3858,9 @@ class GUIApp:
     def handle_login(self, role, username, password):
         if self.user_manager.login(username, password, role):
             self.current_user = {"role": role, "username": username}
+            if not self.data_opened:
+                self.student_service.open_in_background()
+                self.data_opened = True
             if role == "faculty":
                 self.faculty_dashboard()
             elif role == "student":
@@ -400,13 +3876,63 @@ class GUIApp:
         
         ttk.Button(file_frame, text="Save Data", command=self.save_data_dialog).pack(side=tk.LEFT, padx=5)
         ttk.Button(file_frame, text="Load Data", command=self.load_data_dialog).pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_frame, text="Bulk Import", command=self.bulk_import_dialog).pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_frame, text="Export Results", command=self.export_dialog).pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(self.root, text="Add Student", command=self.add_student).pack(pady=5)
-        ttk.Button(self.root, text="Search Student", command=self.search_student).pack(pady=5)
-        ttk.Button(self.root, text="Delete Student", command=self.delete_student).pack(pady=5)
-        ttk.Button(self.root, text="Display Ranking", command=self.display_ranking).pack(pady=5)
-        ttk.Button(self.root, text="Display All Students", command=self.display_all_students).pack(pady=5)
-        ttk.Button(self.root, text="Logout", command=self.logout).pack(pady=10)
+        ttk.Label(self.root, textvariable=self.status_var).pack(side=tk.BOTTOM, pady=5)
+        body = ttk.Frame(self.root)
+        body.pack(fill=tk.BOTH, expand=True, padx=10)
+        actions = ttk.Frame(body)
+        actions.pack(side=tk.LEFT, anchor=tk.N)
+
+        self.data_widget(ttk.Button(actions, text="Add Student", command=self.add_student)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Search Student", command=self.search_student)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Update Marks", command=self.update_marks)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Delete Student", command=self.delete_student)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Display Ranking", command=self.display_ranking)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Display All Students", command=self.display_all_students)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Fee Summary", command=self.fee_summary)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Cohort Statistics", command=self.cohort_statistics)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Record Semester", command=self.record_semester)).pack(pady=5)
+        self.data_widget(ttk.Button(actions, text="Diagnostics", command=self.show_diagnostics)).pack(pady=5)
+        ttk.Button(actions, text="Logout", command=self.logout).pack(pady=10)
+
+        # Search-as-you-type by name: prefix matches first, then fuzzy ones
+        search_frame = ttk.Frame(body)
+        search_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(15, 0))
+        ttk.Label(search_frame, text="Find by name:").pack(anchor=tk.W)
+        self.name_search_var = tk.StringVar()
+        name_entry = self.data_widget(ttk.Entry(search_frame, textvariable=self.name_search_var))
+        name_entry.pack(fill=tk.X)
+        self.name_results = tk.Listbox(search_frame, height=12)
+        self.name_results.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.name_result_students = []
+        self.name_search_job = None
+        name_entry.bind("<KeyRelease>", self.schedule_name_search)
+        self.name_results.bind("<Double-Button-1>", self.show_name_result)
+
+    def schedule_name_search(self, event=None):
+        # Debounce so a burst of keystrokes runs a single lookup
+        if self.name_search_job is not None:
+            self.root.after_cancel(self.name_search_job)
+        self.name_search_job = self.root.after(150, self.run_name_search)
+
+    def run_name_search(self):
+        self.name_search_job = None
+        if not self.student_service.is_open():
+            # Keystrokes queued before a load started; look again once it is done
+            self.name_search_job = self.root.after(200, self.run_name_search)
+            return
+        self.name_results.delete(0, tk.END)
+        self.name_result_students = self.student_service.search_by_name(self.name_search_var.get())
+        for student in self.name_result_students:
+            self.name_results.insert(tk.END, f"{student.id} - {student.name} (CGPA {student.cgpa:.2f})")
+
+    def show_name_result(self, event=None):
+        selection = self.name_results.curselection()
+        if selection:
+            student = self.name_result_students[selection[0]]
+            messagebox.showinfo("Student Found", student.display_info())
 
     def student_dashboard(self):
         self.clear_screen()
@@ -414,69 +3940,82 @@ class GUIApp:
         ttk.Label(self.root, text="Enter Your Student ID:").pack()
         student_id_entry = ttk.Entry(self.root)
         student_id_entry.pack()
-        ttk.Button(
+        self.data_widget(ttk.Button(
             self.root,
             text="View Profile",
             command=lambda: self.view_profile(student_id_entry.get()),
-        ).pack(pady=10)
+        )).pack(pady=10)
         ttk.Button(self.root, text="Logout", command=self.logout).pack(pady=10)
 
     def save_data_dialog(self):
         # Ask for file path to save
         file_path = filedialog.asksaveasfilename(
             defaultextension=".pkl",
-            filetypes=[("Pickle files", "*.pkl"), ("All files", "*.*")],
+            filetypes=[("Pickle files", "*.pkl"), ("Columnar snapshots", "*.col"), ("SQLite databases", "*.db"),
+                       ("All files", "*.*")],
             title="Save student data to..."
         )
         
         if not file_path:  # User cancelled
             return
             
-        try:
-            # Prepare data for saving
-            students = []
-            self.student_service.student_bst.inorder(students)
-            data = {
-                'students': students,
-                'ranking': self.student_service.ranking_queue._data
-            }
-            
-            # Save using PersistenceManager
-            PersistenceManager.save_data(file_path, data)
-            self.data_file_path = file_path
-            messagebox.showinfo("Success", f"Student data saved successfully to:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save data: {str(e)}")
+        # Written in the background; poll_background reports the outcome
+        self.student_service.save_as(file_path)
+        self.data_file_path = file_path
 
     def load_data_dialog(self):
         # Ask for file path to load
         file_path = filedialog.askopenfilename(
-            filetypes=[("Pickle files", "*.pkl"), ("All files", "*.*")],
+            filetypes=[("Pickle files", "*.pkl"), ("Columnar snapshots", "*.col"), ("SQLite databases", "*.db"),
+                       ("All files", "*.*")],
             title="Select student data file to load"
         )
         
         if not file_path:  # User cancelled
             return
             
+        # Loaded in the background; poll_background reports the outcome
+        self.student_service.load_in_background(file_path)
+
+    def export_dialog(self):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl")],
+            title="Export results to..."
+        )
+        if not file_path:  # User cancelled
+            return
+        by_rank = messagebox.askyesnocancel("Export Order", "Export in rank order?\n(Choose No for ID order.)")
+        if by_rank is None:
+            return
         try:
-            # Clear current data
-            self.student_service = StudentService()
-            
-            # Load data
-            data = PersistenceManager.load_data(file_path)
-            if data:
-                for student in data.get('students', []):
-                    self.student_service.student_bst.insert(student)
-                for item in data.get('ranking', []):
-                    self.student_service.ranking_queue._data.append(item)
-                self.student_service.ranking_queue._data.sort(reverse=True)
-                
-                self.data_file_path = file_path
-                messagebox.showinfo("Success", f"Student data loaded successfully from:\n{file_path}")
-            else:
-                messagebox.showinfo("Info", "No valid student data found in the selected file.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load data: {str(e)}")
+            # Written in the background; poll_background reports the outcome
+            self.student_service.export_in_background(file_path, 'rank' if by_rank else 'id')
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+
+    def bulk_import_dialog(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Select results CSV to import"
+        )
+        if not file_path:  # User cancelled
+            return
+        # Runs on the writer thread; poll_background reports the outcome.
+        self.student_service.import_in_background(file_path)
+
+    def import_finished(self, file_path):
+        result = self.student_service.import_result(file_path)
+        if result is None:
+            return
+        added, errors = result
+        summary = f"Imported {added} student(s) from:\n{file_path}"
+        if errors:
+            summary += f"\n\n{len(errors)} row(s) skipped:\n"
+            summary += "\n".join(f"Line {line}: {message}" for line, message in errors[:20])
+            if len(errors) > 20:
+                summary += f"\n... and {len(errors) - 20} more"
+        messagebox.showinfo("Bulk Import", summary)
 
     def add_student(self):
         try:
@@ -506,6 +4045,7 @@ class GUIApp:
                 
             student = Student(student_id, name, marks, attendance)
             self.student_service.add_student(student)
+            messagebox.showinfo("Success", "Student added successfully.")
         except ValueError as ve:
             messagebox.showerror("Error", str(ve))
         except Exception as e:
@@ -517,28 +4057,136 @@ class GUIApp:
             return
         student = self.student_service.search_student(student_id)
         if student:
-            messagebox.showinfo("Student Found", student.display_info())
+            messagebox.showinfo("Student Found", student.display_info() + self.semester_history(student_id))
         else:
             messagebox.showinfo("Info", f"Student with ID {student_id} not found.")
 
-    def delete_student(self):
-        student_id = simpledialog.askinteger("Input", "Enter Student ID to delete:", parent=self.root, minvalue=1)
+    def update_marks(self):
+        student_id = simpledialog.askinteger("Input", "Enter Student ID to update marks:", parent=self.root, minvalue=1)
         if student_id is None:
             return
-        self.student_service.remove_student(student_id)
+        student = self.student_service.search_student(student_id)
+        if student is None:
+            messagebox.showinfo("Info", f"Student with ID {student_id} not found.")
+            return
+        marks = []
+        for i in range(len(student.marks)):
+            mark = simpledialog.askfloat("Input", f"Enter corrected marks for subject {i + 1} (0-100):", parent=self.root, minvalue=0, maxvalue=100, initialvalue=round(student.marks[i], 2))
+            if mark is None:
+                return
+            marks.append(mark)
+        try:
+            student = self.student_service.update_marks(student_id, marks)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        messagebox.showinfo("Success", f"Marks updated. New CGPA: {student.cgpa}")
+
+    def delete_student(self):
+        ids_text = simpledialog.askstring("Input", "Enter Student ID(s) to delete (comma-separated):", parent=self.root)
+        if not ids_text:
+            return
+        try:
+            student_ids = [int(part) for part in ids_text.replace(',', ' ').split()]
+        except ValueError:
+            messagebox.showerror("Error", "Student IDs must be whole numbers.")
+            return
+        try:
+            if len(student_ids) == 1:
+                self.student_service.remove_student(student_ids[0])
+                message = f"Student with ID {student_ids[0]} deleted successfully."
+            else:
+                removed = self.student_service.remove_students(student_ids)
+                message = f"Deleted {removed} student records."
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        messagebox.showinfo("Success", message)
 
     def display_ranking(self):
-        self.student_service.display_ranking()
+        if not self.student_service.student_count():
+            messagebox.showinfo("Info", "No students available for ranking.")
+            return
+        StudentTable(self.root, self.student_service, "Student Ranking (by CGPA Descending)", sort_by="cgpa", descending=True)
 
     def display_all_students(self):
-        self.student_service.display_all_students()
+        if not self.student_service.student_count():
+            messagebox.showinfo("Info", "No student records to display.")
+            return
+        StudentTable(self.root, self.student_service, "All Student Records", sort_by="id")
+
+    def fee_summary(self):
+        summary = self.student_service.fee_summary()
+        lines = ["=== Fee Slab Summary ==="]
+        for label, count in summary['slabs'].items():
+            lines.append(f"{label}: {count}")
+        lines.append(f"Eligible: {summary['eligible']}")
+        lines.append(f"Not eligible: {summary['ineligible']}")
+        if summary['fee_exposure'] is None:
+            lines.append(f"Total fee exposure: set slab fees in {FeeSlabCalculator.SETTINGS_FILE} to see it")
+        else:
+            lines.append(f"Total fee exposure: {summary['fee_exposure']:,.2f}")
+        messagebox.showinfo("Fee Summary", "\n".join(lines))
+
+    def cohort_statistics(self):
+        stats = self.student_service.cohort_statistics()
+        if not stats['count']:
+            messagebox.showinfo("Info", "No student records to summarize.")
+            return
+        q1, q3 = stats['cgpa_quartiles']
+        lines = ["=== Cohort Statistics ===",
+                 f"Students: {stats['count']}",
+                 f"CGPA mean: {stats['cgpa_mean']:.2f} (std dev {stats['cgpa_stdev']:.2f})",
+                 f"CGPA median: {stats['cgpa_median']:.2f} (quartiles {q1:.2f} - {q3:.2f})",
+                 f"Attendance mean: {stats['attendance_mean']:.1f}% (std dev {stats['attendance_stdev']:.1f})",
+                 "", "CGPA distribution:"]
+        for low, high, count in stats['cgpa_histogram']:
+            if count:
+                lines.append(f"{low:4.1f} - {high:4.1f}: {count}")
+        lines.append("")
+        for number, (count, mean, stdev) in enumerate(stats['subjects'], start=1):
+            if count:
+                lines.append(f"Subject {number}: mean {mean:.1f}, std dev {stdev:.1f} ({count} students)")
+        messagebox.showinfo("Cohort Statistics", "\n".join(lines))
+
+    def show_diagnostics(self):
+        DiagnosticsPanel(self.root, self.student_service)
+
+    def record_semester(self):
+        semester = simpledialog.askstring("Input", "Name of the semester to record (e.g. Semester 3):", parent=self.root)
+        if not semester:
+            return
+        try:
+            results = self.student_service.record_semester(semester)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        message = f"{results.semester} recorded: {len(results)} students"
+        if len(self.student_service.semesters()) > 1:
+            message += f", {results.changed} changed since the previous semester"
+        messagebox.showinfo("Success", message + ".")
+
+    def semester_history(self, student_id) -> str:
+        # CGPA trend and rank per recorded semester, appended to profile views
+        trend = self.student_service.cgpa_trend(student_id)
+        if not trend:
+            return ""
+        lines = ["", "", "Semester history:"]
+        for semester, cgpa, rank in trend:
+            lines.append(f"{semester}: CGPA {cgpa:.2f}, rank {rank}")
+        return "\n".join(lines)
 
     def view_profile(self, student_id_str):
         try:
             student_id = int(student_id_str)
             student = self.student_service.search_student(student_id)
             if student:
-                messagebox.showinfo("Profile", student.display_info())
+                info = student.display_info()
+                ranking = self.student_service.get_rank(student_id)
+                if ranking:
+                    rank, percentile, total = ranking
+                    info += f"\nRank: {rank} of {total}\nPercentile: {percentile}"
+                messagebox.showinfo("Profile", info + self.semester_history(student_id))
             else:
                 messagebox.showinfo("Info", f"Student with ID {student_id} not found.")
         except ValueError:
@@ -549,6 +4197,7 @@ class GUIApp:
         self.create_welcome_screen()
 
     def clear_screen(self):
+        self.data_widgets = []
         for widget in self.root.winfo_children():
             widget.destroy()
 
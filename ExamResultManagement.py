@@ -1,4 +1,13 @@
+import csv
+import heapq
+import itertools
+import json
+import math
+import os
 import pickle
+import time
+import service_metrics
+from service_metrics import Metrics, timed
 
 class FeeSlabCalculator:
     @staticmethod
@@ -19,15 +28,25 @@ class DataValidator:
 
     @staticmethod
     def validate_attendance(attendance: float) -> bool:
-        return 0 <= attendance <= 100
+        return math.isfinite(attendance) and 0 <= attendance <= 100
 
     @staticmethod
     def validate_marks(marks: list) -> bool:
+        if not marks:
+            return False
         for mark in marks:
-            if mark < 0 or mark > 100:
+            if not math.isfinite(mark) or mark < 0 or mark > 100:
                 return False
         return True
 
+    @staticmethod
+    def validate_name(name: str) -> bool:
+        return isinstance(name, str) and name.replace(" ", "").isalpha()
+
+    @staticmethod
+    def validate_id(student_id) -> bool:
+        return isinstance(student_id, int) and student_id > 0
+
 class Student:
     """
     Represents a student with basic academic details.
@@ -63,130 +82,451 @@ class BSTNode:
         self.student = student
         self.left = None
         self.right = None
+        self.height = 1
 
 class StudentBST:
     """
-    A simple Binary Search Tree for managing student records.
+    A self-balancing (AVL) Binary Search Tree for managing student records.
+    Insert, search and delete are iterative, so sequential IDs keep the tree
+    at O(log n) height and never hit Python's recursion limit.
     """
     def __init__(self):
         self.root = None
 
-    def insert(self, student: Student):
-        self.root = self._insert_rec(self.root, student)
+    @classmethod
+    def from_sorted(cls, students: list) -> "StudentBST":
+        """Build a balanced tree in O(n) from students sorted by ascending ID."""
+        for i in range(1, len(students)):
+            if students[i - 1].id >= students[i].id:
+                raise ValueError(f"Students must be sorted by unique ID (found {students[i].id} after {students[i - 1].id}).")
+        tree = cls()
+        if not students:
+            return tree
+        # Each stack entry is (lo, hi, parent, is_left); the midpoint of the
+        # range becomes the subtree root, so a range of m nodes has height
+        # m.bit_length() and sibling heights never differ by more than one.
+        stack = [(0, len(students) - 1, None, False)]
+        while stack:
+            lo, hi, parent, is_left = stack.pop()
+            mid = (lo + hi) // 2
+            node = BSTNode(students[mid])
+            node.height = (hi - lo + 1).bit_length()
+            if parent is None:
+                tree.root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+            if lo < mid:
+                stack.append((lo, mid - 1, node, True))
+            if mid < hi:
+                stack.append((mid + 1, hi, node, False))
+        return tree
 
-    def _insert_rec(self, node: BSTNode, student: Student) -> BSTNode:
-        if node is None:
-            return BSTNode(student)
-        if student.id < node.student.id:
-            node.left = self._insert_rec(node.left, student)
-        elif student.id > node.student.id:
-            node.right = self._insert_rec(node.right, student)
+    def insert(self, student: Student):
+        if self.root is None:
+            self.root = BSTNode(student)
+            return True
+        path = []
+        node = self.root
+        while node is not None:
+            if student.id == node.student.id:
+                print(f"Student with id {student.id} already exists.")
+                return False
+            path.append(node)
+            node = node.left if student.id < node.student.id else node.right
+        parent = path[-1]
+        if student.id < parent.student.id:
+            parent.left = BSTNode(student)
         else:
-            print(f"Student with id {student.id} already exists.")
-        return node
+            parent.right = BSTNode(student)
+        self._rebalance_path(path)
+        return True
 
     def search(self, student_id: int) -> Student:
-        node = self._search_rec(self.root, student_id)
-        return node.student if node else None
-
-    def _search_rec(self, node: BSTNode, student_id: int) -> BSTNode:
-        if node is None or node.student.id == student_id:
-            return node
-        if student_id < node.student.id:
-            return self._search_rec(node.left, student_id)
-        else:
-            return self._search_rec(node.right, student_id)
+        node = self.root
+        while node is not None:
+            if student_id == node.student.id:
+                return node.student
+            node = node.left if student_id < node.student.id else node.right
+        return None
 
     def delete(self, student_id: int):
-        self.root = self._delete_rec(self.root, student_id)
-
-    def _delete_rec(self, node: BSTNode, student_id: int) -> BSTNode:
+        path = []
+        node = self.root
+        while node is not None and node.student.id != student_id:
+            path.append(node)
+            node = node.left if student_id < node.student.id else node.right
         if node is None:
             print(f"Student with id {student_id} not found.")
-            return node
-        if student_id < node.student.id:
-            node.left = self._delete_rec(node.left, student_id)
-        elif student_id > node.student.id:
-            node.right = self._delete_rec(node.right, student_id)
-        else:
-            if node.left is None:
-                return node.right
-            elif node.right is None:
-                return node.left
-            min_student = self._min_value(node.right)
-            node.student = min_student
-            node.right = self._delete_rec(node.right, min_student.id)
-        return node
-
-    def _min_value(self, node: BSTNode) -> Student:
-        current = node
-        while current.left is not None:
-            current = current.left
-        return current.student
+            return
+        if node.left is not None and node.right is not None:
+            # Copy the in-order successor up, then unlink the successor instead.
+            path.append(node)
+            successor = node.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            node.student = successor.student
+            node = successor
+        child = node.left if node.left is not None else node.right
+        self._replace_child(path[-1] if path else None, node, child)
+        self._rebalance_path(path)
+
+    def iter_inorder(self):
+        """Lazily yield students in ascending ID order, holding only an O(height) stack."""
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.student
+            node = node.right
 
     def inorder(self, students: list):
-        self._inorder_rec(self.root, students)
+        students.extend(self.iter_inorder())
+
+    def height(self) -> int:
+        return self.root.height if self.root else 0
+
+    def _replace_child(self, parent: BSTNode, old: BSTNode, new: BSTNode):
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def _rebalance_path(self, path: list):
+        """Walk back up an insert/delete path fixing heights and rotating."""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node.height
+            subtree = self._rebalance(node)
+            if subtree is not node:
+                self._replace_child(path[i - 1] if i > 0 else None, node, subtree)
+            elif node.height == old_height:
+                break
+
+    @staticmethod
+    def _height(node: BSTNode) -> int:
+        return node.height if node else 0
+
+    def _update(self, node: BSTNode):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+
+    def _rebalance(self, node: BSTNode) -> BSTNode:
+        self._update(node)
+        balance = self._height(node.left) - self._height(node.right)
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
 
-    def _inorder_rec(self, node: BSTNode, students: list):
-        if node:
-            self._inorder_rec(node.left, students)
-            students.append(node.student)
-            self._inorder_rec(node.right, students)
+    def _rotate_left(self, node: BSTNode) -> BSTNode:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_right(self, node: BSTNode) -> BSTNode:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
 
 class MaxHeap:
     """
     Custom Max Heap implementation using an array.
     Each element is a tuple: (cgpa, -student_id, student)
     This ensures that the student with the highest CGPA and then smallest ID comes first.
+    A position map from student ID to heap slot makes remove and update O(log n).
     """
     def __init__(self):
         self._data = []
+        self._pos = {}
+        self._sorted = None
+
+    def __len__(self):
+        return len(self._data)
+
+    def build(self, elements: list):
+        """Replace the heap contents with elements, heapifying bottom-up in O(n)."""
+        self._data = list(elements)
+        self._pos = {}
+        self._sorted = None
+        for i, element in enumerate(self._data):
+            if element[2].id in self._pos:
+                raise ValueError(f"Student with ID {element[2].id} is already ranked.")
+            self._pos[element[2].id] = i
+        for i in range(len(self._data) // 2 - 1, -1, -1):
+            self._heapify_down(i)
 
     def insert(self, element: tuple):
         """Insert an element into the heap."""
+        student_id = element[2].id
+        if student_id in self._pos:
+            raise ValueError(f"Student with ID {student_id} is already ranked.")
         self._data.append(element)
+        self._pos[student_id] = len(self._data) - 1
+        self._sorted = None
         self._heapify_up(len(self._data) - 1)
 
     def remove(self, student_id: int):
-        """Remove an element from the heap by matching student_id."""
-        index = None
-        for i, (_, neg_id, student) in enumerate(self._data):
-            if student.id == student_id:
-                index = i
-                break
+        """Remove an element from the heap by student_id using the position map."""
+        index = self._pos.pop(student_id, None)
         if index is None:
-            return  # Student not found in the heap
-        self._data[index] = self._data[-1]
-        self._data.pop()
+            return
+        self._sorted = None
+        last = self._data.pop()
         if index < len(self._data):
+            self._data[index] = last
+            self._pos[last[2].id] = index
             self._heapify_down(index)
             self._heapify_up(index)
 
+    def update(self, student_id: int, new_cgpa: float):
+        """Re-rank a student whose CGPA changed."""
+        index = self._pos.get(student_id)
+        if index is None:
+            raise KeyError(student_id)
+        _, neg_id, student = self._data[index]
+        self._data[index] = (new_cgpa, neg_id, student)
+        self._sorted = None
+        self._heapify_up(index)
+        self._heapify_down(self._pos[student_id])
+
     def sorted_elements(self) -> list:
         """
         Return a list of elements sorted in descending order
         without modifying the underlying heap.
         """
-        return sorted(self._data, reverse=True)
+        return list(self._sorted_view())
+
+    def top_k(self, k: int) -> list:
+        """
+        Return the k highest-ranked elements in descending order.
+        Without a cached sorted view this walks the heap best-first from the
+        root, touching O(k) slots for O(k log k) work instead of a full sort.
+        """
+        if k <= 0:
+            return []
+        if self._sorted is not None:
+            return self._sorted[:k]
+        return list(itertools.islice(self.iter_ranked(), k))
+
+    def iter_ranked(self):
+        """
+        Lazily yield elements in descending order without modifying the heap.
+        Walks the heap best-first from the root, so the frontier only holds
+        children of elements already yielded.
+        """
+        data = self._data
+        frontier = [(-data[0][0], -data[0][1], 0)] if data else []
+        while frontier:
+            index = heapq.heappop(frontier)[2]
+            yield data[index]
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(data):
+                    heapq.heappush(frontier, (-data[child][0], -data[child][1], child))
+
+    def ranking_page(self, offset: int, limit: int) -> list:
+        """
+        Return elements ranked offset+1 .. offset+limit (a page of the ranking).
+        Pages near the top are served by top_k; deeper pages sort once and
+        reuse that sorted view until the heap changes.
+        """
+        if offset < 0 or limit <= 0:
+            return []
+        end = offset + limit
+        if self._sorted is None and end * end <= len(self._data):
+            return self.top_k(end)[offset:]
+        return self._sorted_view()[offset:end]
+
+    def _sorted_view(self) -> list:
+        if self._sorted is None:
+            self._sorted = sorted(self._data, key=lambda e: (e[0], e[1]), reverse=True)
+        return self._sorted
+
+    @staticmethod
+    def _higher(a: tuple, b: tuple) -> bool:
+        return a[0] > b[0] or (a[0] == b[0] and a[1] > b[1])
 
     def _heapify_up(self, index: int):
-        parent = (index - 1) // 2
-        if index > 0 and self._data[index] > self._data[parent]:
-            self._data[index], self._data[parent] = self._data[parent], self._data[index]
-            self._heapify_up(parent)
+        data, pos = self._data, self._pos
+        element = data[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if not self._higher(element, data[parent]):
+                break
+            data[index] = data[parent]
+            pos[data[index][2].id] = index
+            index = parent
+        data[index] = element
+        pos[element[2].id] = index
 
     def _heapify_down(self, index: int):
-        size = len(self._data)
-        largest = index
-        left = 2 * index + 1
-        right = 2 * index + 2
-        if left < size and self._data[left] > self._data[largest]:
-            largest = left
-        if right < size and self._data[right] > self._data[largest]:
-            largest = right
-        if largest != index:
-            self._data[index], self._data[largest] = self._data[largest], self._data[index]
-            self._heapify_down(largest)
+        data, pos = self._data, self._pos
+        size = len(data)
+        element = data[index]
+        while True:
+            largest = 2 * index + 1
+            if largest >= size:
+                break
+            right = largest + 1
+            if right < size and self._higher(data[right], data[largest]):
+                largest = right
+            if not self._higher(data[largest], element):
+                break
+            data[index] = data[largest]
+            pos[data[index][2].id] = index
+            index = largest
+        data[index] = element
+        pos[element[2].id] = index
+
+class StudentCSVImporter:
+    """
+    Streams a results CSV in fixed-size chunks and validates every row with
+    DataValidator. Bad rows are reported with their line number and skipped;
+    they never abort the run. The header must name id, name and attendance
+    columns; every other column is read as one subject's marks (blank cells
+    are skipped, so students can have different subject counts).
+    """
+    REQUIRED_COLUMNS = ('id', 'name', 'attendance')
+
+    def __init__(self, chunk_size: int = 5000):
+        self.chunk_size = chunk_size
+
+    def read(self, filename: str, existing_ids=None):
+        """
+        Return (students sorted by ID, [(line number, error message), ...]).
+        existing_ids, if given, is called with each ID to reject duplicates.
+        """
+        students = []
+        errors = []
+        seen = set()
+        with open(filename, newline='', encoding='utf-8-sig') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return students, [(1, "File is empty.")]
+            columns = [column.strip().lower() for column in header]
+            missing = [name for name in self.REQUIRED_COLUMNS if name not in columns]
+            if missing:
+                return students, [(1, f"Missing column(s): {', '.join(missing)}")]
+            for chunk in self._chunks(reader):
+                for line_no, row in chunk:
+                    try:
+                        student = self.parse_row(row, columns)
+                        if student.id in seen or (existing_ids is not None and existing_ids(student.id)):
+                            raise ValueError(f"Student with ID {student.id} already exists.")
+                        seen.add(student.id)
+                        students.append(student)
+                    except ValueError as ve:
+                        errors.append((line_no, str(ve)))
+        students.sort(key=lambda s: s.id)
+        return students, errors
+
+    def parse_row(self, row: list, columns: list) -> Student:
+        if len(row) > len(columns):
+            raise ValueError("Row has more cells than the header.")
+        values = dict(zip(columns, (cell.strip() for cell in row)))
+        try:
+            student_id = int(values.get('id', ''))
+        except ValueError:
+            raise ValueError(f"Invalid student ID: {values.get('id', '')!r}")
+        try:
+            attendance = float(values.get('attendance', ''))
+            marks = [float(values[column]) for column in columns
+                     if column not in self.REQUIRED_COLUMNS and values.get(column)]
+        except ValueError:
+            raise ValueError("Marks and attendance must be numbers.")
+        if not marks:
+            raise ValueError("At least one subject mark is required.")
+        name = values.get('name', '')
+        if not DataValidator.validate_id(student_id):
+            raise ValueError("Invalid student ID")
+        if not DataValidator.validate_name(name):
+            raise ValueError("Invalid student name")
+        if not DataValidator.validate_marks(marks):
+            raise ValueError("Invalid marks - must be between 0 and 100")
+        if not DataValidator.validate_attendance(attendance):
+            raise ValueError("Invalid attendance - must be between 0 and 100")
+        return Student(student_id, name, marks, attendance)
+
+    def _chunks(self, reader):
+        chunk = []
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            chunk.append((reader.line_num, row))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+class StudentExporter:
+    """
+    Streams students to CSV or JSON Lines one record at a time, so memory
+    stays flat however large the cohort. The format follows the file
+    extension (.csv or .jsonl); rows go to a temp file that is renamed into
+    place once complete, so a reader never sees a partial export.
+    """
+    FIELDS = ('rank', 'id', 'name', 'cgpa', 'attendance', 'fee_slab', 'eligible', 'marks')
+    FORMATS = ('.csv', '.jsonl')
+
+    @classmethod
+    def format_of(cls, filename: str) -> str:
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in cls.FORMATS:
+            raise ValueError(f"Unsupported export format {extension!r}; use .csv or .jsonl")
+        return extension
+
+    def write(self, filename: str, rows) -> int:
+        """Write (rank, student) pairs from the iterable rows; returns the number written."""
+        file_format = self.format_of(filename)
+        count = 0
+        temp_file = filename + '.tmp'
+        with open(temp_file, 'w', newline='', encoding='utf-8') as file:
+            if file_format == '.csv':
+                writer = csv.writer(file)
+                writer.writerow(self.FIELDS)
+                for rank, student in rows:
+                    record = self.record(rank, student)
+                    record['marks'] = ";".join(str(mark) for mark in record['marks'])
+                    writer.writerow(record.values())
+                    count += 1
+            else:
+                for rank, student in rows:
+                    file.write(json.dumps(self.record(rank, student)) + "\n")
+                    count += 1
+        os.replace(temp_file, filename)
+        return count
+
+    @staticmethod
+    def record(rank, student) -> dict:
+        return {
+            'rank': rank,
+            'id': student.id,
+            'name': student.name,
+            'cgpa': round(student.cgpa, 2),
+            'attendance': float(student.attendance),
+            'fee_slab': student.fee_slab,
+            'eligible': student.is_eligible(),
+            'marks': [round(float(mark), 2) for mark in student.marks],
+        }
 
 class StudentService:
     """
@@ -196,32 +536,139 @@ class StudentService:
     def __init__(self):
         self.student_bst = StudentBST()
         self.ranking_queue = MaxHeap()
+        self.metrics = Metrics()
 
+    @timed
     def add_student(self, student: Student):
-        self.student_bst.insert(student)
+        if not self.student_bst.insert(student):
+            return False
         # Insert into max heap with key (cgpa, -student.id, student)
         self.ranking_queue.insert((student.cgpa, -student.id, student))
+        return True
 
+    @timed
+    def add_students(self, students) -> int:
+        """
+        Add a batch of students all-or-nothing. Every record is checked for
+        duplicate IDs (within the batch and against existing records) before
+        anything changes. Small batches are then inserted one by one; large
+        ones are merged in ID order and the BST and heap rebuilt in O(n)
+        (bottom-up heapify). Raises ValueError listing every problem and
+        returns the number of students added.
+        """
+        students = sorted(students, key=lambda s: s.id)
+        problems = []
+        seen = set()
+        for student in students:
+            if student.id in seen or self.student_bst.search(student.id) is not None:
+                problems.append(f"Student with ID {student.id} already exists.")
+            seen.add(student.id)
+        if problems:
+            raise ValueError("\n".join(problems))
+        total = self._count() + len(students)
+        if self._prefer_incremental(len(students), total):
+            for student in students:
+                self.add_student(student)
+        elif students:
+            existing = []
+            self.student_bst.inorder(existing)
+            self._rebuild(list(heapq.merge(existing, students, key=lambda s: s.id)))
+        return len(students)
+
+    @timed
+    def remove_students(self, student_ids) -> int:
+        """
+        Remove a batch of students all-or-nothing: if any ID is unknown a
+        ValueError names them and nothing is removed. Returns the number of
+        students removed.
+        """
+        student_ids = sorted(set(student_ids))
+        missing = [str(sid) for sid in student_ids if self.student_bst.search(sid) is None]
+        if missing:
+            raise ValueError(f"Student(s) not found: {', '.join(missing)}")
+        if self._prefer_incremental(len(student_ids), self._count()):
+            for student_id in student_ids:
+                self.remove_student(student_id)
+        elif student_ids:
+            doomed = set(student_ids)
+            existing = []
+            self.student_bst.inorder(existing)
+            self._rebuild([s for s in existing if s.id not in doomed])
+        return len(student_ids)
+
+    @timed
+    def import_csv(self, filename: str):
+        """
+        Stream students from a CSV file and add every valid row in one
+        batched pass. Returns (number added, [(line number, error), ...]).
+        """
+        students, errors = StudentCSVImporter().read(filename, lambda sid: self.student_bst.search(sid) is not None)
+        return self.add_students(students), errors
+
+    @timed
+    def export(self, filename: str, order: str = 'id') -> int:
+        """
+        Stream every student to filename (.csv or .jsonl) in 'id' or 'rank'
+        order, one record at a time. Ranks are filled in for rank order only;
+        this service keeps no rank index to look them up by ID. Returns the
+        number of students exported.
+        """
+        if order == 'rank':
+            rows = ((rank, entry[2]) for rank, entry in enumerate(self.ranking_queue.iter_ranked(), start=1))
+        elif order == 'id':
+            rows = ((None, student) for student in self.student_bst.iter_inorder())
+        else:
+            raise ValueError(f"Unknown export order {order!r}; use 'id' or 'rank'")
+        return StudentExporter().write(filename, rows)
+
+    def diagnostics(self) -> dict:
+        """Operation latencies, persistence timings and structure sizes as a JSON-serialisable dict."""
+        return {
+            'state': {'students': self._count(), 'tree_height': self.student_bst.height(),
+                      'heap_size': len(self.ranking_queue)},
+            'service': self.metrics.as_dict(),
+            'persistence': PersistenceManager.metrics.as_dict(),
+        }
+
+    def _count(self) -> int:
+        return len(self.ranking_queue)
+
+    @staticmethod
+    def _prefer_incremental(batch: int, total: int) -> bool:
+        """True when batch O(log n) updates beat an O(n) rebuild."""
+        return batch * max(total.bit_length(), 1) < total
+
+    def _rebuild(self, students: list):
+        """Rebuild the BST and heap from ID-sorted students in O(n)."""
+        self.student_bst = StudentBST.from_sorted(students)
+        self.ranking_queue = MaxHeap()
+        self.ranking_queue.build([(s.cgpa, -s.id, s) for s in students])
+
+    @timed
     def search_student(self, student_id: int) -> Student:
         return self.student_bst.search(student_id)
 
+    @timed
     def remove_student(self, student_id: int):
         self.student_bst.delete(student_id)
         self.ranking_queue.remove(student_id)
 
-    def display_ranking(self):
-        sorted_ranking = self.ranking_queue.sorted_elements()
+    @timed
+    def display_ranking(self, limit: int = None):
+        if limit is None:
+            sorted_ranking = self.ranking_queue.sorted_elements()
+        else:
+            sorted_ranking = self.ranking_queue.top_k(limit)
         if not sorted_ranking:
             print("No students available for ranking.")
             return
         print("\n=== Student Ranking (by CGPA Descending) ===")
-        rank = 1
-        for cgpa, neg_id, student in sorted_ranking:
+        for rank, (cgpa, neg_id, student) in enumerate(sorted_ranking, start=1):
             print(f"Rank {rank}:")
             student.display_info()
             print("---------------------------")
-            rank += 1
 
+    @timed
     def display_all_students(self):
         students = []
         self.student_bst.inorder(students)
@@ -234,11 +681,18 @@ class StudentService:
             print("---------------------------")
 
 class PersistenceManager:
+    metrics = Metrics()
+
     @staticmethod
     def save_students(students: list, filename: str):
         try:
-            with open(filename, 'wb') as file:
-                pickle.dump(students, file)
+            with PersistenceManager.metrics.timer('save_students'):
+                with open(filename, 'wb') as file:
+                    pickle.dump(students, file)
+            size = os.path.getsize(filename)
+            PersistenceManager.metrics.count('saves')
+            PersistenceManager.metrics.count('bytes_written', size)
+            PersistenceManager.metrics.set_gauge('last_save_bytes', size)
             print("Students saved successfully.")
         except Exception as e:
             print("Error saving students:", e)
@@ -247,8 +701,12 @@ class PersistenceManager:
     def load_students(filename: str) -> list:
         students = []
         try:
+            start = time.perf_counter()
             with open(filename, 'rb') as file:
                 students = pickle.load(file)
+            elapsed = time.perf_counter() - start
+            PersistenceManager.metrics.record('load_students', elapsed)
+            PersistenceManager.metrics.set_gauge('last_load_seconds', elapsed)
             print("Students loaded successfully.")
         except Exception as e:
             print("Error loading students:", e)
@@ -264,13 +722,14 @@ def create_student():
             mark = float(input(f"Enter marks for subject {i+1}: "))
             marks.append(mark)
         attendance = float(input("Enter Attendance percentage: "))
+        # Check the inputs before grading them: no marks would divide by zero.
+        if not DataValidator.validate_marks(marks):
+            raise ValueError("Invalid marks detected.")
+        if not DataValidator.validate_attendance(attendance):
+            raise ValueError("Invalid attendance value.")
         student = Student(student_id, name, marks, attendance)
         if not DataValidator.validate_cgpa(student.cgpa):
             raise ValueError("Invalid CGPA value.")
-        if not DataValidator.validate_attendance(student.attendance):
-            raise ValueError("Invalid attendance value.")
-        if not DataValidator.validate_marks(student.marks):
-            raise ValueError("Invalid marks detected.")
         return student
     except ValueError as ve:
         print("Error:", ve)
@@ -287,7 +746,10 @@ def main():
         print("5. Display All Records (Inorder Traversal)")
         print("6. Save All Records")
         print("7. Load Records")
-        print("8. Exit")
+        print("8. Bulk Import from CSV")
+        print("9. Export Results (CSV / JSON Lines)")
+        print("10. Diagnostics")
+        print("11. Exit")
         choice = input("Enter your choice: ")
         if not choice.isdigit():
             print("Invalid choice. Please enter a number.")
@@ -295,13 +757,17 @@ def main():
         choice = int(choice)
         if choice == 1:
             student = create_student()
-            if student is not None:
-                student_service.add_student(student)
+            if student is not None and student_service.add_student(student):
                 print("Student inserted successfully.")
         elif choice == 2:
-            student_id = int(input("Enter student ID to delete: "))
-            student_service.remove_student(student_id)
-            print("If existed, student record has been deleted.")
+            ids_text = input("Enter student ID(s) to delete (comma-separated): ")
+            try:
+                student_ids = [int(part) for part in ids_text.replace(',', ' ').split()]
+                removed = student_service.remove_students(student_ids)
+            except ValueError as e:
+                print("Error deleting students:", e)
+                continue
+            print(f"{removed} student record(s) deleted.")
         elif choice == 3:
             student_id = int(input("Enter student ID to search: "))
             found = student_service.search_student(student_id)
@@ -311,7 +777,11 @@ def main():
             else:
                 print(f"Student with id {student_id} not found.")
         elif choice == 4:
-            student_service.display_ranking()
+            limit = input("Show how many top students? (press Enter for all): ").strip()
+            if limit and not limit.isdigit():
+                print("Invalid number.")
+                continue
+            student_service.display_ranking(int(limit) if limit else None)
         elif choice == 5:
             student_service.display_all_students()
         elif choice == 6:
@@ -323,10 +793,48 @@ def main():
             filename = input("Enter filename to load records: ")
             loaded_students = PersistenceManager.load_students(filename)
             if loaded_students:
-                student_service = StudentService()
-                for student in loaded_students:
-                    student_service.add_student(student)
+                new_service = StudentService()
+                try:
+                    new_service.add_students(loaded_students)
+                except ValueError as e:
+                    print("Error loading students:", e)
+                    continue
+                student_service = new_service
         elif choice == 8:
+            filename = input("Enter CSV filename to import: ")
+            try:
+                added, errors = student_service.import_csv(filename)
+            except (OSError, ValueError) as e:
+                print("Error importing students:", e)
+                continue
+            print(f"Imported {added} student(s).")
+            for line, message in errors:
+                print(f"  Line {line}: {message}")
+            if errors:
+                print(f"{len(errors)} row(s) skipped.")
+        elif choice == 9:
+            filename = input("Enter export filename (.csv or .jsonl): ")
+            order = input("Order by 'id' or 'rank'? (press Enter for id): ").strip().lower() or 'id'
+            try:
+                exported = student_service.export(filename, order)
+            except (OSError, ValueError) as e:
+                print("Error exporting students:", e)
+                continue
+            print(f"Exported {exported} student(s) to {filename}.")
+        elif choice == 10:
+            print(service_metrics.format_report(student_service.diagnostics()))
+            if input("Profile the full ranking with cProfile? (y/N): ").strip().lower() == 'y':
+                _, report = service_metrics.profile_call(student_service.ranking_queue.sorted_elements)
+                print(report)
+            filename = input("Save diagnostics as JSON to (press Enter to skip): ").strip()
+            if filename:
+                try:
+                    service_metrics.dump(student_service.diagnostics(), filename)
+                except OSError as e:
+                    print("Error saving diagnostics:", e)
+                    continue
+                print(f"Diagnostics saved to {filename}.")
+        elif choice == 11:
             print("Exiting the system. Bye!")
             break
         else:
@@ -0,0 +1,62 @@
+"""
+Scaling benchmark for parallel CSV ingestion.
+
+Generates a seeded results CSV and times StudentCSVImporter with 1, 2, 4 ...
+worker processes (up to the core count), printing throughput and speedup
+over the single-process run.
+
+    python bench_ingest.py --rows 200000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from ExamResultManagamentSystemFinal import StudentCSVImporter
+
+
+def write_cohort(filename: str, rows: int, subjects: int = 5, seed: int = 42):
+    rng = random.Random(seed)
+    with open(filename, 'w', newline='') as f:
+        f.write('id,name,attendance,' + ','.join(f"subject{i + 1}" for i in range(subjects)) + '\n')
+        for student_id in range(1, rows + 1):
+            marks = ','.join(str(rng.randint(0, 100)) for _ in range(subjects))
+            f.write(f"{student_id},Student,{rng.randint(40, 100)},{marks}\n")
+
+
+def default_workers() -> list:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'cohort.csv')
+        write_cohort(filename, args.rows)
+        print(f"{args.rows} rows, {os.cpu_count()} cores, chunk size {args.chunk_size}")
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            students, errors = StudentCSVImporter(args.chunk_size, workers).read(filename)
+            elapsed = time.perf_counter() - start
+            if len(students) != args.rows or errors:
+                raise SystemExit(f"{workers} workers imported {len(students)} rows with {len(errors)} errors")
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {args.rows / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
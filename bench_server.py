@@ -0,0 +1,134 @@
+"""
+Local load generator for student_server.py.
+
+Seeds a cohort, starts the server in a subprocess and drives it over
+keep-alive connections with a mix of profile, rank and top-k reads plus an
+optional share of mark updates, then prints throughput and latency
+percentiles.
+
+    python bench_server.py --students 10000 --connections 32 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from ExamResultManagamentSystemFinal import Student, StudentService
+
+
+def seed_cohort(data_file: str, students: int, seed: int):
+    rng = random.Random(seed)
+    service = StudentService(data_file, journaled=False)
+    service.add_students(Student(student_id, "Student", [rng.randint(0, 100) for _ in range(5)],
+                                 rng.randint(40, 100))
+                         for student_id in range(1, students + 1))
+    service.save_data(wait=True)
+    service.close()
+
+
+async def wait_for_port(host: str, port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def request(reader, writer, method: str, path: str, body: dict = None):
+    data = json.dumps(body).encode() if body is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host: str, port: int, requests: int, students: int, write_ratio: float,
+                 rng: random.Random, latencies: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            student_id = rng.randint(1, students)
+            roll = rng.random()
+            start = time.perf_counter()
+            if roll < write_ratio:
+                status = await request(reader, writer, 'PUT', f"/students/{student_id}/marks",
+                                       {'marks': [rng.randint(0, 100) for _ in range(5)]})
+            elif roll < 0.45:
+                status = await request(reader, writer, 'GET', f"/students/{student_id}")
+            elif roll < 0.9:
+                status = await request(reader, writer, 'GET', f"/students/{student_id}/rank")
+            else:
+                status = await request(reader, writer, 'GET', "/ranking?k=10")
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(f"Server answered {status}")
+    finally:
+        writer.close()
+
+
+async def drive(host: str, port: int, args) -> tuple:
+    await wait_for_port(host, port)
+    latencies = []
+    per_client = args.requests // args.connections
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, per_client, args.students, args.write_ratio,
+                                  random.Random(args.seed + i), latencies)
+                           for i in range(args.connections)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--write-ratio', type=float, default=0.01)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    host = '127.0.0.1'
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'student_data.pkl')
+        seed_cohort(data_file, args.students, args.seed)
+        server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                'student_server.py'),
+                                   '--port', str(args.port), '--data-file', data_file],
+                                  stdout=subprocess.DEVNULL)
+        try:
+            elapsed, latencies = asyncio.run(drive(host, args.port, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+    def percentile(q):
+        return latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000
+
+    print(f"{len(latencies)} requests over {args.connections} connections, "
+          f"{args.students} students, {args.write_ratio:.0%} writes")
+    print(f"throughput {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency ms  p50 {percentile(0.5):.2f}  p95 {percentile(0.95):.2f}  "
+          f"p99 {percentile(0.99):.2f}  max {latencies[-1] * 1000:.2f}")
+
+
+if __name__ == '__main__':
+    main()
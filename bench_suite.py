@@ -0,0 +1,342 @@
+"""
+Benchmark suite for the StudentBST, MaxHeap, persistence and StudentService
+hot paths.
+
+Runs headless against seeded synthetic cohorts (1k, 10k, 100k and 1M
+students by default) and reports throughput and peak memory for each case.
+Results are compared with a stored baseline; any case that got slower or
+hungrier than the tolerance allows is listed and the run exits non-zero.
+The default tolerance is 30% (--tolerance 0.3): a case fails when its
+throughput falls below 70% of the baseline, or its peak memory grows past
+130% of the baseline plus MEMORY_SLACK. Timings only compare on the kind
+of machine the baseline was recorded on (see its 'python' and 'machine').
+
+    python bench_suite.py                         # compare with bench_baseline.json
+    python bench_suite.py --sizes 1000 10000      # a quick run
+    python bench_suite.py --save-baseline         # record a new baseline
+
+Throughput is the best of several runs, short cases repeating for at least
+half a second; peak memory is measured in a separate tracemalloc pass so
+tracing does not skew the timings.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ExamResultManagamentSystemFinal import (ColumnarSnapshot, MaxHeap, PersistenceManager, RankIndex,
+                                             Student, StudentBST, StudentService)
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+TOP_K = 10
+QUERIES = 1000
+# Short cases are re-run until they have taken MIN_SECONDS, at most MAX_RUNS times.
+MIN_SECONDS = 0.5
+MAX_RUNS = 25
+# Peak growth below this many bytes is noise, not a regression.
+MEMORY_SLACK = 64 * 1024
+
+
+def make_students(n: int, seed: int) -> list:
+    """n seeded students with IDs 1..n, five subjects each, in ID order."""
+    rng = random.Random(seed)
+    first = ('Asha', 'Ravi', 'Meera', 'Arjun', 'Kavya', 'Nikhil', 'Priya', 'Rahul')
+    last = ('Sharma', 'Iyer', 'Reddy', 'Khan', 'Das', 'Patel', 'Nair', 'Gupta')
+    return [Student(student_id, f"{rng.choice(first)} {rng.choice(last)}",
+                    [rng.randint(0, 100) for _ in range(5)], rng.randint(40, 100))
+            for student_id in range(1, n + 1)]
+
+
+def shuffled(items: list, seed: int) -> list:
+    items = list(items)
+    random.Random(seed).shuffle(items)
+    return items
+
+
+def ranked(students: list) -> list:
+    return [(student.cgpa, -student.id, student) for student in students]
+
+
+# Each case takes the cohort, a seed and a scratch directory, does its
+# untimed setup and returns (operations, run) or (operations, run, cleanup);
+# only run() is measured, and cleanup() is called after it.
+
+def bst_insert_sequential(students, seed, tmp):
+    bst = StudentBST()
+    def run():
+        for student in students:
+            bst.insert(student)
+    return len(students), run
+
+
+def bst_insert_random(students, seed, tmp):
+    bst = StudentBST()
+    order = shuffled(students, seed)
+    def run():
+        for student in order:
+            bst.insert(student)
+    return len(order), run
+
+
+def bst_search(students, seed, tmp):
+    bst = StudentBST.from_sorted(students)
+    ids = shuffled([student.id for student in students], seed)
+    def run():
+        for student_id in ids:
+            bst.search(student_id)
+    return len(ids), run
+
+
+def bst_delete(students, seed, tmp):
+    bst = StudentBST.from_sorted(students)
+    ids = shuffled([student.id for student in students], seed)
+    def run():
+        for student_id in ids:
+            bst.delete(student_id)
+    return len(ids), run
+
+
+def heap_insert(students, seed, tmp):
+    heap = MaxHeap()
+    elements = ranked(shuffled(students, seed))
+    def run():
+        for element in elements:
+            heap.insert(element)
+    return len(elements), run
+
+
+def heap_ranking(students, seed, tmp):
+    heap = MaxHeap()
+    heap.build(ranked(students))
+    return len(students), heap.sorted_elements
+
+
+def heap_top_k(students, seed, tmp):
+    heap = MaxHeap()
+    heap.build(ranked(students))
+    def run():
+        for _ in range(QUERIES):
+            heap.top_k(TOP_K)
+    return QUERIES, run
+
+
+def rank_lookup(students, seed, tmp):
+    index = RankIndex.from_students(students)
+    ids = shuffled([student.id for student in students], seed)[:QUERIES]
+    def run():
+        for student_id in ids:
+            index.rank(student_id)
+    return len(ids), run
+
+
+def _snapshot(students) -> dict:
+    return {'students': students, 'ranking': ranked(students)}
+
+
+def save_pickle(students, seed, tmp):
+    filename = os.path.join(tmp, 'bench.pkl')
+    data = _snapshot(students)
+    return len(students), lambda: PersistenceManager.save_snapshot(filename, data)
+
+
+def load_pickle(students, seed, tmp):
+    filename = os.path.join(tmp, 'bench.pkl')
+    PersistenceManager.save_snapshot(filename, _snapshot(students))
+    return len(students), lambda: PersistenceManager.load_snapshot(filename)
+
+
+def save_columnar(students, seed, tmp):
+    filename = os.path.join(tmp, 'bench' + ColumnarSnapshot.EXTENSION)
+    data = _snapshot(students)
+    return len(students), lambda: PersistenceManager.save_snapshot(filename, data)
+
+
+def load_columnar(students, seed, tmp):
+    filename = os.path.join(tmp, 'bench' + ColumnarSnapshot.EXTENSION)
+    PersistenceManager.save_snapshot(filename, _snapshot(students))
+    def run():
+        snapshot = ColumnarSnapshot(filename)
+        snapshot.students()
+        snapshot.close()
+    return len(students), run
+
+
+def _service_file(students, tmp) -> tuple:
+    """(data file, cleanup) in a directory of its own under tmp; the file holds students unless there are none."""
+    directory = tempfile.mkdtemp(dir=tmp)
+    filename = os.path.join(directory, 'bench.pkl')
+    if students:
+        PersistenceManager.save_snapshot(filename, _snapshot(students))
+    return filename, lambda: shutil.rmtree(directory)
+
+
+def _service(students, tmp) -> tuple:
+    """(StudentService over students, cleanup that closes it and removes its files)."""
+    filename, remove = _service_file(students, tmp)
+    service = StudentService(filename)
+    def cleanup():
+        service.close()
+        remove()
+    return service, cleanup
+
+
+def service_open(students, seed, tmp):
+    filename, cleanup = _service_file(students, tmp)
+    def run():
+        StudentService(filename).close()
+    return len(students), run, cleanup
+
+
+def service_add_batch(students, seed, tmp):
+    service, cleanup = _service([], tmp)
+    return len(students), lambda: service.add_students(students), cleanup
+
+
+def service_update_marks(students, seed, tmp):
+    service, cleanup = _service(students, tmp)
+    rng = random.Random(seed)
+    updates = [(student_id, [rng.randint(0, 100) for _ in range(5)])
+               for student_id in shuffled([student.id for student in students], seed)[:QUERIES]]
+    def run():
+        for student_id, marks in updates:
+            service.update_marks(student_id, marks)
+    return len(updates), run, cleanup
+
+
+def service_get_rank(students, seed, tmp):
+    service, cleanup = _service(students, tmp)
+    ids = shuffled([student.id for student in students], seed)[:QUERIES]
+    def run():
+        for student_id in ids:
+            service.get_rank(student_id)
+    return len(ids), run, cleanup
+
+
+def service_top_k(students, seed, tmp):
+    service, cleanup = _service(students, tmp)
+    def run():
+        for _ in range(QUERIES):
+            service.ranking(TOP_K)
+    return QUERIES, run, cleanup
+
+
+def service_export(students, seed, tmp):
+    service, cleanup = _service(students, tmp)
+    filename = os.path.join(tmp, 'bench.csv')
+    return len(students), lambda: service.export(filename, 'rank'), cleanup
+
+
+CASES = (bst_insert_sequential, bst_insert_random, bst_search, bst_delete, heap_insert, heap_ranking,
+         heap_top_k, rank_lookup, save_pickle, load_pickle, save_columnar, load_columnar,
+         service_open, service_add_batch, service_update_marks, service_get_rank, service_top_k, service_export)
+
+
+def time_case(case, students, seed, tmp, min_runs: int) -> float:
+    """Best operations per second over at least min_runs fresh runs, repeating short cases for MIN_SECONDS."""
+    best = float('inf')
+    runs = 0
+    spent = 0.0
+    while runs < min_runs or (spent < MIN_SECONDS and runs < MAX_RUNS):
+        operations, run, *cleanup = case(students, seed, tmp)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        for close in cleanup:
+            close()
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return operations / best
+
+
+def peak_memory(case, students, seed, tmp) -> int:
+    """Peak bytes allocated by one run, over what its setup already held."""
+    operations, run, *cleanup = case(students, seed, tmp)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        return tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+        for close in cleanup:
+            close()
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Human-readable regressions of results against baseline."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result['ops_per_sec'] < expected['ops_per_sec'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['ops_per_sec']:,.0f} ops/s, "
+                               f"baseline {expected['ops_per_sec']:,.0f} ops/s")
+        if result.get('peak_bytes') is not None and expected.get('peak_bytes') is not None \
+                and result['peak_bytes'] > expected['peak_bytes'] * (1 + tolerance) + MEMORY_SLACK:
+            regressions.append(f"{name}: peak {result['peak_bytes']:,} bytes, "
+                               f"baseline {expected['peak_bytes']:,} bytes")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--cases', nargs='+', choices=[case.__name__ for case in CASES],
+                        help="run only these cases")
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="write results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="allowed slowdown / memory growth before a case fails (default 0.3 = 30%%)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    cases = [case for case in CASES if not args.cases or case.__name__ in args.cases]
+    results = {}
+    print(f"{'case':<24} {'students':>9} {'ops/s':>13} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            students = make_students(n, args.seed)
+            min_runs = 3 if n <= 100000 else 1
+            for case in cases:
+                ops_per_sec = time_case(case, students, args.seed, tmp, min_runs)
+                peak = None if args.no_memory else peak_memory(case, students, args.seed, tmp)
+                results[f"{case.__name__}@{n}"] = {'ops_per_sec': ops_per_sec, 'peak_bytes': peak}
+                peak_text = '-' if peak is None else f"{peak / 2 ** 20:.1f}"
+                print(f"{case.__name__:<24} {n:>9} {ops_per_sec:>13,.0f} {peak_text:>9}", flush=True)
+            del students
+
+    if args.save_baseline:
+        baseline = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=1, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline['results'], args.tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    print(f"\nNo regressions against {os.path.basename(args.baseline)} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == '__main__':
+    main()
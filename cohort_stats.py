@@ -0,0 +1,224 @@
+"""
+Streaming statistics for a student cohort.
+
+Every structure here is updated one student at a time as records are added
+or removed, so summary queries never walk the cohort: mean and spread are
+O(1), histograms and quantiles O(bins). All of them can also be merged,
+which lets per-batch or per-section statistics be combined.
+"""
+import math
+
+
+class RunningStats:
+    """Count, mean and variance via Welford's method, extended to removals."""
+    __slots__ = ('count', 'mean', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def remove(self, value: float):
+        if self.count <= 1:
+            self.count = 0
+            self.mean = 0.0
+            self._m2 = 0.0
+            return
+        previous_mean = (self.count * self.mean - value) / (self.count - 1)
+        self._m2 = max(self._m2 - (value - previous_mean) * (value - self.mean), 0.0)
+        self.mean = previous_mean
+        self.count -= 1
+
+    def merge(self, other: "RunningStats"):
+        """Fold other into self (Chan et al. parallel update)."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Population variance."""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class FixedHistogram:
+    """Equal-width bins over [low, high]; out-of-range values land in the end bins."""
+    __slots__ = ('low', 'high', 'width', 'counts')
+
+    def __init__(self, low: float, high: float, bins: int):
+        self.low = low
+        self.high = high
+        self.width = (high - low) / bins
+        self.counts = [0] * bins
+
+    def _bin(self, value: float) -> int:
+        return min(max(int((value - self.low) / self.width), 0), len(self.counts) - 1)
+
+    def add(self, value: float):
+        self.counts[self._bin(value)] += 1
+
+    def remove(self, value: float):
+        self.counts[self._bin(value)] -= 1
+
+    def merge(self, other: "FixedHistogram"):
+        if (other.low, other.high, len(other.counts)) != (self.low, self.high, len(self.counts)):
+            raise ValueError("Histograms with different bins cannot be merged")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def bins(self) -> list:
+        """[(bin low, bin high, count), ...] from the lowest bin up."""
+        return [(self.low + i * self.width, self.low + (i + 1) * self.width, count)
+                for i, count in enumerate(self.counts)]
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles with bounded relative error (the DDSketch scheme).
+
+    Positive values are counted in logarithmically spaced buckets, so any
+    reported quantile lies within relative_accuracy of a true sample value.
+    Buckets are plain counters, which makes the sketch both mergeable and
+    able to forget a value; memory is O(log(max / min) / relative_accuracy)
+    regardless of cohort size. Values <= 0 share a single zero bucket.
+    """
+    __slots__ = ('relative_accuracy', '_gamma', '_log_gamma', '_buckets', '_zero', 'count')
+
+    def __init__(self, relative_accuracy: float = 0.005):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets = {}
+        self._zero = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self._zero += 1
+            return
+        key = self._key(value)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    def remove(self, value: float):
+        self.count -= 1
+        if value <= 0:
+            self._zero -= 1
+            return
+        key = self._key(value)
+        remaining = self._buckets[key] - 1
+        if remaining:
+            self._buckets[key] = remaining
+        else:
+            del self._buckets[key]
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches with different accuracies cannot be merged")
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self._zero += other._zero
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (0 <= q <= 1), or None when empty."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zero
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+
+class CohortStatistics:
+    """
+    Running CGPA, attendance and per-subject marks statistics for a cohort.
+    Feed it with add / discard as students come and go; discard must see
+    the student's values as they were when added.
+    """
+    CGPA_BINS = 20
+
+    def __init__(self):
+        self.cgpa = RunningStats()
+        self.cgpa_histogram = FixedHistogram(0.0, 10.0, self.CGPA_BINS)
+        self.cgpa_sketch = QuantileSketch()
+        self.attendance = RunningStats()
+        self.subjects = []
+
+    @classmethod
+    def from_students(cls, students) -> "CohortStatistics":
+        statistics = cls()
+        for student in students:
+            statistics.add(student)
+        return statistics
+
+    def __len__(self):
+        return self.cgpa.count
+
+    def add(self, student):
+        self.cgpa.add(student.cgpa)
+        self.cgpa_histogram.add(student.cgpa)
+        self.cgpa_sketch.add(student.cgpa)
+        self.attendance.add(student.attendance)
+        marks = student.marks
+        while len(self.subjects) < len(marks):
+            self.subjects.append(RunningStats())
+        for subject, mark in zip(self.subjects, marks):
+            subject.add(mark)
+
+    def discard(self, student):
+        self.cgpa.remove(student.cgpa)
+        self.cgpa_histogram.remove(student.cgpa)
+        self.cgpa_sketch.remove(student.cgpa)
+        self.attendance.remove(student.attendance)
+        for subject, mark in zip(self.subjects, student.marks):
+            subject.remove(mark)
+
+    def merge(self, other: "CohortStatistics"):
+        self.cgpa.merge(other.cgpa)
+        self.cgpa_histogram.merge(other.cgpa_histogram)
+        self.cgpa_sketch.merge(other.cgpa_sketch)
+        self.attendance.merge(other.attendance)
+        while len(self.subjects) < len(other.subjects):
+            self.subjects.append(RunningStats())
+        for subject, theirs in zip(self.subjects, other.subjects):
+            subject.merge(theirs)
+
+    def cgpa_quantiles(self, quantiles=(0.25, 0.5, 0.75)) -> dict:
+        return {q: self.cgpa_sketch.quantile(q) for q in quantiles}
+
+    def summary(self) -> dict:
+        """Dashboard summary in O(bins + subjects)."""
+        quartiles = self.cgpa_quantiles()
+        return {
+            'count': self.cgpa.count,
+            'cgpa_mean': self.cgpa.mean,
+            'cgpa_stdev': self.cgpa.stdev,
+            'cgpa_median': quartiles[0.5],
+            'cgpa_quartiles': (quartiles[0.25], quartiles[0.75]),
+            'cgpa_histogram': self.cgpa_histogram.bins(),
+            'attendance_mean': self.attendance.mean,
+            'attendance_stdev': self.attendance.stdev,
+            'subjects': [(subject.count, subject.mean, subject.stdev) for subject in self.subjects],
+        }
@@ -0,0 +1,170 @@
+"""
+Instrumentation for the student services.
+
+Metrics keeps a call count and latency histogram per operation, plain
+counters (saves, bytes written) and gauges (tree height, heap size, last
+load time). Recording is a perf_counter pair and a dict update, so it is
+always on. profile_call runs a single operation under cProfile when the
+histograms say something is slow but not why.
+"""
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+
+
+class LatencyHistogram:
+    """Latencies in power-of-two microsecond buckets: bucket b holds [2**(b-1), 2**b) us."""
+    __slots__ = ('count', 'total', 'maximum', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = {}
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the q-quantile."""
+        if not self.count:
+            return 0.0
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= q * self.count:
+                return min(2 ** bucket / 1e6, self.maximum)
+        return self.maximum
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total * 1000 / self.count if self.count else 0.0,
+            'p50_ms': self.quantile(0.5) * 1000,
+            'p95_ms': self.quantile(0.95) * 1000,
+            'p99_ms': self.quantile(0.99) * 1000,
+            'max_ms': self.maximum * 1000,
+            'buckets_us': {str(2 ** bucket): count for bucket, count in sorted(self.buckets.items())},
+        }
+
+
+class _Timer:
+    __slots__ = ('_metrics', '_name', '_start')
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self._metrics.record(self._name, time.perf_counter() - self._start)
+
+
+class Metrics:
+    """Thread-safe registry of per-operation latencies, counters and gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.latencies.get(name)
+            if histogram is None:
+                histogram = self.latencies[name] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def timer(self, name: str) -> _Timer:
+        """Context manager recording the time spent in its block under name."""
+        return _Timer(self, name)
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value):
+        self.gauges[name] = value
+
+    def reset(self):
+        with self._lock:
+            self.latencies.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                'operations': {name: histogram.as_dict() for name, histogram in sorted(self.latencies.items())},
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+            }
+
+
+def timed(method):
+    """Record every call of a method (and its failures) in self.metrics under the method's name."""
+    name = method.__name__.lstrip('_')
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        except Exception:
+            self.metrics.count(name + '.errors')
+            raise
+        finally:
+            self.metrics.record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def profile_call(function, *args, limit: int = 25, sort: str = 'cumulative', **kwargs):
+    """Run function(*args, **kwargs) under cProfile; returns (result, printable stats)."""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args, **kwargs)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).strip_dirs().sort_stats(sort).print_stats(limit)
+    return result, report.getvalue()
+
+
+def format_report(diagnostics: dict) -> str:
+    """Plain-text rendering of a diagnostics dict for the CLI and the GUI panel."""
+    lines = []
+    for section, values in diagnostics.items():
+        if not isinstance(values, dict):
+            lines.append(f"{section}: {values}")
+            continue
+        lines.append(f"== {section} ==")
+        operations = values.get('operations', {})
+        if operations:
+            lines.append(f"{'operation':<22}{'calls':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}")
+            for name, stats in operations.items():
+                lines.append(f"{name:<22}{stats['count']:>8}{stats['mean_ms']:>10.3f}"
+                             f"{stats['p95_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+        for group in ('counters', 'gauges'):
+            for name, value in values.get(group, {}).items():
+                lines.append(f"{name:<22}{value}")
+        for name, value in values.items():
+            if name not in ('operations', 'counters', 'gauges'):
+                lines.append(f"{name:<22}{value}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def dump(diagnostics: dict, filename: str):
+    """Write diagnostics as JSON for scripts and dashboards."""
+    with open(filename, 'w', encoding='utf-8') as file:
+        json.dump(diagnostics, file, indent=2, sort_keys=True)
@@ -0,0 +1,299 @@
+"""
+Headless HTTP/JSON query service for student results.
+
+Wraps a StudentService (or an SQLiteStudentService for .db files) in a
+small asyncio HTTP/1.1 server (keep-alive, JSON bodies) so a portal can
+look up students without the Tk GUI:
+
+    GET    /health                    cohort size
+    GET    /students/<id>             profile with rank
+    GET    /students/<id>/rank        rank, percentile and cohort size
+    GET    /ranking?k=10              top-k students, best first
+    GET    /ranking/<rank>            student holding a rank
+    POST   /students                  add {"id", "name", "marks", "attendance"}
+    PUT    /students/<id>/marks       replace marks {"marks": [...]}
+    DELETE /students/<id>             remove a student
+
+Reads are answered straight from the indexes, each in O(log n + k), on a
+small pool of reader threads: a read that waits on the service's read/write
+lock while an edit is applied holds up only its own connection, never the
+event loop. Writes are queued to a single writer task and applied one at a
+time on a worker thread, so a slow save never stalls the loop either.
+Malformed input (bad JSON, NaN or Infinity, a non-numeric Content-Length,
+marks or attendance the service rejects, a request line longer than
+MAX_LINE) is answered with 400; a header line longer than MAX_LINE or more
+than MAX_HEADERS headers with 431.
+
+    python student_server.py --port 8080 --data-file student_data.pkl
+    python student_server.py --data-file students.db      # SQLite backend
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from ExamResultManagamentSystemFinal import (FeeSlabCalculator, SQLiteStudentService, Student, StudentExporter,
+                                             StudentService)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryServer:
+    MAX_TOP = 1000
+    MAX_BODY = 1 << 20
+    MAX_LINE = 8192
+    MAX_HEADERS = 100
+    READ_WORKERS = 8
+
+    def __init__(self, service, host: str = '127.0.0.1', port: int = 8080):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._writes = None
+        self._server = None
+        self._writer_task = None
+        self._reads = ThreadPoolExecutor(max_workers=self.READ_WORKERS, thread_name_prefix='query-read')
+
+    async def start(self):
+        self._writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=self.MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        self._reads.shutdown(wait=False)
+
+    async def read(self, query, *args):
+        """Run a read on the reader pool, so waiting on the service lock never blocks the loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._reads, query, *args)
+
+    async def write(self, mutation, *args):
+        """Queue a mutation for the writer task and wait for its result."""
+        done = asyncio.get_running_loop().create_future()
+        await self._writes.put((mutation, args, done))
+        return await done
+
+    async def mutate(self, mutation, *args):
+        """write() for request handlers: input the service rejects becomes a 400."""
+        try:
+            return await self.write(mutation, *args)
+        except (TypeError, KeyError, ZeroDivisionError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid request: {e}")
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            mutation, args, done = await self._writes.get()
+            try:
+                # Saves and index rebuilds block; keep them off the event loop
+                # so reads carry on while one write is applied.
+                result = await loop.run_in_executor(None, mutation, *args)
+            except Exception as e:
+                if not done.cancelled():
+                    done.set_exception(e)
+            else:
+                if not done.cancelled():
+                    done.set_result(result)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except ValueError as e:
+                    status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"}
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            writer.write(self._response(e.status, {'error': str(e)}, False))
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """(method, target, headers, body) of the next request, or None at end of stream."""
+        try:
+            request_line = await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request line too long")
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        for count in range(self.MAX_HEADERS + 1):
+            try:
+                line = await reader.readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Header line too long")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if count == self.MAX_HEADERS:
+                raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length must be a whole number")
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length must not be negative")
+        if length > self.MAX_BODY:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _response(status: int, payload, keep_alive: bool) -> bytes:
+        body = json.dumps(payload).encode('utf-8')
+        status = HTTPStatus(status)
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode('latin-1') + body
+
+    async def dispatch(self, method: str, target: str, body: bytes = b''):
+        """Route one request; returns (status, JSON-serialisable payload)."""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = parse_qs(url.query)
+        if method == 'GET':
+            return HTTPStatus.OK, await self.read(self._get, parts, query)
+        if method == 'POST' and parts == ['students']:
+            fields = self._json(body)
+            try:
+                student = Student(fields['id'], fields['name'], fields['marks'], fields['attendance'])
+            except (KeyError, TypeError, ZeroDivisionError):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Expected id, name, marks and attendance")
+            await self.mutate(self.service.add_student, student)
+            return HTTPStatus.CREATED, await self.read(self._profile, student)
+        if method == 'PUT' and len(parts) == 3 and parts[0] == 'students' and parts[2] == 'marks':
+            marks = self._json(body).get('marks')
+            if not isinstance(marks, list) or not marks:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Expected a non-empty marks list")
+            student = await self.mutate(self.service.update_marks, self._int(parts[1]), marks)
+            return HTTPStatus.OK, await self.read(self._profile, student)
+        if method == 'DELETE' and len(parts) == 2 and parts[0] == 'students':
+            student_id = self._int(parts[1])
+            if await self.read(self.service.search_student, student_id) is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Student with ID {student_id} not found.")
+            await self.mutate(self.service.remove_student, student_id)
+            return HTTPStatus.OK, {'removed': student_id}
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {url.path}")
+
+    def _get(self, parts: list, query: dict):
+        service = self.service
+        if parts == ['health']:
+            return {'students': service.student_count()}
+        if parts and parts[0] == 'students' and len(parts) in (2, 3):
+            student_id = self._int(parts[1])
+            student = service.search_student(student_id)
+            if student is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Student with ID {student_id} not found.")
+            if len(parts) == 2:
+                return self._profile(student)
+            if parts[2] == 'rank':
+                rank, percentile, total = service.get_rank(student_id)
+                return {'id': student_id, 'rank': rank, 'percentile': percentile, 'total': total}
+        if parts == ['ranking']:
+            k = self._int(query.get('k', ['10'])[0])
+            if not 1 <= k <= self.MAX_TOP:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"k must be between 1 and {self.MAX_TOP}")
+            return [StudentExporter.record(rank, student)
+                    for rank, (_, _, student) in enumerate(service.ranking(k), start=1)]
+        if len(parts) == 2 and parts[0] == 'ranking':
+            rank = self._int(parts[1])
+            student = service.student_at_rank(rank)
+            if student is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No student at rank {rank}.")
+            return StudentExporter.record(rank, student)
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for GET /{'/'.join(parts)}")
+
+    def _profile(self, student) -> dict:
+        ranked = self.service.get_rank(student.id)
+        return StudentExporter.record(ranked[0] if ranked else None, student)
+
+    @staticmethod
+    def _int(text: str) -> int:
+        try:
+            return int(text)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Expected a whole number, got {text!r}")
+
+    @staticmethod
+    def _constant(name: str):
+        raise ValueError(f"{name} is not a valid number")
+
+    @staticmethod
+    def _json(body: bytes) -> dict:
+        try:
+            fields = json.loads(body or b'{}', parse_constant=QueryServer._constant)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+        if not isinstance(fields, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        return fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve student results over HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--data-file', default='student_data.pkl', help="a .db file selects the SQLite backend")
+    parser.add_argument('--columnar', action='store_true', help="keep the cohort in columnar storage")
+    parser.add_argument('--fee-schedule', default=FeeSlabCalculator.SETTINGS_FILE,
+                        help="JSON file with the fee slab cut-offs and fees, if it exists")
+    args = parser.parse_args()
+
+    try:
+        FeeSlabCalculator.load_schedule(args.fee_schedule)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if SQLiteStudentService.handles(args.data_file):
+        service = SQLiteStudentService(args.data_file)
+    else:
+        service = StudentService(args.data_file, columnar=args.columnar)
+    server = QueryServer(service, args.host, args.port)
+    print(f"Serving {service.student_count()} students on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ExamResultManagamentSystemFinal  # noqa: E402
+from ExamResultManagamentSystemFinal import Student  # noqa: E402
+
+FIRST = ('Asha', 'Ravi', 'Meera', 'Arjun', 'Kavya', 'Nikhil', 'Priya', 'Rahul')
+LAST = ('Sharma', 'Iyer', 'Reddy', 'Khan', 'Das', 'Patel', 'Nair', 'Gupta')
+
+
+def make_students(n: int, seed: int = 7, start: int = 1, cls=Student) -> list:
+    """n seeded students with consecutive IDs, in ID order."""
+    rng = random.Random(seed)
+    return [cls(student_id, f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+                [rng.randint(0, 100) for _ in range(5)], rng.randint(40, 100))
+            for student_id in range(start, start + n)]
+
+
+def write_results_csv(filename: str, students, extra=()):
+    """A results CSV with five subject columns for students, then the raw extra lines."""
+    with open(filename, 'w', encoding='utf-8') as file:
+        file.write('id,name,attendance,s1,s2,s3,s4,s5\n')
+        for student in students:
+            file.write(f"{student.id},{student.name},{student.attendance},"
+                       + ",".join(f"{mark:g}" for mark in student.marks) + "\n")
+        for line in extra:
+            file.write(line + "\n")
+
+
+@pytest.fixture
+def students():
+    return make_students(300)
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    return str(tmp_path / 'student_data.pkl')
+
+
+@pytest.fixture(autouse=True)
+def dialogs(monkeypatch):
+    """Records message boxes instead of opening them; each entry is (kind, title, message)."""
+    shown = []
+    for kind in ('showinfo', 'showerror', 'showwarning'):
+        monkeypatch.setattr(ExamResultManagamentSystemFinal.messagebox, kind,
+                            lambda title, message, kind=kind, **options: shown.append((kind, title, message)))
+    return shown
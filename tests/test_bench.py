@@ -0,0 +1,25 @@
+import bench_suite
+
+
+def test_compare_flags_slowdowns_and_memory_growth_past_the_tolerance():
+    baseline = {'fast@10': {'ops_per_sec': 1000.0, 'peak_bytes': 1 << 20},
+                'slow@10': {'ops_per_sec': 1000.0, 'peak_bytes': 1 << 20},
+                'hungry@10': {'ops_per_sec': 1000.0, 'peak_bytes': 1 << 20}}
+    results = {'fast@10': {'ops_per_sec': 701.0, 'peak_bytes': int(1.3 * (1 << 20)) + bench_suite.MEMORY_SLACK},
+               'slow@10': {'ops_per_sec': 699.0, 'peak_bytes': None},
+               'hungry@10': {'ops_per_sec': 5000.0, 'peak_bytes': int(1.3 * (1 << 20)) + bench_suite.MEMORY_SLACK + 1},
+               'new@10': {'ops_per_sec': 1.0, 'peak_bytes': 1 << 30}}
+    regressions = bench_suite.compare(results, baseline, 0.3)
+    assert [line.split(':')[0] for line in regressions] == ['slow@10', 'hungry@10']
+    assert "peak" in regressions[1]
+
+
+def test_every_case_runs_on_a_small_cohort(tmp_path):
+    students = bench_suite.make_students(200, seed=1)
+    for case in bench_suite.CASES:
+        operations, run, *cleanup = case(students, 1, str(tmp_path))
+        run()
+        for close in cleanup:
+            close()
+        assert operations > 0, case.__name__
+    assert bench_suite.peak_memory(bench_suite.heap_ranking, students, 1, str(tmp_path)) > 0
@@ -0,0 +1,153 @@
+import builtins
+import csv
+import json
+
+import pytest
+
+import ExamResultManagement as cli
+from conftest import make_students, write_results_csv
+
+
+@pytest.fixture
+def cli_students():
+    return make_students(200, cls=cli.Student)
+
+
+def run_cli(monkeypatch, capsys, *answers):
+    """Drive cli.main() with the given answers to its prompts; returns what it printed."""
+    replies = iter(answers)
+    monkeypatch.setattr(builtins, 'input', lambda prompt='': next(replies))
+    cli.main()
+    return capsys.readouterr().out
+
+
+def test_cli_tree_stays_balanced_for_sequential_ids(cli_students):
+    bst = cli.StudentBST()
+    for student in cli_students:
+        assert bst.insert(student)
+    assert bst.height() == 8
+    assert not bst.insert(cli_students[0])
+    for student in cli_students[::2]:
+        bst.delete(student.id)
+    students = []
+    bst.inorder(students)
+    assert [student.id for student in students] == [student.id for student in cli_students[1::2]]
+    assert bst.height() <= 8
+
+
+def test_cli_from_sorted_matches_inserts(cli_students):
+    bst = cli.StudentBST.from_sorted(cli_students)
+    assert bst.height() == (len(cli_students)).bit_length()
+    assert bst.search(150) is cli_students[149]
+    with pytest.raises(ValueError):
+        cli.StudentBST.from_sorted(cli_students[::-1])
+
+
+def test_cli_saves_and_reloads_records(tmp_path, monkeypatch, capsys):
+    filename = str(tmp_path / 'records.pkl')
+    out = run_cli(monkeypatch, capsys,
+                  '1', '7', 'Asha Rao', '2', '90', '80', '85',
+                  '1', '7', 'Ravi Iyer', '1', '50', '85',
+                  '1', '3', 'Meera Nair', '1', '70', '90',
+                  '6', filename, '11')
+    assert out.count("Student inserted successfully.") == 2
+    assert "Student with id 7 already exists." in out
+    out = run_cli(monkeypatch, capsys, '7', filename, '3', '7', '4', '', '11')
+    assert "Student Found:" in out and "Name: Asha Rao" in out
+    ranking = out[out.index("=== Student Ranking"):]
+    assert ranking.index("Rank 1:") < ranking.index("Name: Asha Rao") < ranking.index("Rank 2:")
+
+
+def test_cli_heap_top_k_walks_the_heap_best_first(cli_students):
+    heap = cli.MaxHeap()
+    heap.build([(s.cgpa, -s.id, s) for s in cli_students])
+    expected = sorted(heap._data, reverse=True)
+    assert heap.top_k(7) == expected[:7]
+    assert heap.ranking_page(3, 4) == expected[3:7]
+    assert heap.ranking_page(150, 100) == expected[150:]
+    heap.remove(expected[0][2].id)
+    assert heap.top_k(1) == expected[1:2]
+
+
+def test_cli_ranking_shows_the_requested_number(monkeypatch, capsys, cli_students):
+    service = cli.StudentService()
+    for student in cli_students[:20]:
+        service.add_student(student)
+    service.display_ranking(3)
+    out = capsys.readouterr().out
+    assert out.count("Rank ") == 3
+    best = max(cli_students[:20], key=lambda s: (s.cgpa, -s.id))
+    assert out.index(f"ID: {best.id}") < out.index("Rank 2:")
+    out = run_cli(monkeypatch, capsys, '4', 'x', '4', '2', '11')
+    assert "Invalid number." in out and "No students available for ranking." in out
+
+
+def test_cli_bulk_import_reports_skipped_rows(tmp_path, monkeypatch, capsys):
+    filename = str(tmp_path / 'results.csv')
+    write_results_csv(filename, make_students(30, cls=cli.Student),
+                      extra=['31,Asha Rao,80,90,abc', '32,Ravi 9,80,90', '5,Meera Nair,80,70'])
+    out = run_cli(monkeypatch, capsys, '8', filename, '8', str(tmp_path / 'missing.csv'), '3', '30', '11')
+    assert "Imported 30 student(s)." in out and "3 row(s) skipped." in out
+    assert "Line 32: Marks and attendance must be numbers." in out
+    assert "Line 34: Student with ID 5 already exists." in out
+    assert "Error importing students:" in out
+    assert "Student Found:" in out
+
+
+def test_cli_marks_need_at_least_one_subject():
+    assert not cli.DataValidator.validate_marks([])
+    assert cli.DataValidator.validate_marks([0, 100])
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), float('-inf')])
+def test_cli_rejects_non_finite_marks_and_attendance(value):
+    assert not cli.DataValidator.validate_marks([50, value])
+    assert not cli.DataValidator.validate_attendance(value)
+
+
+def test_cli_rejects_a_student_without_subjects(monkeypatch, capsys):
+    out = run_cli(monkeypatch, capsys,
+                  '1', '5', 'Asha Rao', '0', '80',
+                  '1', '6', 'Ravi Iyer', '1', '70', '120', '5', '11')
+    assert "Error: Invalid marks detected." in out
+    assert "Error: Invalid attendance value." in out
+    assert "Asha Rao" not in out[out.rindex("Invalid attendance value."):]
+
+
+def test_cli_deletes_several_students_or_none(monkeypatch, capsys):
+    out = run_cli(monkeypatch, capsys,
+                  '1', '1', 'Asha Rao', '1', '90', '80',
+                  '1', '2', 'Ravi Iyer', '1', '70', '85',
+                  '1', '3', 'Meera Nair', '1', '50', '90',
+                  '2', '1, 4', '2', '1, 3', '5', '11')
+    assert "Error deleting students: Student(s) not found: 4" in out
+    assert "2 student record(s) deleted." in out
+    listing = out[out.rindex("2 student record(s) deleted."):]
+    assert "Name: Ravi Iyer" in listing and "Asha Rao" not in listing and "Meera Nair" not in listing
+
+
+def test_cli_exports_in_id_and_rank_order(tmp_path, monkeypatch, capsys):
+    csv_file, jsonl_file = str(tmp_path / 'results.csv'), str(tmp_path / 'results.jsonl')
+    out = run_cli(monkeypatch, capsys,
+                  '1', '3', 'Asha Rao', '1', '60', '80',
+                  '1', '1', 'Ravi Iyer', '1', '90', '85',
+                  '1', '2', 'Meera Nair', '1', '75', '90',
+                  '9', csv_file, '', '9', jsonl_file, 'rank', '9', str(tmp_path / 'results.txt'), '', '11')
+    assert out.count("Exported 3 student(s)") == 2 and "Error exporting students:" in out
+    with open(csv_file, newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    assert [(row['rank'], row['id'], row['name']) for row in rows] == [('', '1', 'Ravi Iyer'), ('', '2', 'Meera Nair'),
+                                                                        ('', '3', 'Asha Rao')]
+    with open(jsonl_file, encoding='utf-8') as file:
+        records = [json.loads(line) for line in file]
+    assert [(record['rank'], record['id'], record['cgpa']) for record in records] == [(1, 1, 9.0), (2, 2, 7.5),
+                                                                                     (3, 3, 6.0)]
+
+
+def test_cli_diagnostics_prints_and_saves_the_report(tmp_path, monkeypatch, capsys):
+    filename = str(tmp_path / 'diagnostics.json')
+    out = run_cli(monkeypatch, capsys, '1', '1', 'Asha Rao', '1', '90', '80', '10', 'y', filename, '11')
+    assert "add_student" in out and "cumulative" in out
+    assert f"Diagnostics saved to {filename}." in out
+    with open(filename, encoding='utf-8') as file:
+        assert json.load(file)
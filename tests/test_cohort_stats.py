@@ -0,0 +1,114 @@
+import random
+import statistics
+
+import pytest
+
+from cohort_stats import CohortStatistics, FixedHistogram, QuantileSketch, RunningStats
+from conftest import make_students
+from ExamResultManagamentSystemFinal import StudentService
+
+
+def test_running_stats_follow_adds_removals_and_merges():
+    rng = random.Random(4)
+    values = [rng.uniform(0, 100) for _ in range(500)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    for value in values[:200]:
+        stats.remove(value)
+    kept = values[200:]
+    assert stats.count == len(kept)
+    assert stats.mean == pytest.approx(statistics.fmean(kept))
+    assert stats.variance == pytest.approx(statistics.pvariance(kept))
+    other = RunningStats()
+    for value in values[:200]:
+        other.add(value)
+    stats.merge(other)
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.stdev == pytest.approx(statistics.pstdev(values))
+    for value in values:
+        stats.remove(value)
+    assert (stats.count, stats.mean, stats.variance) == (0, 0.0, 0.0)
+
+
+def test_cohort_extremes_shrink_when_students_are_removed():
+    sketch = QuantileSketch(0.01)
+    for value in range(1, 11):
+        sketch.add(float(value))
+    for value in (1.0, 10.0):
+        sketch.remove(value)
+    assert sketch.quantile(0) == pytest.approx(2.0, rel=0.01)
+    assert sketch.quantile(1) == pytest.approx(9.0, rel=0.01)
+
+
+def test_quantile_sketch_stays_within_its_relative_accuracy():
+    rng = random.Random(5)
+    values = [rng.uniform(0, 10) for _ in range(2000)] + [0.0] * 50
+    sketch, halves = QuantileSketch(0.01), (QuantileSketch(0.01), QuantileSketch(0.01))
+    for i, value in enumerate(values):
+        sketch.add(value)
+        halves[i % 2].add(value)
+    halves[0].merge(halves[1])
+    for value in values[:500]:
+        sketch.remove(value)
+        halves[0].remove(value)
+    kept = sorted(values[500:])
+    for q in (0, 0.1, 0.25, 0.5, 0.75, 0.9, 1):
+        true = kept[int(q * (len(kept) - 1))]
+        assert sketch.quantile(q) == pytest.approx(true, rel=0.01, abs=1e-9), q
+        assert halves[0].quantile(q) == sketch.quantile(q)
+    assert QuantileSketch().quantile(0.5) is None
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(0.05))
+
+
+def test_fixed_histogram_clamps_out_of_range_values():
+    histogram = FixedHistogram(0.0, 10.0, 4)
+    for value in (-1, 0, 2.4, 2.5, 9.9, 10, 12):
+        histogram.add(value)
+    histogram.remove(12)
+    assert [count for _, _, count in histogram.bins()] == [3, 1, 0, 2]
+    with pytest.raises(ValueError):
+        histogram.merge(FixedHistogram(0.0, 10.0, 5))
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_service_statistics_match_a_recount(tmp_path, students, columnar):
+    service = StudentService(str(tmp_path / 'cohort.pkl'), columnar=columnar)
+    try:
+        for student in students:
+            service.add_student(student)
+        rng = random.Random(8)
+        for student_id in rng.sample(range(1, 301), 40):
+            service.update_marks(student_id, [rng.randint(0, 100) for _ in range(5)])
+        for student_id in rng.sample(range(1, 301), 30):
+            service.remove_student(student_id)
+        kept = []
+        service.student_bst.inorder(kept)
+        summary = service.cohort_statistics()
+        expected = CohortStatistics.from_students(kept).summary()
+        assert summary['count'] == len(kept) == expected['count']
+        assert summary['cgpa_mean'] == pytest.approx(statistics.fmean(s.cgpa for s in kept))
+        assert summary['cgpa_stdev'] == pytest.approx(statistics.pstdev(s.cgpa for s in kept))
+        assert summary['attendance_mean'] == pytest.approx(statistics.fmean(s.attendance for s in kept))
+        assert summary['cgpa_histogram'] == expected['cgpa_histogram']
+        assert summary['cgpa_median'] == expected['cgpa_median']
+    finally:
+        service.close()
+
+
+def test_statistics_are_rebuilt_when_a_snapshot_loads(data_file):
+    service = StudentService(data_file)
+    try:
+        for student in make_students(120, seed=2):
+            service.add_student(student)
+        summary = service.cohort_statistics()
+        service.save_data()
+    finally:
+        service.close()
+    reopened = StudentService(data_file)
+    try:
+        assert reopened.cohort_statistics()['cgpa_histogram'] == summary['cgpa_histogram']
+        assert reopened.cohort_statistics()['cgpa_mean'] == pytest.approx(summary['cgpa_mean'])
+    finally:
+        reopened.close()
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from conftest import make_students
+from ExamResultManagamentSystemFinal import ReadWriteLock, StudentService
+
+
+def test_write_lock_is_reentrant_and_readers_cannot_upgrade():
+    lock = ReadWriteLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+        assert lock._writer == threading.get_ident()
+    assert lock._writer is None and lock._readers == 0
+    with lock.read():
+        with lock.read():
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+    assert lock._readers == 0 and lock._writers_waiting == 0
+
+
+def test_readers_share_the_lock_and_a_waiting_writer_goes_first():
+    lock = ReadWriteLock()
+    order = []
+    both_reading = threading.Barrier(2, timeout=5)
+
+    def reader(name):
+        with lock.read():
+            both_reading.wait()
+            order.append(name)
+
+    threads = [threading.Thread(target=reader, args=(name,)) for name in ('r1', 'r2')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert sorted(order) == ['r1', 'r2']
+
+    lock.acquire_read()
+    writer = threading.Thread(target=lambda: (lock.acquire_write(), order.append('w'), lock.release_write()))
+    late_reader = threading.Thread(target=lambda: (lock.acquire_read(), order.append('r3'), lock.release_read()))
+    writer.start()
+    while not lock._writers_waiting:
+        time.sleep(0.001)
+    late_reader.start()
+    time.sleep(0.05)
+    assert order[2:] == []
+    lock.release_read()
+    writer.join(5)
+    late_reader.join(5)
+    assert order[2:] == ['w', 'r3']
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_snapshots_stay_point_in_time(data_file, students, columnar):
+    service = StudentService(data_file, columnar=columnar)
+    try:
+        service.add_students(students)
+        snapshot = service.snapshot()
+        before = [(s.id, list(s.marks), s.cgpa) for s in snapshot.students]
+        ranked = [s.id for s in snapshot.ranked]
+        service.update_marks(42, [100, 100, 100])
+        service.remove_student(7)
+        service.add_students(make_students(5, start=1000))
+        assert [(s.id, list(s.marks), s.cgpa) for s in snapshot.students] == before
+        assert [s.id for s in snapshot.ranked] == ranked
+        assert snapshot.search(7) is not None and snapshot.rank(42) == ranked.index(42) + 1
+        assert service.snapshot().rank(42) == 1
+    finally:
+        service.close()
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_snapshots_share_the_cohort_instead_of_copying_it(data_file, students, columnar):
+    service = StudentService(data_file, columnar=columnar)
+    try:
+        service.add_students(students)
+        first = service.snapshot()
+        assert service.snapshot()._by_id is first._by_id
+        if columnar:
+            assert first._store.ids is service.store.ids
+        service.update_marks(42, [100, 100, 100])
+        second = service.snapshot()
+        old, new = first._by_id.root, second._by_id.root
+        assert old.left is new.left or old.right is new.right
+        if columnar:
+            assert first._store.ids is not service.store.ids
+        assert first.search(42).cgpa != 10.0 and second.search(42).cgpa == 10.0
+        assert [rank for rank, _ in first.rows('id')] == [first.rank(s.id) for s in first.students]
+    finally:
+        service.close()
+
+
+def test_update_marks_swaps_the_copy_into_the_existing_node(data_file, students):
+    service = StudentService(data_file)
+    try:
+        service.add_students(students)
+        old = service.search_student(42)
+        height = service.student_bst.height()
+        updated = service.update_marks(42, [100])
+        assert updated is not old and list(old.marks) != [100]
+        assert service.search_student(42) is updated
+        assert service.student_bst.height() == height
+        assert service.ranking(1)[0][2] is updated
+        assert service.student_at_rank(1) is updated
+        service.check_aggregates()
+    finally:
+        service.close()
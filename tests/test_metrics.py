@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import service_metrics
+from service_metrics import LatencyHistogram, Metrics, timed
+
+
+def test_latency_histogram_reports_bucket_bounds():
+    histogram = LatencyHistogram()
+    for microseconds in [3] * 90 + [100] * 9 + [5000]:
+        histogram.add(microseconds / 1e6)
+    stats = histogram.as_dict()
+    assert stats['count'] == 100 and stats['max_ms'] == pytest.approx(5.0)
+    assert stats['p50_ms'] == pytest.approx(0.004)
+    assert stats['p95_ms'] == pytest.approx(0.128)
+    assert stats['p99_ms'] == pytest.approx(0.128)
+    assert histogram.quantile(1.0) == pytest.approx(0.005)
+    assert stats['buckets_us'] == {'4': 90, '128': 9, '8192': 1}
+    assert LatencyHistogram().quantile(0.5) == 0.0
+
+
+class Service:
+    def __init__(self):
+        self.metrics = Metrics()
+
+    @timed
+    def _lookup(self, value):
+        if value is None:
+            raise ValueError("missing")
+        return value * 2
+
+
+def test_timed_records_calls_and_counts_failures():
+    service = Service()
+    assert service._lookup(4) == 8
+    with pytest.raises(ValueError):
+        service._lookup(None)
+    report = service.metrics.as_dict()
+    assert report['operations']['lookup']['count'] == 2
+    assert report['counters'] == {'lookup.errors': 1}
+    assert Service._lookup.__name__ == '_lookup'
+
+
+def test_metrics_timers_counters_gauges_and_reset():
+    metrics = Metrics()
+    with metrics.timer('save'):
+        pass
+    metrics.count('bytes', 10)
+    metrics.count('bytes', 5)
+    metrics.set_gauge('height', 7)
+    report = metrics.as_dict()
+    assert report['operations']['save']['count'] == 1
+    assert (report['counters'], report['gauges']) == ({'bytes': 15}, {'height': 7})
+    text = service_metrics.format_report({'service': report, 'students': 3})
+    assert 'save' in text and 'bytes' in text and 'students: 3' in text
+    metrics.reset()
+    assert metrics.as_dict() == {'operations': {}, 'counters': {}, 'gauges': {}}
+
+
+def test_service_diagnostics_cover_operations_and_state(tmp_path, data_file, students):
+    from ExamResultManagamentSystemFinal import StudentService
+    service = StudentService(data_file)
+    try:
+        service.add_students(students)
+        service.search_student(42)
+        with pytest.raises(ValueError):
+            service.remove_student(10 ** 6)
+        result, report = service.profile('ranking', 5)
+        assert len(result) == 5 and 'cumulative' in report
+        diagnostics = service.diagnostics()
+        assert diagnostics['state']['students'] == 300
+        assert diagnostics['state']['heap_size'] == 300
+        operations = diagnostics['service']['operations']
+        assert operations['search_student']['count'] == 1
+        assert diagnostics['service']['counters']['remove_student.errors'] == 1
+        filename = str(tmp_path / 'diagnostics.json')
+        service.dump_diagnostics(filename)
+        with open(filename, encoding='utf-8') as file:
+            assert json.load(file)['state']['students'] == 300
+    finally:
+        service.close()
@@ -0,0 +1,320 @@
+import os
+import pickle
+import random
+import threading
+
+import pytest
+
+from conftest import make_students
+from ExamResultManagamentSystemFinal import (BackgroundWriter, ColumnarSnapshot, JournalManager, PersistenceManager,
+                                             StudentService)
+
+
+def state(service):
+    """Comparable view of a cohort: every student's fields plus the ranking."""
+    service._ensure_loaded()
+    students = []
+    service.student_bst.inorder(students)
+    students = [(s.id, s.name, list(s.marks), s.attendance, s.cgpa, s.fee_slab) for s in students]
+    ranking = [student.id for _, _, student in service.ranking_queue.sorted_elements()]
+    return students, ranking
+
+
+def mutate(service, seed: int = 5):
+    rng = random.Random(seed)
+    for student in make_students(50, seed, start=1000):
+        service.add_student(student)
+    for student_id in rng.sample(range(1, 301), 40):
+        service.update_marks(student_id, [rng.randint(0, 100) for _ in range(5)])
+    for student_id in (3, 4, 5, 1010):
+        service.remove_student(student_id)
+
+
+@pytest.fixture
+def service(data_file, students):
+    service = StudentService(data_file)
+    for student in students:
+        service.add_student(student)
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize('columnar', [False, True], ids=['objects', 'store'])
+def test_journal_replays_mutations_after_the_snapshot(data_file, students, columnar):
+    service = StudentService(data_file, columnar=columnar)
+    for student in students:
+        service.add_student(student)
+    service.save_data(wait=True)
+    mutate(service)
+    expected = state(service)
+    service.close()
+    assert os.path.getsize(data_file + '.journal') > 0
+    reopened = StudentService(data_file, columnar=columnar)
+    try:
+        assert state(reopened) == expected
+    finally:
+        reopened.close()
+
+
+def test_journal_drops_a_torn_final_record(tmp_path):
+    snapshot = str(tmp_path / 'data.pkl')
+    journal = JournalManager(snapshot)
+    journal.append('remove', 1)
+    journal.append('remove', 2)
+    journal.close()
+    size = os.path.getsize(journal.journal_file)
+    with open(journal.journal_file, 'ab') as file:
+        file.write(JournalManager._HEADER.pack(100) + b'partial')
+    reader = JournalManager(snapshot)
+    assert reader.replay(0) == [('remove', 1), ('remove', 2)]
+    assert os.path.getsize(journal.journal_file) == size
+    assert reader.replay(1) == [('remove', 2)]
+    reader.append('remove', 3)
+    reader.close()
+    assert JournalManager(snapshot).replay(0) == [('remove', 1), ('remove', 2), ('remove', 3)]
+
+
+def test_checkpoint_folds_the_journal_into_the_snapshot(data_file, service):
+    mutate(service)
+    service.save_data(wait=True)
+    expected = state(service)
+    assert os.path.getsize(data_file + '.journal') == 0
+    data = PersistenceManager.load_data(data_file)
+    assert service.journal.replay(data['journal_seq']) == []
+    service.close()
+    reopened = StudentService(data_file)
+    try:
+        assert state(reopened) == expected
+    finally:
+        reopened.close()
+
+
+def test_a_full_journal_is_compacted_in_the_background(data_file, students):
+    service = StudentService(data_file)
+    service.journal.compact_threshold = 4096
+    try:
+        for student in students:
+            service.add_student(student)
+        service.writer.flush()
+        assert not os.path.exists(service.journal.rotated_file)
+        snapshot_seq = PersistenceManager.load_data(data_file)['journal_seq']
+        assert 0 < snapshot_seq <= len(students)
+        expected = state(service)
+    finally:
+        service.close()
+    reopened = StudentService(data_file)
+    try:
+        assert state(reopened) == expected
+    finally:
+        reopened.close()
+
+
+@pytest.mark.parametrize('extension', ['.pkl', ColumnarSnapshot.EXTENSION])
+def test_save_as_and_load_round_trip(tmp_path, service, extension):
+    mutate(service)
+    expected = state(service)
+    filename = str(tmp_path / ('copy' + extension))
+    service.save_as(filename, wait=True)
+    other = StudentService(str(tmp_path / 'other.pkl'), journaled=False)
+    try:
+        assert other.load_data(filename)
+        assert state(other) == expected
+    finally:
+        other.close()
+
+
+def test_columnar_snapshot_answers_lookups_from_the_mapping(tmp_path, students):
+    filename = str(tmp_path / ('cohort' + ColumnarSnapshot.EXTENSION))
+    ColumnarSnapshot.write(filename, students, journal_seq=9)
+    assert ColumnarSnapshot.is_columnar(filename)
+    snapshot = ColumnarSnapshot(filename)
+    try:
+        ranked = sorted(students, key=lambda s: (-s.cgpa, s.id))
+        assert (len(snapshot), snapshot.journal_seq) == (len(students), 9)
+        for student in (students[0], students[137], students[-1]):
+            found = snapshot.search(student.id)
+            assert (found.name, list(found.marks), found.cgpa) == (student.name, list(student.marks), student.cgpa)
+            assert snapshot.rank(student.id) == ranked.index(student) + 1
+        assert snapshot.search(10 ** 6) is None and snapshot.rank(10 ** 6) is None
+        assert [s.id for _, _, s in snapshot.ranking_page(40, 10)] == [s.id for s in ranked[40:50]]
+    finally:
+        snapshot.close()
+
+
+def test_columnar_data_file_serves_reads_mapped_then_mutates(tmp_path, service):
+    filename = str(tmp_path / ('cohort' + ColumnarSnapshot.EXTENSION))
+    service.save_as(filename, wait=True)
+    expected = state(service)
+    columnar = StudentService(filename)
+    try:
+        assert columnar._mapped is not None
+        assert columnar.get_rank(expected[1][0])[0] == 1
+        assert columnar.search_student(42).name == service.search_student(42).name
+        columnar.update_marks(2, [100, 100, 100, 100, 100])
+        assert columnar._mapped is None
+        assert columnar.get_rank(2)[0] == 1
+    finally:
+        columnar.close()
+
+
+@pytest.mark.parametrize('extension', ['.pkl', ColumnarSnapshot.EXTENSION])
+def test_loading_another_snapshot_adopts_it_as_the_data_file(tmp_path, data_file, service, extension):
+    filename = str(tmp_path / ('cohort' + extension))
+    service.save_as(filename, wait=True)
+    service.remove_student(7)
+    service.save_data(wait=True)
+    size = os.path.getsize(data_file)
+    assert service.load_data(filename)
+    assert os.path.getsize(data_file) == size
+    assert service.data_file == filename
+    assert service.search_student(7) is not None
+    service.update_marks(7, [0, 0, 0, 0, 0])
+    expected = state(service)
+    service.close()
+    reopened = StudentService(filename)
+    original = StudentService(data_file)
+    try:
+        assert state(reopened) == expected
+        assert original.search_student(7) is None
+    finally:
+        reopened.close()
+        original.close()
+
+
+@pytest.mark.parametrize('extension', ['.pkl', ColumnarSnapshot.EXTENSION])
+def test_empty_snapshots_load_and_keep_their_journal_position(tmp_path, students, extension):
+    filename = str(tmp_path / ('cohort' + extension))
+    service = StudentService(filename)
+    for student in students[:3]:
+        service.add_student(student)
+    service.close()
+    # The first two journal records are folded into an (empty) snapshot.
+    PersistenceManager.save_snapshot(filename, {'students': [], 'ranking': [], 'journal_seq': 2})
+    reopened = StudentService(filename)
+    try:
+        assert [student.id for _, _, student in reopened.ranking()] == [students[2].id]
+    finally:
+        reopened.close()
+    other = StudentService(str(tmp_path / 'other.pkl'), journaled=False)
+    try:
+        assert other.load_data(filename)
+    finally:
+        other.close()
+
+
+def test_loading_a_file_without_data_leaves_the_cohort_alone(tmp_path, data_file, service):
+    service.save_data(wait=True)
+    expected = state(service)
+    empty = str(tmp_path / 'empty.pkl')
+    with open(empty, 'wb') as file:
+        pickle.dump({}, file)
+    for filename in (empty, str(tmp_path / 'missing.pkl')):
+        assert not service.load_data(filename)
+        assert service.data_file == data_file and state(service) == expected
+
+
+def test_background_writer_coalesces_queued_jobs_per_key():
+    writer = BackgroundWriter()
+    release, ran = threading.Event(), []
+    try:
+        writer.submit('blocker', release.wait, "Blocking")
+        for i in range(5):
+            writer.submit('a', lambda i=i: ran.append(('a', i)), f"Write a{i}")
+        writer.submit('b', lambda: ran.append(('b', 0)), "Write b")
+        writer.submit('a', lambda: ran.append(('a', 5)), "Write a5")
+        assert writer.busy()
+        release.set()
+        assert writer.flush(timeout=5)
+        assert ran == [('b', 0), ('a', 5)]
+        assert [(key, description) for key, description, _ in writer.poll()] == \
+            [('blocker', "Blocking"), ('b', "Write b"), ('a', "Write a5")]
+        assert writer.poll() == [] and not writer.busy()
+    finally:
+        release.set()
+        writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit('a', lambda: None, "Too late")
+
+
+def test_background_writer_reports_failures_and_keeps_running():
+    writer = BackgroundWriter()
+    try:
+        writer.submit('bad', lambda: 1 / 0, "Failing")
+        writer.submit('good', lambda: None, "Working")
+        writer.flush()
+        (bad_key, _, error), (good_key, _, ok) = writer.poll()
+        assert (bad_key, good_key, ok) == ('bad', 'good', None)
+        assert isinstance(error, ZeroDivisionError)
+    finally:
+        writer.close()
+
+
+def test_background_load_reports_its_outcome(tmp_path, service):
+    empty = str(tmp_path / 'empty.pkl')
+    with open(empty, 'wb') as file:
+        pickle.dump({}, file)
+    filename = str(tmp_path / 'copy.pkl')
+    service.save_as(filename, wait=True)
+    service.writer.poll()
+    service.load_in_background(empty)
+    service.load_in_background(filename)
+    service.writer.flush()
+    (empty_key, _, error), (key, _, ok) = service.writer.poll()
+    assert (empty_key, key, ok) == (('load', empty), ('load', filename), None)
+    assert "No valid student data" in str(error)
+
+
+def test_open_in_background_defers_the_load_and_lookups_wait_for_it(data_file, service, students):
+    service.close()
+    service = StudentService(data_file, autoload=False)
+    release = threading.Event()
+    try:
+        assert service.student_count() == 0 and service.is_open()
+        service.writer.submit('hold', release.wait, "Holding the writer")
+        service.open_in_background()
+        assert not service.is_open()
+        found = []
+        reader = threading.Thread(target=lambda: found.append(service.search_student(42)))
+        reader.start()
+        reader.join(0.2)
+        assert reader.is_alive()
+        release.set()
+        reader.join(5)
+        assert found[0].id == 42
+        assert service.is_open() and service.student_count() == len(students)
+        assert ('open', data_file) in [key for key, _, _ in service.writer.poll()]
+    finally:
+        release.set()
+        service.close()
+
+
+def test_loading_another_file_cancels_a_pending_open(tmp_path, data_file, service):
+    filename = str(tmp_path / 'copy.pkl')
+    service.save_as(filename, wait=True)
+    service.close()
+    service = StudentService(data_file, autoload=False)
+    release = threading.Event()
+    try:
+        service.writer.submit('hold', release.wait, "Holding the writer")
+        service.open_in_background()
+        service.load_in_background(filename)
+        release.set()
+        service.writer.flush()
+        assert [key for key, _, _ in service.writer.poll()] == ['hold', ('load', filename)]
+        assert service.is_open() and service.student_count() == 300
+    finally:
+        release.set()
+        service.close()
+
+
+def test_lazy_indexes_are_built_on_first_use(data_file, service):
+    service.close()
+    service = StudentService(data_file)
+    try:
+        assert service.diagnostics()['state']['lazy_indexes_built'] == []
+        service.find_students(cgpa=(6, 8))
+        assert 'cgpa_index' in service.diagnostics()['state']['lazy_indexes_built']
+        assert [student.id for student in service.search_by_name(service.search_student(42).name)][:1] == [42]
+        assert 'name_index' in service.diagnostics()['state']['lazy_indexes_built']
+    finally:
+        service.close()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from ExamResultManagamentSystemFinal import StudentService
+from student_server import QueryServer
+
+
+@pytest.fixture
+def service(data_file, students):
+    service = StudentService(data_file)
+    service.add_students(students)
+    yield service
+    service.close()
+
+
+async def exchange(server, request: bytes):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(request)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers['content-length']))
+    writer.close()
+    return status, json.loads(body)
+
+
+def request(method: str, path: str, body: str = '', length=None) -> bytes:
+    length = len(body.encode()) if length is None else length
+    return (f"{method} {path} HTTP/1.1\r\nContent-Length: {length}\r\n"
+            f"Connection: close\r\n\r\n{body}").encode()
+
+
+def run(service, *requests):
+    async def main():
+        server = QueryServer(service, port=0)
+        await server.start()
+        try:
+            return [await exchange(server, raw) for raw in requests]
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('raw', [
+    request('POST', '/students', '{"id": 900, "name": "Asha Rao", "marks": [NaN], "attendance": 80}'),
+    request('POST', '/students', '{"id": 900, "name": "Asha Rao", "marks": [80], "attendance": "high"}'),
+    request('POST', '/students', '{"id": 900, "name": "Asha Rao", "marks": [], "attendance": 80}'),
+    request('POST', '/students', '{"id": 900, "name": "Asha Rao", "marks": [80], "attendance": Infinity}'),
+    request('POST', '/students', '{"id": 900, "name": "Asha Rao", "marks": [80]}'),
+    request('PUT', '/students/42/marks', '{"marks": [NaN, 50]}'),
+    request('PUT', '/students/42/marks', '{"marks": ["80"]}'),
+    request('PUT', '/students/42/marks', '{"marks": [80]}', length='eighty'),
+], ids=['nan-mark', 'text-attendance', 'no-marks', 'infinite-attendance', 'missing-field',
+        'nan-update', 'text-mark', 'text-length'])
+def test_bad_input_is_a_400_and_changes_nothing(service, raw):
+    before = service.search_student(42).to_record(), service.student_count()
+    [(status, payload)] = run(service, raw)
+    assert status == 400 and 'error' in payload
+    assert (service.search_student(42).to_record(), service.student_count()) == before
+
+
+def test_writes_apply_and_are_visible_to_reads(service):
+    (status, updated), (_, rank) = run(service, request('PUT', '/students/42/marks', '{"marks": [100, 100]}'),
+                                       request('GET', '/students/42/rank'))
+    assert status == 200 and updated['cgpa'] == 10.0
+    assert rank['rank'] == 1
+
+
+def test_reads_answer_from_the_indexes(service):
+    ranked = [s.id for _, _, s in service.ranking()]
+    responses = run(service, request('GET', '/health'), request('GET', '/students/42'),
+                    request('GET', '/ranking?k=3'), request('GET', '/ranking/2'), request('GET', '/students/4242'),
+                    request('GET', '/ranking?k=0'), request('DELETE', '/students/42'), request('GET', '/students/42'))
+    assert responses[0] == (200, {'students': 300})
+    assert responses[1][1]['id'] == 42 and responses[1][1]['rank'] == ranked.index(42) + 1
+    assert [record['id'] for record in responses[2][1]] == ranked[:3]
+    assert responses[3][1]['id'] == ranked[1]
+    assert [status for status, _ in responses[4:]] == [404, 400, 200, 404]
+
+
+@pytest.mark.parametrize('raw, status', [
+    (b'GET /' + b'a' * QueryServer.MAX_LINE + b' HTTP/1.1\r\n\r\n', 400),
+    (b'GET /health HTTP/1.1\r\nX-Long: ' + b'a' * QueryServer.MAX_LINE + b'\r\n\r\n', 431),
+    (b'GET /health HTTP/1.1\r\n' + b'X-Many: 1\r\n' * (QueryServer.MAX_HEADERS + 1) + b'\r\n', 431),
+], ids=['long-request-line', 'long-header', 'too-many-headers'])
+def test_oversized_requests_are_refused(service, raw, status):
+    [(answered, payload)] = run(service, raw)
+    assert answered == status and 'error' in payload
+
+
+def test_a_read_waiting_on_the_lock_leaves_the_loop_free(service):
+    locked, release = threading.Event(), threading.Event()
+    released_by_loop = []
+
+    def edit():
+        with service._lock.write():
+            locked.set()
+            released_by_loop.append(release.wait(timeout=5))
+
+    async def main():
+        server = QueryServer(service, port=0)
+        await server.start()
+        try:
+            pending = asyncio.ensure_future(exchange(server, request('GET', '/students/42')))
+            await asyncio.sleep(0.1)
+            assert not pending.done()
+            release.set()
+            return await pending
+        finally:
+            await server.stop()
+
+    writer = threading.Thread(target=edit)
+    writer.start()
+    locked.wait()
+    status, profile = asyncio.run(main())
+    writer.join()
+    assert released_by_loop == [True]
+    assert status == 200 and profile['id'] == 42
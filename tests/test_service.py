@@ -0,0 +1,561 @@
+import csv
+import json
+import os
+import pickle
+import random
+
+import pytest
+
+import ExamResultManagamentSystemFinal
+from conftest import make_students, write_results_csv
+from ExamResultManagamentSystemFinal import (ColumnarSnapshot, FeeSlabCalculator, PersistenceManager,
+                                             SQLiteStudentService, Student, StudentCSVImporter, StudentExporter,
+                                             StudentService)
+
+
+@pytest.fixture(params=['pickle', 'columnar', 'sqlite'])
+def service(request, tmp_path, students):
+    if request.param == 'sqlite':
+        service = SQLiteStudentService(str(tmp_path / 'cohort.db'))
+    else:
+        service = StudentService(str(tmp_path / 'cohort.pkl'), columnar=request.param == 'columnar')
+    for student in students:
+        service.add_student(student)
+    yield service
+    service.close()
+
+
+def ranked_ids(service):
+    return [student.id for _, _, student in service.ranking()]
+
+
+@pytest.mark.parametrize('marks', [[], [101], [-1, 50], ['90']])
+def test_rejected_marks_leave_every_index_untouched(service, marks):
+    before = ranked_ids(service), service.get_rank(42), list(service.search_student(42).marks)
+    with pytest.raises(ValueError):
+        service.update_marks(42, marks)
+    assert (ranked_ids(service), service.get_rank(42), list(service.search_student(42).marks)) == before
+
+
+def test_students_need_at_least_one_mark():
+    with pytest.raises(ValueError):
+        Student(1, 'Asha Rao', [], 80)
+
+
+def test_update_marks_regrades_and_reranks(service):
+    assert service.update_marks(42, [100, 100, 100, 100, 100]).cgpa == 10.0
+    assert service.search_student(42).cgpa == 10.0
+    assert service.get_rank(42)[0] == 1
+    assert service.student_at_rank(1).id == 42
+    service.update_marks(42, [0])
+    assert service.get_rank(42)[0] == service.student_count()
+    assert service.search_student(42).fee_slab == 'No slab assigned'
+
+
+@pytest.mark.parametrize('marks, cgpa, slab', [([84.95], 8.5, 'First Slab'),
+                                               ([79.95, 79.95], 8.0, 'Second Slab')])
+def test_boundary_marks_keep_their_slab_through_storage(tmp_path, service, marks, cgpa, slab):
+    service.update_marks(42, marks)
+    student = service.search_student(42)
+    assert (student.cgpa, student.fee_slab) == (cgpa, slab)
+    restored = pickle.loads(pickle.dumps(student))
+    assert (restored.cgpa, restored.fee_slab, list(restored.marks)) == (cgpa, slab, marks)
+    for extension in ('.pkl', ColumnarSnapshot.EXTENSION):
+        filename = str(tmp_path / ('copy' + extension))
+        service.save_as(filename, wait=True)
+        other = StudentService(str(tmp_path / 'other.pkl'), journaled=False)
+        try:
+            assert other.load_data(filename)
+            assert other.search_student(42).fee_slab == slab
+            assert list(other.search_student(42).marks) == marks
+        finally:
+            other.close()
+
+
+def test_students_load_from_pre_slots_pickles():
+    state = {'id': 7, 'name': 'Asha Rao', 'marks': [91, 78.5, 66], 'cgpa': 7.85, 'attendance': 88,
+             'fee_slab': 'Third Slab'}
+    for legacy in (state, (None, state)):
+        student = Student.__new__(Student)
+        student.__setstate__(legacy)
+        assert (student.id, list(student.marks), student.cgpa, student.fee_slab) == \
+            (7, [91, 78.5, 66], 7.85, 'Third Slab')
+    assert Student(7, 'Asha Rao', [91, 78.5, 66], 88).__getstate__() == state
+    assert not hasattr(student, '__dict__')
+
+
+def test_recompute_grades_regrades_every_column(tmp_path, students):
+    service = StudentService(str(tmp_path / 'cohort.pkl'), journaled=False, columnar=True)
+    try:
+        for student in students:
+            service.add_student(student)
+        service.recompute_grades(cgpa_rule=lambda marks: round(max(marks) / 10.0, 2),
+                                 slab_thresholds=(9.0, 7.0, 5.0), min_attendance=50)
+        for student in students:
+            record = service.search_student(student.id)
+            best = round(max(student.marks) / 10.0, 2)
+            slab = 0 if best >= 9.0 else 1 if best >= 7.0 else 2 if best >= 5.0 else 3
+            assert (record.cgpa, record.fee_slab) == (best, FeeSlabCalculator.SLABS[slab])
+            assert record.is_eligible() == (student.attendance >= 50)
+        ranked = sorted(students, key=lambda s: (-round(max(s.marks) / 10.0, 2), s.id))
+        assert ranked_ids(service) == [s.id for s in ranked]
+        assert [service.get_rank(s.id)[0] for s in ranked[:20]] == list(range(1, 21))
+    finally:
+        service.close()
+
+
+def test_journaled_services_reject_grades_they_could_not_reload(data_file, students):
+    service = StudentService(data_file, columnar=True)
+    try:
+        service.add_students(students)
+        before = ranked_ids(service), service.fee_summary()
+        with pytest.raises(ValueError, match="journaled=False"):
+            service.recompute_grades(cgpa_rule=lambda marks: 10.0)
+        with pytest.raises(ValueError):
+            service.recompute_grades(min_attendance=50)
+        service.recompute_grades()
+        assert (ranked_ids(service), service.fee_summary()) == before
+    finally:
+        service.close()
+    reopened = StudentService(data_file, columnar=True)
+    try:
+        assert (ranked_ids(reopened), reopened.fee_summary()) == before
+    finally:
+        reopened.close()
+
+
+def test_recompute_grades_needs_a_columnar_service(data_file):
+    service = StudentService(data_file)
+    try:
+        with pytest.raises(ValueError):
+            service.recompute_grades()
+    finally:
+        service.close()
+
+
+def test_csv_rows_are_validated_and_reported_by_line(tmp_path):
+    filename = str(tmp_path / 'results.csv')
+    write_results_csv(filename, make_students(20), extra=[
+        '21,Asha Rao,80,90,,70', '22,Ravi Iyer,80', '23,Meera 9,80,50', '24,Arjun Das,180,50',
+        '25,Kavya Nair,80,101', '-1,Priya Das,80,50', '3,Rahul Khan,80,50', '26,Nikhil Das,80,1,2,3,4,5,6', ''])
+    students, errors = StudentCSVImporter(chunk_size=4).read(filename, lambda sid: sid == 3)
+    assert [s.id for s in students] == [1, 2] + list(range(4, 22))
+    assert list(students[-1].marks) == [90, 70]
+    assert [line for line, _ in errors] == [4, 23, 24, 25, 26, 27, 28, 29]
+    assert errors[1][1] == "At least one subject mark is required."
+    assert errors[-2][1] == "Student with ID 3 already exists."
+
+
+def test_parallel_csv_import_matches_the_in_process_one(tmp_path):
+    filename = str(tmp_path / 'results.csv')
+    write_results_csv(filename, make_students(400), extra=['21,Asha Rao,80,50', '401,Meera 9,80,50', '402,Ravi Iyer,80'])
+    serial = StudentCSVImporter(chunk_size=64).read(filename, lambda sid: sid == 7)
+    parallel = StudentCSVImporter(chunk_size=64, workers=2).read(filename, lambda sid: sid == 7)
+    assert serial[1] == parallel[1] and [line for line, _ in serial[1]] == [8, 402, 403, 404]
+    assert [(s.id, s.name, list(s.marks), s.cgpa, s.fee_slab) for s in parallel[0]] == \
+        [(s.id, s.name, list(s.marks), s.cgpa, s.fee_slab) for s in serial[0]]
+
+
+def test_worker_count_follows_the_file_size(tmp_path, monkeypatch):
+    filename = str(tmp_path / 'results.csv')
+    write_results_csv(filename, make_students(50))
+    assert StudentCSVImporter.workers_for(filename) == 1
+    monkeypatch.setattr(StudentCSVImporter, 'PARALLEL_MIN_BYTES', 1)
+    monkeypatch.setattr(os, 'cpu_count', lambda: 3)
+    assert StudentCSVImporter.workers_for(filename) == 3
+
+
+def test_background_import_leaves_its_result_for_collection(tmp_path, service):
+    filename = str(tmp_path / 'results.csv')
+    write_results_csv(filename, make_students(20, seed=4, start=295))
+    service.import_in_background(filename)
+    service.writer.flush()
+    assert [event[:2] for event in service.writer.poll()] == [(('import', filename), f"Importing {filename}")]
+    added, errors = service.import_result(filename)
+    assert (added, len(errors)) == (14, 6)
+    assert service.import_result(filename) is None
+    assert service.search_student(314) is not None
+
+
+def test_every_backend_opens_and_profiles_as_the_gui_expects(service):
+    count = service.student_count()
+    service.open_in_background()
+    service.writer.flush()
+    assert service.is_open() and service.student_count() == count
+    result, report = service.profile('student_count')
+    assert result == count and 'student_count' in report
+    with pytest.raises(ValueError):
+        service.profile('_exists')
+
+
+def test_parallel_background_import_never_forks_the_writer_thread(tmp_path, service, monkeypatch):
+    start_methods = []
+
+    class RecordingPool(ExamResultManagamentSystemFinal.ProcessPoolExecutor):
+        def __init__(self, max_workers=None, mp_context=None):
+            start_methods.append(mp_context.get_start_method())
+            super().__init__(max_workers=max_workers, mp_context=mp_context)
+
+    monkeypatch.setattr(ExamResultManagamentSystemFinal, 'ProcessPoolExecutor', RecordingPool)
+    filename = str(tmp_path / 'results.csv')
+    write_results_csv(filename, make_students(200, seed=4, start=1001))
+    service.import_in_background(filename, workers=2)
+    service.writer.flush()
+    assert service.import_result(filename) == (200, [])
+    assert start_methods == [StudentCSVImporter.START_METHOD] and 'fork' not in start_methods
+
+
+@pytest.mark.parametrize('content, error', [('', "File is empty."), ('id,name,s1\n', "Missing column(s): attendance")])
+def test_csv_without_a_usable_header_is_rejected(tmp_path, content, error):
+    filename = tmp_path / 'results.csv'
+    filename.write_text(content)
+    assert StudentCSVImporter().read(str(filename)) == ([], [(1, error)])
+
+
+def journal_length(service):
+    """Journal records since the service was created; None for the SQLite backend, which has no journal."""
+    return len(service.journal.replay(0)) if isinstance(service, StudentService) else None
+
+
+def test_csv_import_is_persisted_in_one_batch(tmp_path, service):
+    filename = str(tmp_path / 'results.csv')
+    write_results_csv(filename, make_students(50, seed=3, start=291))
+    added, errors = service.import_csv(filename)
+    assert (added, len(errors)) == (40, 10)
+    assert all(message.endswith('already exists.') for _, message in errors)
+    assert service.search_student(330).name
+    assert journal_length(service) in (300 + 1, None)
+    service.close()
+    reopened = type(service)(service.data_file)
+    try:
+        assert reopened.search_student(330) is not None and reopened.student_count() == 340
+    finally:
+        reopened.close()
+
+
+def brute_force_find(service, cgpa=None, attendance=None, fee_slab=None, eligible=None):
+    if isinstance(fee_slab, int):
+        fee_slab = FeeSlabCalculator.SLABS[fee_slab]
+    return sorted(s.id for s in service.all_students()
+                  if (cgpa is None or cgpa[0] <= s.cgpa <= cgpa[1])
+                  and (attendance is None or attendance[0] <= s.attendance <= attendance[1])
+                  and (fee_slab is None or s.fee_slab == fee_slab)
+                  and (eligible is None or s.is_eligible() == eligible))
+
+
+def test_find_students_matches_a_brute_force_filter(service):
+    rng = random.Random(6)
+    for student_id in rng.sample(range(1, 301), 30):
+        service.update_marks(student_id, [rng.randint(60, 100) for _ in range(3)])
+    for student_id in rng.sample(range(1, 301), 20):
+        service.remove_student(student_id)
+    queries = [{}, {'cgpa': (8.0, 8.5)}, {'cgpa': (7.5, 7.5)}, {'attendance': (40, 60)},
+               {'fee_slab': 'First Slab'}, {'fee_slab': 2, 'eligible': True}, {'eligible': False},
+               {'cgpa': (5, 9), 'attendance': (75, 100)}, {'cgpa': (9.9, 10), 'fee_slab': 'Third Slab'}]
+    for query in queries:
+        found = [s.id for s in service.find_students(**query)]
+        assert sorted(found) == brute_force_find(service, **query), query
+        assert len(found) == len(set(found))
+    assert [s.id for s in service.find_students()] == brute_force_find(service)
+
+
+@pytest.fixture
+def fee_schedule(monkeypatch):
+    for name in ('SCHEDULE', 'THRESHOLDS', 'FEES'):
+        monkeypatch.setattr(FeeSlabCalculator, name, getattr(FeeSlabCalculator, name))
+    return FeeSlabCalculator
+
+
+def test_fee_exposure_is_unknown_until_fees_are_configured(service):
+    assert service.fee_summary()['fee_exposure'] is None
+
+
+def test_fee_schedule_settings_drive_grading_and_exposure(tmp_path, fee_schedule, data_file):
+    settings = tmp_path / 'fees.json'
+    settings.write_text(json.dumps({'schedule': [[9, 1000], [7, 2000], [5, 3000], [None, 4000]]}))
+    assert fee_schedule.load_schedule(str(settings))
+    assert not fee_schedule.load_schedule(str(tmp_path / 'missing.json'))
+    for cgpa, slab in ((9.0, 'First Slab'), (8.9, 'Second Slab'), (5.0, 'Third Slab'), (4.9, 'No slab assigned')):
+        assert fee_schedule.calculate(cgpa) == slab
+    service = StudentService(data_file)
+    try:
+        for student in (Student(1, 'Asha Rao', [95], 80), Student(2, 'Ravi Iyer', [75], 80),
+                        Student(3, 'Meera Nair', [75], 80), Student(4, 'Arjun Das', [10], 80)):
+            service.add_student(student)
+        summary = service.fee_summary()
+        assert list(summary['slabs'].values()) == [1, 2, 0, 1]
+        assert summary['fee_exposure'] == 1000 + 2 * 2000 + 4000
+    finally:
+        service.close()
+
+
+@pytest.mark.parametrize('schedule', [
+    [[8.5, 1], [8.0, 1], [None, 1]],
+    [[8.0, 1], [8.5, 1], [7.5, 1], [None, 1]],
+    [[8.5, 1], [8.0, 1], [7.5, 1], [7.0, 1]],
+    [[8.5, 1], [8.0, -1], [7.5, 1], [None, 1]],
+    [[8.5, 1], [11, 1], [7.5, 1], [None, 1]],
+    [[8.5, 'a'], [8.0, 1], [7.5, 1], [None, 1]],
+])
+def test_malformed_fee_schedules_are_rejected(fee_schedule, schedule):
+    before = fee_schedule.SCHEDULE
+    with pytest.raises(ValueError):
+        fee_schedule.configure(schedule)
+    assert fee_schedule.SCHEDULE == before
+
+
+@pytest.mark.parametrize('extension', ['.pkl', '.col'])
+def test_fee_summary_tracks_mutations_and_survives_reloading(tmp_path, students, extension):
+    service = StudentService(str(tmp_path / ('cohort' + extension)), debug=True)
+    try:
+        for student in students:
+            service.add_student(student)
+        rng = random.Random(12)
+        for student_id in rng.sample(range(1, 301), 40):
+            service.update_marks(student_id, [rng.randint(0, 100) for _ in range(4)])
+        for student_id in rng.sample(range(1, 301), 25):
+            service.remove_student(student_id)
+        service.check_aggregates()
+        summary = service.fee_summary()
+        kept = []
+        service.student_bst.inorder(kept)
+        assert list(summary['slabs'].values()) == [sum(s.fee_slab == slab for s in kept)
+                                                   for slab in FeeSlabCalculator.SLABS]
+        assert (summary['eligible'], summary['ineligible']) == (sum(s.is_eligible() for s in kept),
+                                                                sum(not s.is_eligible() for s in kept))
+        service.save_data()
+    finally:
+        service.close()
+    reopened = StudentService(service.data_file, debug=True)
+    try:
+        assert reopened.fee_summary() == summary
+    finally:
+        reopened.close()
+
+
+def slab_counts(students):
+    return [sum(FeeSlabCalculator.calculate(s.cgpa) == slab for s in students) for slab in FeeSlabCalculator.SLABS]
+
+
+@pytest.mark.parametrize('backend', ['objects', 'store', 'sqlite'])
+def test_a_new_fee_schedule_regrades_a_loaded_cohort(tmp_path, data_file, students, fee_schedule, backend):
+    if backend == 'sqlite':
+        service = SQLiteStudentService(str(tmp_path / 'cohort.db'))
+    else:
+        service = StudentService(data_file, columnar=backend == 'store', debug=True)
+    try:
+        service.add_students(students)
+        assert list(service.fee_summary()['slabs'].values()) == slab_counts(students)
+        fee_schedule.configure([[9, 1000], [7, 2000], [5, 3000], [None, 4000]])
+        for student in students[:50]:
+            assert service.search_student(student.id).fee_slab == fee_schedule.calculate(student.cgpa)
+        assert sorted(s.id for s in service.find_students(fee_slab='Second Slab')) == \
+            [s.id for s in students if 7 <= s.cgpa < 9]
+        service.update_marks(1, [95])
+        service.add_student(make_students(1, seed=3, start=500)[0])
+        kept = service.all_students()
+        summary = service.fee_summary()
+        assert list(summary['slabs'].values()) == slab_counts(kept)
+        assert summary['fee_exposure'] == sum(count * fee for count, fee in zip(slab_counts(kept), fee_schedule.FEES))
+        service.check_aggregates()
+    finally:
+        service.close()
+
+
+@pytest.mark.parametrize('extension', ['.pkl', '.col'])
+def test_saved_aggregates_are_used_unless_the_schedule_changed(tmp_path, students, fee_schedule, extension):
+    filename = str(tmp_path / ('cohort' + extension))
+    PersistenceManager.save_snapshot(filename, {'students': students, 'ranking': [],
+                                                'aggregates': {'slab_counts': [1, 2, 3, 4], 'eligible': 7,
+                                                               'ineligible': 3,
+                                                               'thresholds': list(fee_schedule.THRESHOLDS)}})
+    service = StudentService(filename, journaled=False)
+    try:
+        assert list(service.fee_summary()['slabs'].values()) == [1, 2, 3, 4]
+    finally:
+        service.close()
+    service = StudentService(filename, journaled=False, debug=True, autoload=False)
+    try:
+        with pytest.raises(AssertionError, match="drifted"):
+            service.load_data()
+            service.check_aggregates()
+    finally:
+        service.close()
+    fee_schedule.configure([[9, None], [7, None], [5, None], [None, None]])
+    service = StudentService(filename, journaled=False)
+    try:
+        summary = service.fee_summary()
+        assert list(summary['slabs'].values()) == slab_counts(students)
+        assert summary['eligible'] == sum(s.is_eligible() for s in students)
+    finally:
+        service.close()
+
+
+@pytest.mark.parametrize('batch', [5, 200])
+def test_batch_add_and_remove_are_all_or_nothing(service, batch):
+    before = ranked_ids(service), journal_length(service)
+    newcomers = make_students(batch, seed=9, start=1001)
+    with pytest.raises(ValueError) as error:
+        service.add_students(newcomers + [make_students(1, start=42)[0], newcomers[0]])
+    assert str(error.value).splitlines() == ["Student with ID 42 already exists.",
+                                             "Student with ID 1001 already exists."]
+    with pytest.raises(ValueError, match="not found: 999, 2000"):
+        service.remove_students([3, 999, 2000, 4])
+    assert (ranked_ids(service), journal_length(service)) == before
+    assert service.search_student(3) is not None
+
+    assert service.add_students(newcomers) == batch
+    assert service.remove_students(list(range(1, batch + 1)) + [1]) == batch
+    if before[1] is not None:
+        assert journal_length(service) == before[1] + 2
+        service.check_aggregates()
+    expected = sorted(make_students(300)[batch:] + newcomers, key=lambda s: (-s.cgpa, s.id))
+    assert ranked_ids(service) == [s.id for s in expected]
+    service.close()
+    reopened = type(service)(service.data_file)
+    try:
+        assert ranked_ids(reopened) == [s.id for s in expected]
+    finally:
+        reopened.close()
+
+
+PAGE_ORDERS = {'id': lambda s: s.id, 'name': lambda s: (' '.join(s.name.casefold().split()), s.id),
+               'cgpa': lambda s: (s.cgpa, -s.id), 'attendance': lambda s: (s.attendance, s.id)}
+
+
+@pytest.mark.parametrize('sort_by', sorted(PAGE_ORDERS))
+@pytest.mark.parametrize('descending', [False, True])
+def test_student_pages_follow_each_sort_order(tmp_path, service, sort_by, descending):
+    service.remove_student(17)
+    service.update_marks(40, [0])
+    expected = [s.id for s in sorted(service.all_students(), key=PAGE_ORDERS[sort_by], reverse=descending)]
+    services = [service]
+    if sort_by in ('id', 'cgpa'):
+        filename = str(tmp_path / ('cohort' + ColumnarSnapshot.EXTENSION))
+        service.save_as(filename, wait=True)
+        services.append(StudentService(filename, journaled=False))
+        assert services[-1]._mapped is not None
+    try:
+        for current in services:
+            for offset in (0, 50, 275, 299, 400):
+                page = current.student_page(offset, 50, sort_by, descending)
+                assert [s.id for s in page] == expected[offset:offset + 50], (current, offset)
+    finally:
+        for other in services[1:]:
+            other.close()
+
+
+def read_export(filename):
+    with open(filename, newline='', encoding='utf-8') as file:
+        if filename.endswith('.csv'):
+            return [(int(row['rank']), int(row['id']), float(row['cgpa'])) for row in csv.DictReader(file)]
+        return [(record['rank'], record['id'], record['cgpa']) for record in map(json.loads, file)]
+
+
+@pytest.mark.parametrize('extension', StudentExporter.FORMATS)
+def test_export_streams_every_student_in_id_or_rank_order(tmp_path, service, extension):
+    service.update_marks(5, [100])
+    ranked = [s.id for _, _, s in service.ranking()]
+    expected_by_id = [(ranked.index(s.id) + 1, s.id, round(s.cgpa, 2)) for s in service.all_students()]
+    expected_by_rank = sorted(expected_by_id)
+    filename = str(tmp_path / ('cohort' + ColumnarSnapshot.EXTENSION))
+    service.save_as(filename, wait=True)
+    mapped = StudentService(filename, journaled=False)
+    try:
+        assert mapped._mapped is not None
+        for current in (service, mapped):
+            for order, expected in (('id', expected_by_id), ('rank', expected_by_rank)):
+                target = str(tmp_path / (f'{order}' + extension))
+                assert current.export(target, order) == 300
+                assert read_export(target) == expected
+                assert not os.path.exists(target + '.tmp')
+        assert read_export(target)[0] == (1, 5, 10.0)
+    finally:
+        mapped.close()
+    with pytest.raises(ValueError):
+        service.export(str(tmp_path / 'cohort.xml'))
+    with pytest.raises(ValueError):
+        service.export_in_background(str(tmp_path / 'cohort.csv'), 'name')
+
+
+def test_sqlite_backend_matches_the_in_memory_one(tmp_path, students):
+    services = [StudentService(str(tmp_path / 'cohort.pkl')), SQLiteStudentService(str(tmp_path / 'cohort.db'))]
+    try:
+        reports = []
+        for service in services:
+            service.add_students(students)
+            rng = random.Random(21)
+            for step in range(300):
+                action = rng.random()
+                student_id = rng.randint(1, 400)
+                try:
+                    if action < 0.3:
+                        service.add_student(make_students(1, seed=step, start=student_id)[0])
+                    elif action < 0.5:
+                        service.remove_student(student_id)
+                    else:
+                        service.update_marks(student_id, [rng.randint(0, 100) for _ in range(rng.randint(1, 5))])
+                except ValueError:
+                    pass
+            export = str(tmp_path / f'{type(service).__name__}.jsonl')
+            service.export(export, 'rank')
+            with open(export, encoding='utf-8') as file:
+                exported = file.read()
+            reports.append((ranked_ids(service), [service.get_rank(i) for i in range(1, 401, 7)],
+                            [s.id for s in service.student_page(30, 40, 'attendance', True)],
+                            sorted(s.id for s in service.find_students(cgpa=(6, 8), eligible=True)),
+                            service.fee_summary(), exported))
+        assert reports[0] == reports[1]
+    finally:
+        for service in services:
+            service.close()
+
+
+def test_pickled_cohorts_save_to_and_load_from_databases(tmp_path, service):
+    filename = str(tmp_path / 'copy.db')
+    service.save_as(filename, wait=True)
+    other = StudentService(str(tmp_path / 'other.pkl'), journaled=False)
+    try:
+        assert other.load_data(filename)
+        assert ranked_ids(other) == ranked_ids(service)
+        assert list(other.search_student(42).marks) == list(service.search_student(42).marks)
+    finally:
+        other.close()
+
+
+def test_semester_history_ranks_each_term_as_it_was(service):
+    first_rank = service.get_rank(42)[:2]
+    first = service.record_semester(' Semester 1 ')
+    assert (len(first), first.changed) == (service.student_count(), service.student_count())
+    service.update_marks(42, [100, 100, 100, 100, 100])
+    service.remove_student(7)
+    second = service.record_semester('Semester 2')
+    assert (len(second), second.changed) == (service.student_count(), 2)
+    assert service.semesters() == ['Semester 1', 'Semester 2']
+    assert service.semester_rank('Semester 1', 42)[:2] == first_rank
+    assert service.semester_rank('Semester 2', 42)[:2] == service.get_rank(42)[:2]
+    assert service.semester_rank('Semester 2', 7) is None
+    assert [(semester, cgpa) for semester, cgpa, _ in service.cgpa_trend(42)][1] == ('Semester 2', 10.0)
+    assert [rank for _, _, rank in service.cgpa_trend(42)] == [first_rank[0], 1]
+    for name in ('Semester 1', '  '):
+        with pytest.raises(ValueError):
+            service.record_semester(name)
+
+
+def test_semester_history_survives_reopening(tmp_path, students):
+    for filename in (str(tmp_path / 'cohort.pkl'), str(tmp_path / 'cohort.db')):
+        backend = SQLiteStudentService if filename.endswith('.db') else StudentService
+        service = backend(filename)
+        try:
+            service.add_students(students)
+            service.record_semester('Semester 1')
+            expected = service.cgpa_trend(42)
+            service.writer.flush()
+        finally:
+            service.close()
+        service = backend(filename)
+        try:
+            assert service.semesters() == ['Semester 1']
+            assert service.cgpa_trend(42) == expected
+        finally:
+            service.close()
@@ -0,0 +1,198 @@
+import random
+
+import pytest
+
+from conftest import make_students
+from ExamResultManagamentSystemFinal import MaxHeap, NameIndex, RankIndex, Student, StudentBST
+
+
+def check_avl(node):
+    """Height, size and balance of every node; returns (height, size)."""
+    if node is None:
+        return 0, 0
+    left_height, left_size = check_avl(node.left)
+    right_height, right_size = check_avl(node.right)
+    assert abs(left_height - right_height) <= 1
+    assert node.height == 1 + max(left_height, right_height)
+    assert node.size == 1 + left_size + right_size
+    return node.height, node.size
+
+
+def keys_of(bst):
+    students = []
+    bst.inorder(students)
+    return [student.id for student in students]
+
+
+def test_bst_stays_balanced_under_random_inserts_and_deletes():
+    rng = random.Random(1)
+    students = make_students(500)
+    bst = StudentBST()
+    present = set()
+    for _ in range(3000):
+        student = rng.choice(students)
+        if student.id in present and rng.random() < 0.5:
+            bst.delete(student.id)
+            present.discard(student.id)
+        elif student.id not in present:
+            assert bst.insert(student)
+            present.add(student.id)
+        check_avl(bst.root)
+    assert keys_of(bst) == sorted(present)
+    assert len(bst) == len(present)
+
+
+def test_sequential_ids_keep_the_tree_shallow():
+    bst = StudentBST()
+    for student in make_students(5000):
+        bst.insert(student)
+    assert bst.height() <= 1.45 * (5000).bit_length()
+    assert check_avl(bst.root) == (bst.height(), 5000)
+
+
+def test_bst_rejects_duplicates_and_finds_students(students):
+    bst = StudentBST()
+    for student in students:
+        assert bst.insert(student)
+    assert not bst.insert(students[0])
+    assert bst.search(students[10].id) is students[10]
+    assert bst.search(10 ** 6) is None
+
+
+def test_bst_from_sorted_order_statistics(students):
+    bst = StudentBST.from_sorted(students)
+    check_avl(bst.root)
+    ids = [student.id for student in students]
+    assert keys_of(bst) == ids
+    for index in (0, 1, 150, len(ids) - 1):
+        assert bst.select(index).id == ids[index]
+        assert bst.count_less(ids[index]) == index
+    assert StudentBST.from_sorted([]).root is None
+    with pytest.raises(ValueError):
+        StudentBST.from_sorted(students[::-1])
+
+
+def test_rank_index_matches_sorted_ranking(students):
+    index = RankIndex.from_students(students)
+    ranked = sorted(students, key=lambda s: (-s.cgpa, s.id))
+    for rank, student in enumerate(ranked, start=1):
+        assert index.rank(student.id) == rank
+        assert index.at_rank(rank) is student
+    assert index.rank(10 ** 6) is None
+    assert index.percentile(ranked[0].id) == 99.83 and index.percentile(ranked[-1].id) == 0.17
+
+
+def test_rank_index_follows_adds_regrades_and_removals(students):
+    rng = random.Random(4)
+    index = RankIndex()
+    for student in students:
+        index.add(student)
+    for student in rng.sample(students, 60):
+        index.discard(student.id)
+        student.set_marks([rng.randint(0, 100) for _ in range(5)])
+        index.add(student)
+    gone = rng.sample(students, 30)
+    for student in gone:
+        index.discard(student.id)
+    ranked = sorted(set(students) - set(gone), key=lambda s: (-s.cgpa, s.id))
+    assert [index.rank(student.id) for student in ranked] == list(range(1, len(ranked) + 1))
+    check_avl(index.root)
+    with pytest.raises(ValueError):
+        index.add(ranked[0])
+
+
+def check_heap(heap):
+    data = heap._data
+    for i in range(1, len(data)):
+        assert not heap._higher(data[i], data[(i - 1) // 2])
+    assert heap._pos == {element[2].id: i for i, element in enumerate(data)}
+
+
+def test_heap_keeps_order_and_positions_through_updates():
+    rng = random.Random(2)
+    students = make_students(400)
+    heap = MaxHeap()
+    heap.build([(s.cgpa, -s.id, s) for s in students[:200]])
+    check_heap(heap)
+    for student in students[200:]:
+        heap.insert((student.cgpa, -student.id, student))
+    check_heap(heap)
+    for student in rng.sample(students, 100):
+        student.set_marks([rng.randint(0, 100) for _ in range(5)])
+        heap.update(student.id, student.cgpa)
+        check_heap(heap)
+    for student in rng.sample(students, 50):
+        heap.remove(student.id)
+        check_heap(heap)
+    expected = sorted(heap._data, reverse=True)
+    assert heap.sorted_elements() == expected
+    assert heap.top_k(10) == expected[:10]
+    assert heap.ranking_page(20, 15) == expected[20:35]
+    assert len(heap) == 350
+    with pytest.raises(ValueError):
+        heap.insert(heap._data[-1])
+    with pytest.raises(KeyError):
+        heap.update(10 ** 6, 5.0)
+
+
+def test_heap_top_k_and_pages_follow_edits_after_caching():
+    students = make_students(300)
+    heap = MaxHeap()
+    heap.build([(s.cgpa, -s.id, s) for s in students])
+    expected = sorted(heap._data, reverse=True)
+    assert heap.top_k(0) == [] and heap.ranking_page(-1, 5) == []
+    assert heap.ranking_page(0, 5) == expected[:5]
+    assert heap.ranking_page(250, 100) == expected[250:]
+    assert heap.top_k(1000) == expected
+    top = expected[0][2]
+    heap.update(top.id, -1.0)
+    assert heap.top_k(1)[0] == expected[1]
+    assert heap.ranking_page(299, 1)[0][2] is top
+
+
+def test_heap_iter_ranked_is_lazy_and_leaves_the_heap_alone():
+    students = make_students(200)
+    heap = MaxHeap()
+    heap.build([(s.cgpa, -s.id, s) for s in students])
+    before = list(heap._data)
+    ranked = heap.iter_ranked()
+    assert [next(ranked) for _ in range(3)] == sorted(before, reverse=True)[:3]
+    assert list(heap.iter_ranked()) == sorted(before, reverse=True)
+    assert heap._data == before and heap._sorted is None
+    assert list(MaxHeap().iter_ranked()) == []
+
+
+def brute_force_fuzzy(students, text, min_score=0.3):
+    query = NameIndex.trigrams(NameIndex.normalize(text))
+    scored = []
+    for student in students:
+        grams = NameIndex.trigrams(NameIndex.normalize(student.name))
+        score = 2.0 * len(query & grams) / (len(query) + len(grams))
+        if score >= min_score:
+            scored.append((round(score, 3), student.id))
+    return sorted(scored, key=lambda pair: (-pair[0], pair[1]))
+
+
+def test_name_fuzzy_matches_a_brute_force_dice_scan():
+    rng = random.Random(11)
+    syllables = ('na', 'ma', 'jo', 'hn', 'ra', 'vi', 'sh', 'ar', 'ka', 'ya', 'ni', 'la')
+    names = [f"John {''.join(rng.choice(syllables) for _ in range(3)).title()}" for _ in range(600)]
+    names += [f"{''.join(rng.choice(syllables) for _ in range(2)).title()} Nama" for _ in range(600)]
+    names.append('John Nama')
+    students = [Student(student_id, name, [50], 80) for student_id, name in enumerate(names, 1)]
+    index = NameIndex.from_students(students)
+    for query in ('John Nvma', 'jon nama', 'Ravi', 'Kayala Nama', 'xyz'):
+        expected = brute_force_fuzzy(students, query)
+        found = [(round(score, 3), student.id) for score, student in index.fuzzy(query, limit=len(students))]
+        assert found == expected
+    assert index.fuzzy('John Nvma', limit=1)[0][1].name == 'John Nama'
+
+
+def test_name_prefix_is_case_and_space_insensitive(students):
+    index = NameIndex.from_students(students)
+    expected = sorted((s for s in students if s.name.lower().startswith('asha s')), key=lambda s: s.id)
+    assert [s.id for s in index.prefix('  ASHA  s', limit=1000)] == [s.id for s in expected]
+    assert len(index.prefix('asha', limit=3)) == 3
+    for student in expected:
+        index.discard(student.id)
+    assert index.prefix('asha s') == []